@@ -0,0 +1,49 @@
+"""
+Compare two benchmark results saved by `benchmarks.harness`.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/A.json benchmarks/results/B.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(baseline: dict, candidate: dict) -> list[str]:
+    lines = [
+        f"baseline:  {baseline['label']} @ {baseline['git_revision']}",
+        f"candidate: {candidate['label']} @ {candidate['git_revision']}",
+        "",
+        f"{'endpoint':<14}{'metric':<9}{'baseline':>12}{'candidate':>12}{'delta':>10}",
+    ]
+    for endpoint in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        before = baseline["endpoints"].get(endpoint, {})
+        after = candidate["endpoints"].get(endpoint, {})
+        for metric in METRICS:
+            b, a = before.get(metric, 0.0), after.get(metric, 0.0)
+            lines.append(f"{endpoint:<14}{metric:<9}{b:>12}{a:>12}{delta(b, a):>10}")
+    return lines
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    print("\n".join(compare(baseline, candidate)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Vector-count reduction from near-duplicate elimination on a boilerplate-heavy corpus.
+
+Every generated document has a cover page with a shared legal notice (only the
+document number differs), a per-document footer page repeated every few pages, and
+unique body pages. The corpus is ingested twice into a temporary on-disk Chroma
+with the local hashing embedder, once with DEDUP_ENABLED off and once on, and the
+chunks produced, vectors stored, texts embedded and ingestion time are reported.
+
+Usage:
+    python -m benchmarks.dedup --documents 20 --pages 12 --label baseline
+"""
+
+import argparse
+import io
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.harness import build_vocabulary, make_pdf_from_pages
+
+RESULTS_DIR = Path(__file__).parent / "results"
+WORDS_PER_PAGE = 120
+FOOTER_EVERY = 4
+
+
+def make_corpus(seed: int, documents: int, pages: int) -> list[list[str]]:
+    """
+    Build the page texts of `documents` documents of `pages` pages each.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(seed)
+    notice = " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_PAGE))
+    corpus = []
+    for number in range(documents):
+        footer = " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_PAGE // 2))
+        texts = [f"{notice} documento {number}"]
+        for page in range(1, pages):
+            if page % FOOTER_EVERY == 0:
+                texts.append(f"{footer} pagina {page}")
+            else:
+                texts.append(" ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_PAGE)))
+        corpus.append(texts)
+    return corpus
+
+
+def ingest(corpus: list[list[str]], enabled: bool) -> dict[str, Any]:
+    """
+    Ingest the corpus into a fresh store and count what was embedded and stored.
+    """
+    from chromadb import PersistentClient
+    from langchain_chroma import Chroma
+
+    from lucid_docs import dependencies
+    from lucid_docs.core.config import settings
+    from lucid_docs.services.file_processing import process_document
+    from lucid_docs.services.local_models import HashingEmbeddings
+
+    previous = (dependencies.chroma, settings.DEDUP_ENABLED)
+    embedded = []
+    chunks = skipped = linked = 0
+    with tempfile.TemporaryDirectory() as directory:
+        store = Chroma(
+            client=PersistentClient(path=directory),
+            collection_name="bench",
+            embedding_function=HashingEmbeddings(),
+        )
+        dependencies.chroma, settings.DEDUP_ENABLED = store, enabled
+        try:
+            start = time.perf_counter()
+            for number, pages in enumerate(corpus):
+                result = process_document(
+                    io.BytesIO(make_pdf_from_pages(pages)), f"doc{number}.pdf", "bench",
+                    hash_file_name=f"doc{number}.pdf", before_embed=embedded.extend,
+                )
+                chunks += result["chunks"] + result["duplicates_skipped"]
+                skipped += result["duplicates_skipped"]
+                linked += result["duplicates_linked"]
+            seconds = time.perf_counter() - start
+            vectors = store._collection.count()
+        finally:
+            dependencies.chroma, settings.DEDUP_ENABLED = previous
+    return {
+        "chunks": chunks,
+        "vectors": vectors,
+        "embedded": len(embedded),
+        "skipped": skipped,
+        "linked": linked,
+        "seconds": round(seconds, 3),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=12, help="Pages per document")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default=str(RESULTS_DIR), help="Directory for the JSON result when --label is set")
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.seed, args.documents, args.pages)
+    results = {"off": ingest(corpus, False), "on": ingest(corpus, True)}
+    off, on = results["off"], results["on"]
+    results["vector_reduction_percent"] = round(100 * (1 - on["vectors"] / off["vectors"]), 1)
+    results["embedding_reduction_percent"] = round(100 * (1 - on["embedded"] / off["embedded"]), 1)
+
+    print(f"{'dedup':<6}{'chunks':>8}{'vectors':>9}{'embedded':>10}{'skipped':>9}{'linked':>8}{'seconds':>9}")
+    for name in ("off", "on"):
+        result = results[name]
+        print(
+            f"{name:<6}{result['chunks']:>8}{result['vectors']:>9}{result['embedded']:>10}"
+            f"{result['skipped']:>9}{result['linked']:>8}{result['seconds']:>9}"
+        )
+    print(
+        f"Vectors stored: -{results['vector_reduction_percent']}%, "
+        f"texts embedded: -{results['embedding_reduction_percent']}%"
+    )
+
+    if args.label:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        path = output / f"{time.strftime('%Y%m%dT%H%M%S')}-dedup-{args.label}.json"
+        path.write_text(json.dumps(
+            {"label": args.label, "documents": args.documents, "pages": args.pages, "results": results}, indent=2
+        ))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
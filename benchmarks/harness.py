@@ -0,0 +1,326 @@
+"""
+Offline load-test harness for the upload and chat endpoints.
+
+The application is started in-process through `create_app()` and driven with an
+httpx ASGI client, so results measure our own code path without network noise:
+
+- embeddings and the chat model use the local "hashing" and "extractive" providers
+  from `lucid_docs.services.local_models`, with configurable artificial latency;
+- Chroma is a real on-disk PersistentClient in a temporary directory;
+- MongoDB is an in-memory mongomock-motor client (`pip install mongomock-motor`), or a
+  real server with --mongo-uri.
+
+A seeded mix of uploads, questions and conversation reads is replayed at the target
+concurrency, and per-endpoint p50/p95/p99 latency and requests/sec are printed and
+saved as JSON so two runs can be compared with `python -m benchmarks.compare`.
+
+Usage:
+    python -m benchmarks.harness --requests 300 --concurrency 16 --label baseline
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PASSWORD = "Bench123!pass"
+
+SYLLABLES = ["lu", "ci", "do", "ka", "ren", "to", "mi", "sa", "vel", "por", "ta", "ne", "gri", "os", "bel", "un"]
+
+
+def build_vocabulary(seed: int, size: int = 400) -> list[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_pdf(rng: random.Random, vocabulary: list[str], pages: int, words_per_page: int) -> bytes:
+    """
+    Build a minimal text-only PDF whose pages contain random words from `vocabulary`.
+    """
+    return make_pdf_from_pages(
+        [" ".join(rng.choice(vocabulary) for _ in range(words_per_page)) for _ in range(pages)]
+    )
+
+
+def make_pdf_from_pages(page_texts: list[str]) -> bytes:
+    """
+    Build a minimal text-only PDF with one page per text, wrapped at 12 words per line.
+    """
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(b"")  # page tree, filled in below
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_text in page_texts:
+        words = page_text.split()
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        text = b" T* ".join(b"(" + line.encode() + b") Tj" for line in lines)
+        stream = b"BT /F1 10 Tf 14 TL 40 760 Td " + text + b" ET"
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        ))
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[tuple[str, float, int]], wall_seconds: float) -> dict[str, Any]:
+    by_endpoint: dict[str, list[tuple[float, int]]] = {}
+    for endpoint, elapsed, status in samples:
+        by_endpoint.setdefault(endpoint, []).append((elapsed, status))
+        by_endpoint.setdefault("all", []).append((elapsed, status))
+
+    summary = {}
+    for endpoint, rows in sorted(by_endpoint.items()):
+        latencies = sorted(elapsed * 1000 for elapsed, _ in rows)
+        summary[endpoint] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status in rows if status >= 400),
+            "rps": round(len(rows) / wall_seconds, 2) if wall_seconds else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return summary
+
+
+def configure_environment(workdir: Path, args: argparse.Namespace) -> None:
+    """
+    Point the application at scratch storage and local providers, and disable limits,
+    before it is imported.
+    """
+    os.environ["EMBEDDING_PROVIDER"] = "hashing"
+    os.environ["LLM_PROVIDER"] = "extractive"
+    os.environ["LOCAL_EMBEDDING_DIMENSIONS"] = str(args.embedding_dim)
+    os.environ["LOCAL_EMBEDDING_LATENCY_MS"] = str(args.embed_latency * 1000)
+    os.environ["LOCAL_LLM_LATENCY_MS"] = str(args.llm_latency * 1000)
+    os.environ.setdefault("CHROMA_PERSIST_DIR", str(workdir / "chroma"))
+    os.environ.setdefault("TEMP_STORAGE_PATH", str(workdir / "temp"))
+    os.environ.setdefault("PROFILE_STORAGE_PATH", str(workdir / "profiles"))
+    os.environ.setdefault("MONGO_DB_NAME", "lucid_docs_bench")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+async def create_sessions(client, args: argparse.Namespace, vocabulary: list[str]) -> list[dict[str, str]]:
+    rng = random.Random(args.seed)
+    sessions = []
+    for index in range(args.users):
+        username = f"bench_{index}_{uuid.uuid4().hex[:6]}"
+        response = await client.post("/auth/users/register/", json={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+        response = await client.post("/auth/token", data={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+        session = {
+            "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+            "chat_id": str(uuid.uuid4()),
+        }
+        pdf = make_pdf(rng, vocabulary, args.pages, args.words_per_page)
+        response = await client.post(
+            "/upload/pdf",
+            headers=session["headers"],
+            files={"file": ("seed.pdf", pdf, "application/pdf")},
+            data={"chat_id": session["chat_id"]},
+        )
+        response.raise_for_status()
+        sessions.append(session)
+    return sessions
+
+
+def build_workload(args: argparse.Namespace, sessions: list[dict], vocabulary: list[str]) -> list[tuple]:
+    rng = random.Random(args.seed + 1)
+    weights = {"upload": args.upload_weight, "chat": args.chat_weight, "conversation": args.conversation_weight}
+    operations = [name for name, weight in weights.items() if weight > 0]
+    workload = []
+    for _ in range(args.requests):
+        operation = rng.choices(operations, weights=[weights[name] for name in operations])[0]
+        session = rng.choice(sessions)
+        if operation == "upload":
+            payload = make_pdf(rng, vocabulary, args.pages, args.words_per_page)
+        elif operation == "chat":
+            payload = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 12))) + "?"
+        else:
+            payload = None
+        workload.append((operation, session, payload))
+    return workload
+
+
+async def execute(client, operation: str, session: dict, payload: Any, top_k: int) -> int:
+    if operation == "upload":
+        response = await client.post(
+            "/upload/pdf",
+            headers=session["headers"],
+            files={"file": ("doc.pdf", payload, "application/pdf")},
+            data={"chat_id": session["chat_id"]},
+        )
+    elif operation == "chat":
+        response = await client.post(
+            "/chat/",
+            headers=session["headers"],
+            json={"question": payload, "chat_id": session["chat_id"], "top_k": top_k},
+        )
+    else:
+        response = await client.get(f"/chat/conversation/{session['chat_id']}", headers=session["headers"])
+    return response.status_code
+
+
+async def replay(client, workload: list[tuple], args: argparse.Namespace) -> tuple[list, float]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in workload:
+        queue.put_nowait(item)
+    samples: list[tuple[str, float, int]] = []
+
+    async def worker():
+        while True:
+            try:
+                operation, session, payload = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                status = await execute(client, operation, session, payload, args.top_k)
+            except Exception:
+                status = 599
+            samples.append((operation, time.perf_counter() - start, status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return samples, time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+    from lucid_docs.main import create_app
+
+    vocabulary = build_vocabulary(args.seed)
+
+    with ExitStack() as stack:
+        if not args.mongo_uri:
+            try:
+                from mongomock_motor import AsyncMongoMockClient
+            except ImportError:
+                raise SystemExit("The in-memory MongoDB stand-in needs `pip install mongomock-motor`, or pass --mongo-uri.")
+            stack.enter_context(patch("lucid_docs.core.database.AsyncIOMotorClient", AsyncMongoMockClient))
+
+        app = create_app()
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                sessions = await create_sessions(client, args, vocabulary)
+                workload = build_workload(args, sessions, vocabulary)
+                samples, wall_seconds = await replay(client, workload, args)
+
+    return {
+        "label": args.label,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output",)},
+        "wall_seconds": round(wall_seconds, 3),
+        "endpoints": summarize(samples, wall_seconds),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(result: dict[str, Any]) -> None:
+    print(f"{result['label']} @ {result['git_revision']}  wall={result['wall_seconds']}s")
+    print(f"{'endpoint':<14}{'req':>6}{'err':>6}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"{endpoint:<14}{stats['requests']:>6}{stats['errors']:>6}{stats['rps']:>9}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--upload-weight", type=float, default=0.1)
+    parser.add_argument("--chat-weight", type=float, default=0.8)
+    parser.add_argument("--conversation-weight", type=float, default=0.1)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--words-per-page", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--embedding-dim", type=int, default=256)
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Seconds added to every embedding call")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds added to every LLM call")
+    parser.add_argument("--mongo-uri", default="", help="Use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--output", default=str(RESULTS_DIR), help="Directory for the JSON result")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="lucid-bench-") as workdir:
+        configure_environment(Path(workdir), args)
+        if args.mongo_uri:
+            os.environ["MONGO_URI"] = args.mongo_uri
+        result = asyncio.run(run(args))
+
+    print_report(result)
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    path = output / f"{time.strftime('%Y%m%dT%H%M%S')}-{args.label}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Import-time report for the application entry point.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (repeated to
+smooth out disk cache effects, keeping the fastest run) and prints the total import
+time, the slowest modules by cumulative time and the self time per top-level package.
+
+Usage:
+    python -m benchmarks.import_time --module lucid_docs.main --top 20 --label baseline
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> list[dict[str, Any]]:
+    """
+    Parse `-X importtime` stderr into one record per imported module.
+
+    Args:
+        output (str): The stderr of the interpreter.
+
+    Returns:
+        list[dict[str, Any]]: Records with module, self_us, cumulative_us and depth.
+    """
+    records = []
+    for line in output.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return records
+
+
+def measure(module: str) -> list[dict[str, Any]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def summarize(records: list[dict[str, Any]], module: str, top: int) -> dict[str, Any]:
+    packages: dict[str, int] = defaultdict(int)
+    for record in records:
+        packages[record["module"].split(".")[0]] += record["self_us"]
+
+    total_us = next((r["cumulative_us"] for r in records if r["module"] == module), sum(packages.values()))
+    slowest = sorted(records, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(records),
+        "slowest": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in slowest],
+        "packages": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def print_report(result: dict[str, Any]) -> None:
+    print(f"import {result['module']}: {result['total_ms']} ms, {result['modules']} modules")
+    print(f"\n{'slowest modules (cumulative)':<60}{'ms':>10}")
+    for entry in result["slowest"]:
+        print(f"{entry['module']:<60}{entry['cumulative_ms']:>10}")
+    print(f"\n{'packages (self time)':<60}{'ms':>10}")
+    for name, ms in result["packages"].items():
+        print(f"{name:<60}{ms:>10}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="lucid_docs.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default=str(RESULTS_DIR), help="Directory for the JSON result when --label is set")
+    args = parser.parse_args(argv)
+
+    runs = [summarize(measure(args.module), args.module, args.top) for _ in range(args.runs)]
+    result = min(runs, key=lambda run: run["total_ms"])
+    print_report(result)
+
+    if args.label:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        path = output / f"{time.strftime('%Y%m%dT%H%M%S')}-importtime-{args.label}.json"
+        path.write_text(json.dumps(result, indent=2))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Throughput of the document loaders, in page-equivalents per second.
+
+The same seeded text (sections with a heading and a few paragraphs) is rendered as
+PDF, DOCX, plain text, Markdown and HTML, and each registered loader parses it from
+an in-memory buffer, as uploads are parsed. A page-equivalent is LOADER_PAGE_CHARS
+characters of extracted text, so formats with and without real pages compare
+directly. The best of --runs runs is reported.
+
+Usage:
+    python -m benchmarks.loaders --pages 200 --runs 3 --label baseline
+"""
+
+import argparse
+import html
+import io
+import json
+import random
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+from xml.sax.saxutils import escape
+
+from benchmarks.harness import build_vocabulary, make_pdf_from_pages
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PARAGRAPHS_PER_SECTION = 4
+WORDS_PER_PARAGRAPH = 90
+
+Section = tuple[str, list[str]]
+
+
+def make_sections(seed: int, pages: int, page_chars: int) -> list[Section]:
+    """
+    Build headed sections whose text adds up to about `pages` page-equivalents.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(seed)
+    sections: list[Section] = []
+    total = 0
+    while total < pages * page_chars:
+        heading = " ".join(rng.choice(vocabulary) for _ in range(4)).capitalize()
+        paragraphs = [
+            " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_PARAGRAPH)).capitalize() + "."
+            for _ in range(PARAGRAPHS_PER_SECTION)
+        ]
+        sections.append((heading, paragraphs))
+        total += len(heading) + sum(len(paragraph) for paragraph in paragraphs)
+    return sections
+
+
+def make_text(sections: list[Section]) -> bytes:
+    return "\n\n".join(f"{heading}\n\n" + "\n\n".join(paragraphs) for heading, paragraphs in sections).encode()
+
+
+def make_markdown(sections: list[Section]) -> bytes:
+    return "\n\n".join(f"## {heading}\n\n" + "\n\n".join(paragraphs) for heading, paragraphs in sections).encode()
+
+
+def make_html(sections: list[Section]) -> bytes:
+    body = "".join(
+        f"<h2>{html.escape(heading)}</h2>" + "".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+        for heading, paragraphs in sections
+    )
+    return f"<!DOCTYPE html><html><head><title>Bench</title><style>p {{margin: 0}}</style></head><body>{body}</body></html>".encode()
+
+
+def make_docx(sections: list[Section]) -> bytes:
+    """
+    Build a minimal DOCX (only the parts Word needs to open it) with Heading2 sections.
+    """
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+    def paragraph(text: str, style: str = "") -> str:
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        return f"<w:p>{properties}<w:r><w:t xml:space=\"preserve\">{escape(text)}</w:t></w:r></w:p>"
+
+    body = "".join(
+        paragraph(heading, "Heading2") + "".join(paragraph(p) for p in paragraphs)
+        for heading, paragraphs in sections
+    )
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{namespace}"><w:body>{body}</w:body></w:document>'
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    relationships = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="word/document.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("_rels/.rels", relationships)
+        archive.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def make_pdf(sections: list[Section]) -> bytes:
+    # One PDF page per section; the generator only handles ASCII text.
+    return make_pdf_from_pages([f"{heading} " + " ".join(paragraphs) for heading, paragraphs in sections])
+
+
+def builders() -> dict[str, tuple[str, Callable[[list[Section]], bytes]]]:
+    from lucid_docs.services import loaders
+
+    return {
+        "pdf": (loaders.PDF, make_pdf),
+        "docx": (loaders.DOCX, make_docx),
+        "txt": (loaders.TEXT, make_text),
+        "md": (loaders.MARKDOWN, make_markdown),
+        "html": (loaders.HTML, make_html),
+    }
+
+
+def measure(content_type: str, data: bytes, page_chars: int, runs: int) -> dict[str, Any]:
+    """
+    Parse `data` with the loader for `content_type` and report the fastest run.
+    """
+    from lucid_docs.services.loaders import get_loader
+
+    loader = get_loader(content_type)
+    best, pages = float("inf"), []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pages = list(loader.load(io.BytesIO(data), "bench"))
+        best = min(best, time.perf_counter() - start)
+    characters = sum(len(page.page_content) for page in pages)
+    equivalents = characters / page_chars
+    return {
+        "bytes": len(data),
+        "pages": len(pages),
+        "page_equivalents": round(equivalents, 1),
+        "seconds": round(best, 4),
+        "page_equivalents_per_second": round(equivalents / best, 1),
+        "mb_per_second": round(len(data) / best / 1e6, 2),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Page-equivalents of text per document")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", default="pdf,docx,txt,md,html")
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default=str(RESULTS_DIR), help="Directory for the JSON result when --label is set")
+    args = parser.parse_args(argv)
+
+    from lucid_docs.core.config import settings
+
+    page_chars = settings.LOADER_PAGE_CHARS
+    sections = make_sections(args.seed, args.pages, page_chars)
+    available = builders()
+    results = {}
+    for name in args.formats.split(","):
+        content_type, build = available[name]
+        results[name] = measure(content_type, build(sections), page_chars, args.runs)
+
+    print(f"{'format':<8}{'MB':>8}{'pages':>8}{'page-eq':>10}{'seconds':>10}{'page-eq/s':>12}{'MB/s':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['bytes'] / 1e6:>8.2f}{result['pages']:>8}{result['page_equivalents']:>10}"
+            f"{result['seconds']:>10}{result['page_equivalents_per_second']:>12}{result['mb_per_second']:>8}"
+        )
+
+    if args.label:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        path = output / f"{time.strftime('%Y%m%dT%H%M%S')}-loaders-{args.label}.json"
+        path.write_text(json.dumps({"label": args.label, "pages": args.pages, "results": results}, indent=2))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Login burst benchmark.
+
+Measures event-loop lag while a burst of bcrypt verifications runs, comparing the
+synchronous `verify_password` with the executor-backed `verify_password_async`.
+
+Usage:
+    python benchmarks/login_burst.py --logins 32 --rounds 12
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> list[float]:
+    """
+    Sample how late the event loop wakes up a sleeping task, in milliseconds.
+    """
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+    return samples
+
+
+async def run_burst(logins: int, use_executor: bool) -> dict[str, float]:
+    from lucid_docs.core import security
+
+    hashed = security.get_password_hash("Password123!")
+
+    async def login():
+        if use_executor:
+            await security.verify_password_async("Password123!", hashed)
+        else:
+            security.verify_password("Password123!", hashed)
+        await asyncio.sleep(0)
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    samples = await sampler
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "lag_p50_ms": round(statistics.median(samples), 2),
+        "lag_max_ms": round(max(samples), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    from lucid_docs import dependencies
+    from lucid_docs.core import security
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=args.rounds)
+    dependencies.pwd_context = context
+    security.pwd_context = context
+
+    for label, use_executor in (("sync", False), ("executor", True)):
+        result = asyncio.run(run_burst(args.logins, use_executor))
+        print(f"{label:>8}: {result}")
+
+    security.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Serialization cost of the conversation endpoint: response model vs direct JSON.
+
+Two minimal FastAPI apps serve the same seeded Motor-like message documents
+(ObjectId ids, UUIDv4 chat ids, usage on assistant messages):
+
+- "model": the previous path, returning `Conversation(messages=...)` through
+  `response_model`, validated twice and encoded with the stdlib `json`;
+- "direct": `json_response`, encoding the documents with orjson and compressing
+  them when the client accepts it.
+
+Each app is called in-process through an httpx ASGI client, with and without
+``Accept-Encoding: br, gzip``, and the best of --runs runs is reported with the
+bytes sent on the wire. Times include the client's decompression.
+
+Usage:
+    python -m benchmarks.serialization --sizes 1000,10000 --runs 5 --label baseline
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from bson import ObjectId
+
+from benchmarks.harness import build_vocabulary
+
+RESULTS_DIR = Path(__file__).parent / "results"
+CHATS = 20
+WORDS_PER_MESSAGE = 60
+
+
+def make_messages(seed: int, count: int) -> list[dict[str, Any]]:
+    """
+    Build `count` message documents shaped like those stored by `ask_question`.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(seed)
+    chats = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(CHATS)]
+    messages = []
+    for index in range(count):
+        role = "user" if index % 2 == 0 else "assistant"
+        message = {
+            "_id": ObjectId(),
+            "chat_id": chats[(index // 2) % CHATS],
+            "username": "bench_user",
+            "role": role,
+            "content": " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_MESSAGE)),
+            "timestamp": f"2025-01-01T00:{index // 3600 % 60:02d}:{index % 60:02d}+00:00",
+        }
+        if role == "assistant":
+            message["usage"] = {
+                "prompt_tokens": rng.randint(300, 900), "completion_tokens": rng.randint(20, 200),
+                "context_chars": rng.randint(1000, 3000), "context_chunks": 3, "history_chars": 0, "top_k": 3,
+                "retrieval_ms": round(rng.uniform(5, 40), 2), "generation_ms": round(rng.uniform(200, 900), 2),
+                "cache_hit": False, "error": False,
+            }
+        messages.append(message)
+    return messages
+
+
+def build_apps(messages: list[dict[str, Any]]):
+    from fastapi import FastAPI, Request
+
+    from lucid_docs.models.database import Conversation
+    from lucid_docs.routers.query import message_to_json
+    from lucid_docs.utils.responses import json_response
+
+    model_app = FastAPI()
+
+    @model_app.get("/conversation", response_model=Conversation, response_model_by_alias=False)
+    async def model_path():
+        return Conversation(messages=messages)
+
+    direct_app = FastAPI()
+
+    @direct_app.get("/conversation", response_model=Conversation, response_model_by_alias=False)
+    async def direct_path(request: Request):
+        return await json_response(request, {"messages": [message_to_json(message) for message in messages]})
+
+    return {"model": model_app, "direct": direct_app}
+
+
+async def measure(app, accept_encoding: str, runs: int) -> dict[str, Any]:
+    import httpx
+
+    headers = {"Accept-Encoding": accept_encoding}
+    transport = httpx.ASGITransport(app=app)
+    best, wire_bytes, body = float("inf"), 0, b""
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(runs):
+            start = time.perf_counter()
+            response = await client.get("/conversation", headers=headers)
+            best = min(best, time.perf_counter() - start)
+            wire_bytes = response.num_bytes_downloaded
+            body = response.content
+    return {
+        "ms": round(best * 1000, 2),
+        "wire_bytes": wire_bytes,
+        "encoding": response.headers.get("content-encoding", "identity"),
+        "messages": len(json.loads(body)["messages"]),
+    }
+
+
+async def run(sizes: list[int], runs: int, seed: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for size in sizes:
+        apps = build_apps(make_messages(seed, size))
+        results[str(size)] = {
+            f"{name}/{label}": await measure(app, accept_encoding, runs)
+            for name, app in apps.items()
+            for label, accept_encoding in (("identity", "identity"), ("compressed", "br, gzip"))
+        }
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated message counts")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default=str(RESULTS_DIR), help="Directory for the JSON result when --label is set")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run([int(size) for size in args.sizes.split(",")], args.runs, args.seed))
+
+    print(f"{'messages':>9}  {'path':<20}{'encoding':>10}{'ms':>10}{'wire KB':>10}")
+    for size, paths in results.items():
+        for path, result in paths.items():
+            print(f"{size:>9}  {path:<20}{result['encoding']:>10}{result['ms']:>10}{result['wire_bytes'] / 1024:>10.1f}")
+
+    if args.label:
+        output = Path(args.output)
+        output.mkdir(parents=True, exist_ok=True)
+        path = output / f"{time.strftime('%Y%m%dT%H%M%S')}-serialization-{args.label}.json"
+        path.write_text(json.dumps({"label": args.label, "runs": args.runs, "results": results}, indent=2))
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,33 @@
 #!/bin/bash
 set -e
 
+# Topologia do vector store (VECTOR_STORE_MODE): "embedded" (padrão), "http" com um
+# servidor Chroma local ou "writer" com um único processo dono do índice, que exige
+# VECTOR_STORE_WRITER_AUTHKEY (segredo compartilhado entre o writer e os workers).
+case "$VECTOR_STORE_MODE" in
+    writer)
+        echo "Iniciando o processo writer do vector store..."
+        python -m lucid_docs.services.vector_store &
+        ;;
+    http)
+        if [ "${CHROMA_HOST:-localhost}" = "localhost" ]; then
+            echo "Iniciando servidor Chroma local..."
+            chroma run --path "${CHROMA_PERSIST_DIR:-./chroma_db}" --port "${CHROMA_PORT:-8001}" &
+        fi
+        ;;
+esac
+
 if [ "$ENVIRONMENT" = "dsv" ]; then
     echo "Ambiente de desenvolvimento (dsv) detectado. Executando testes e iniciando servidor de desenvolvimento..."
     pytest --maxfail=0 --disable-warnings || exit 1
-    uvicorn lucid_docs.main:create_app --host 0.0.0.0 --port 8000 --reload
+    exec uvicorn lucid_docs.main:create_app --host 0.0.0.0 --port 8000 --reload
+elif [ "$#" -gt 0 ]; then
+    # Imagem de produção: o entrypoint executa o CMD do Dockerfile.
+    echo "Iniciando: $*"
+    exec "$@"
 else
     echo "Ambiente de produção detectado. Iniciando servidor de produção..."
-    uvicorn lucid_docs.main:create_app --host 0.0.0.0 --port 8000 --workers 4 --proxy-headers --no-server-header
-fi
\ No newline at end of file
+    # O uvicorn e a aplicação leem o número de workers de WEB_CONCURRENCY.
+    export WEB_CONCURRENCY="${WEB_CONCURRENCY:-4}"
+    exec uvicorn lucid_docs.main:create_app --host 0.0.0.0 --port 8000 --proxy-headers --no-server-header
+fi
@@ -0,0 +1,154 @@
+"""
+Circuit breaker for calls to an unreliable dependency.
+
+The breaker keeps the outcomes of the last `window` calls. Once at least
+`min_calls` are recorded, it opens when the share of failed calls reaches
+`error_rate` or the share of calls slower than `slow_call_seconds` reaches
+`slow_call_rate`. While open, calls are rejected immediately; after
+`open_seconds` a single probe call is let through (half-open) and its outcome
+closes the breaker again or re-opens it.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Error- and latency-based circuit breaker.
+
+    Args:
+        name (str): Name used in logs and status reports.
+        window (int): Number of recent calls considered.
+        min_calls (int): Calls required in the window before the breaker can open.
+        error_rate (float): Share of failed calls that opens the breaker.
+        slow_call_seconds (float): Latency from which a call counts as slow.
+        slow_call_rate (float): Share of slow calls that opens the breaker.
+        open_seconds (float): Time the breaker stays open before a probe call.
+        timer (Callable[[], float]): Clock used for the open period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.timer = timer
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejections = 0
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Return whether a call may be made now.
+
+        A True answer in the half-open state reserves the probe: the caller must
+        report its outcome with `record`, or `release` it if the call is abandoned.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self.timer() - self.opened_at < self.open_seconds:
+                    self.rejections += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self.rejections += 1
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, success: bool, latency: float) -> None:
+        """
+        Record the outcome of a call allowed by `allow`.
+
+        Args:
+            success (bool): Whether the call succeeded.
+            latency (float): Duration of the call in seconds.
+        """
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if success and not slow:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"Circuit {self.name} closed after a successful probe")
+                else:
+                    self._trip("probe failed" if not success else "probe was slow")
+                return
+            if self.state == OPEN:
+                # A call started before the breaker opened.
+                return
+            self._outcomes.append((success, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            slow_calls = sum(1 for _, is_slow in self._outcomes if is_slow)
+            if failures / calls >= self.error_rate:
+                self._trip(f"{failures}/{calls} calls failed")
+            elif slow_calls / calls >= self.slow_call_rate:
+                self._trip(f"{slow_calls}/{calls} calls slower than {self.slow_call_seconds}s")
+
+    def release(self) -> None:
+        """
+        Give back a half-open probe whose call was cancelled before it completed.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def _trip(self, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = self.timer()
+        self.trips += 1
+        self._outcomes.clear()
+        logger.warning(f"Circuit {self.name} opened: {reason}")
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the state, the error and slow-call rates of the window and the counters.
+        """
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            slow_calls = sum(1 for _, is_slow in self._outcomes if is_slow)
+            stats = {
+                "state": self.state,
+                "calls": calls,
+                "error_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(slow_calls / calls, 3) if calls else 0.0,
+                "trips": self.trips,
+                "rejections": self.rejections,
+            }
+            if self.state == OPEN:
+                stats["retry_in_seconds"] = round(max(0.0, self.opened_at + self.open_seconds - self.timer()), 2)
+            return stats
@@ -3,15 +3,105 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     PROJECT_NAME: str = "LucidDocs"
     TEMP_STORAGE_PATH: str = "./temp"
+    ORIGINALS_STORAGE_PATH: str = "./originals"
+    KEEP_ORIGINAL_UPLOADS: bool = False
+    LOADER_PAGE_CHARS: int = 3000
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.9
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 16
     CHROMA_COLLECTION_NAME: str = "pdf_documents"
     CHROMA_PERSIST_DIR: str = "./chroma_db"
+    VECTOR_STORE_MODE: str = "embedded"
+    CHROMA_HOST: str = "localhost"
+    CHROMA_PORT: int = 8001
+    CHROMA_SSL: bool = False
+    VECTOR_STORE_POOL_SIZE: int = 16
+    VECTOR_STORE_WRITER_ADDRESS: str = "/tmp/lucid_docs_vector_store.sock"
+    VECTOR_STORE_WRITER_AUTHKEY: str = ""
+    VECTOR_STORE_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    VECTOR_DELETE_BATCH_SIZE: int = 500
+    VECTOR_STORE_COMPACT_MIN_DELETED: int = 1000
+    EMBEDDING_MIGRATION_POLL_SECONDS: float = 5.0
+    EMBEDDING_MIGRATION_BATCH_SIZE: int = 64
+    EMBEDDING_MIGRATION_BATCH_INTERVAL_SECONDS: float = 1.0
+    EMBEDDING_MIGRATION_LEASE_SECONDS: float = 60.0
+    EMBEDDING_MIGRATION_MAX_RETRIES: int = 5
+    JANITOR_ENABLED: bool = True
+    JANITOR_INTERVAL_SECONDS: float = 3600.0
+    TEMP_FILE_GRACE_SECONDS: float = 300.0
+    TEMP_FILE_MAX_AGE_SECONDS: float = 86400.0
+    INGESTION_TIMEOUT_SECONDS: float = 3600.0
     GEMINI_API_KEY: str = ""
     EMBEDDING_MODEL: str = "models/text-embedding-004"
     LLM_MODEL: str = "gemini-2.0-flash"
+    EMBEDDING_PROVIDER: str = "gemini"
+    LLM_PROVIDER: str = "gemini"
+    LOCAL_EMBEDDING_DIMENSIONS: int = 384
+    LOCAL_EMBEDDING_LATENCY_MS: float = 0.0
+    LOCAL_LLM_MAX_SENTENCES: int = 3
+    LOCAL_LLM_LATENCY_MS: float = 0.0
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_DEADLINE_SECONDS: float = 45.0
+    LLM_MAX_RETRIES: int = 1
+    LLM_FALLBACK_PROVIDER: str = ""
+    LLM_FALLBACK_MODEL: str = ""
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_ERROR_RATE: float = 0.5
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 15.0
+    LLM_BREAKER_SLOW_CALL_RATE: float = 0.5
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_WINDOW: int = 200
+    WARMUP_ENABLED: bool = True
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0
+    HEALTH_CHECK_TTL_SECONDS: float = 30.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+    WEB_CONCURRENCY: int = 1
     LOG_FORMAT: str = "json"
     LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLING_RATES: dict[str, float] = {}
     MONGO_URI: str = "mongodb://localhost:27017/lucid_docs"
     MONGO_DB_NAME: str = "lucid_docs"
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_INVALIDATION_CHANNEL: str = "none"
+    USER_CACHE_INVALIDATION_POLL_SECONDS: float = 2.0
+    # With several workers, a worker may serve results cached before an upload or deletion
+    # handled by another worker for up to USER_CACHE_INVALIDATION_POLL_SECONDS.
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_MAX_SIZE: int = 2048
+    RETRIEVAL_CACHE_TTL_SECONDS: float = 600.0
+    CHAT_HISTORY_MODE: str = "none"
+    CHAT_HISTORY_TURNS: int = 3
+    CHAT_HISTORY_MESSAGE_CHARS: int = 500
+    CHAT_SUMMARY_MAX_CHARS: int = 1500
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    ADMIN_USERNAMES: list[str] = []
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORAGE: str = "memory"
+    RATE_LIMIT_CHAT_PER_USER: str = "30/minute"
+    RATE_LIMIT_CHAT_GLOBAL: str = "600/minute"
+    RATE_LIMIT_UPLOAD_PER_USER: str = "20/hour"
+    RATE_LIMIT_UPLOAD_GLOBAL: str = "300/hour"
+    RATE_LIMIT_EMBED_TOKENS_PER_USER: str = "500000/hour"
+    RATE_LIMIT_EMBED_TOKENS_GLOBAL: str = "5000000/hour"
+    MAX_CONCURRENT_CHATS_PER_USER: int = 2
+    MAX_CONCURRENT_UPLOADS_PER_USER: int = 1
+    METRICS_ENABLED: bool = True
+    TRACING_ENABLED: bool = True
+    TRACE_BUFFER_SIZE: int = 1000
+    TRACE_EXPORT_PATH: str = ""
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_STORAGE_PATH: str = "./profiles"
+    PROFILE_MAX_FILES: int = 200
 
     class Config:
         env_file = ".env"
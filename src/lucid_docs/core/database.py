@@ -2,6 +2,7 @@ import logging
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from lucid_docs.core.config import settings
+from lucid_docs.core.metrics import mongo_metrics_listener
 
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,8 @@ class Database:
                 retryReads=True,
                 
                 heartbeatFrequencyMS=10000,
+
+                event_listeners=[mongo_metrics_listener],
             )
             
             await self._client.server_info()
@@ -66,6 +69,34 @@ class Database:
             await messages_collection.create_index([("username", 1), ("chat_id", 1)])
             await messages_collection.create_index([("chat_id", 1), ("timestamp", 1)])
             await messages_collection.create_index("timestamp")
+
+            documents_collection = self._database["documents"]
+            await documents_collection.create_index("hash_file_name", unique=True)
+            await documents_collection.create_index([("username", 1), ("chat_id", 1), ("created_at", 1)])
+            await documents_collection.create_index([("status", 1), ("updated_at", 1)])
+
+            conversations_collection = self._database["conversations"]
+            await conversations_collection.create_index([("username", 1), ("chat_id", 1)], unique=True)
+
+            usage_collection = self._database["usage_daily"]
+            await usage_collection.create_index(
+                [("day", 1), ("username", 1), ("chat_id", 1), ("top_k", 1)], unique=True
+            )
+            await usage_collection.create_index([("username", 1), ("day", 1)])
+
+            jobs_collection = self._database["jobs"]
+            await jobs_collection.create_index([("username", 1), ("created_at", 1)])
+            await jobs_collection.create_index("created_at", expireAfterSeconds=7 * 24 * 3600)
+
+            migrations_collection = self._database["embedding_migrations"]
+            await migrations_collection.create_index(
+                "status", unique=True, partialFilterExpression={"status": "running"}
+            )
+            await migrations_collection.create_index("created_at")
+
+            invalidations_collection = self._database["cache_invalidations"]
+            await invalidations_collection.create_index([("cache", 1), ("created_at", 1)])
+            await invalidations_collection.create_index("created_at", expireAfterSeconds=3600)
             
             logger.info("Indexes created successfully.")
         except Exception as e:
@@ -96,7 +127,7 @@ class Database:
             bool: True if the database is reachable, False otherwise.
         """
         try:
-            await self.client.server_info()
+            await self.client.admin.command("ping")
             return True
         except Exception as e:
             logger.error(f"Database health check failed: {e}")
@@ -116,3 +147,19 @@ async def get_users_collection() -> AsyncIOMotorCollection:
 
 async def get_messages_collection() -> AsyncIOMotorCollection:
     return database.get_collection("messages")
+
+
+async def get_documents_collection() -> AsyncIOMotorCollection:
+    return database.get_collection("documents")
+
+
+async def get_jobs_collection() -> AsyncIOMotorCollection:
+    return database.get_collection("jobs")
+
+
+async def get_usage_collection() -> AsyncIOMotorCollection:
+    return database.get_collection("usage_daily")
+
+
+async def get_conversations_collection() -> AsyncIOMotorCollection:
+    return database.get_collection("conversations")
@@ -0,0 +1,146 @@
+"""
+Dependency health checks answered from memory.
+
+A background task refreshes every check (MongoDB ping, Chroma collection count,
+model provider clients) each HEALTH_CHECK_INTERVAL_SECONDS, with a timeout per check.
+Probes read the cached results, so their frequency adds no load on the dependencies.
+Results older than HEALTH_CHECK_TTL_SECONDS are reported as stale and make the
+service not ready, which also covers a stuck refresh loop.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], Awaitable[dict[str, Any]]]
+
+
+async def check_mongo() -> dict[str, Any]:
+    if not await database.health_check():
+        raise RuntimeError("MongoDB ping failed")
+    return {}
+
+
+async def check_chroma() -> dict[str, Any]:
+    from lucid_docs.dependencies import get_chroma
+    from lucid_docs.services.vector_store import vector_store_mode
+
+    count = await run_in_threadpool(lambda: get_chroma()._collection.count())
+    return {"mode": vector_store_mode(), "documents": count}
+
+
+async def check_providers() -> dict[str, Any]:
+    from lucid_docs.dependencies import get_embeddings, get_llm
+    from lucid_docs.services.providers import active_embedding_target
+
+    # Only the clients are built: probing the remote APIs would spend quota on every refresh.
+    await run_in_threadpool(get_embeddings)
+    await run_in_threadpool(get_llm)
+    return {"embedding": active_embedding_target().provider, "llm": settings.LLM_PROVIDER}
+
+
+class HealthMonitor:
+    """
+    Run health checks periodically and keep the latest result of each one.
+
+    Args:
+        checks (dict[str, HealthCheck]): Coroutine functions by dependency name; each
+            returns details to report and raises when the dependency is unhealthy.
+        interval (float): Seconds between refreshes.
+        ttl (float): Age after which a result is considered stale.
+        timeout (float): Seconds allowed for each check.
+        timer (Callable[[], float]): Clock used for timestamps.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, HealthCheck],
+        interval: float,
+        ttl: float,
+        timeout: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.ttl = ttl
+        self.timeout = timeout
+        self.timer = timer
+        self.results: dict[str, dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, name: str, check: HealthCheck) -> None:
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(check(), timeout=self.timeout)
+            result = {"status": "ok", **details}
+        except asyncio.TimeoutError:
+            result = {"status": "error", "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["checked_at"] = self.timer()
+        if result["status"] != "ok" and self.results.get(name, {}).get("status") == "ok":
+            logger.warning(f"Health check {name} failed: {result['error']}")
+        self.results[name] = result
+
+    async def refresh(self) -> None:
+        await asyncio.gather(*(self._run(name, check) for name, check in self.checks.items()))
+
+    async def _loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Return the cached results and whether every dependency is healthy.
+
+        Returns:
+            dict[str, Any]: ``ready`` plus one entry per check with status, latency
+            and age in seconds. Checks that never ran are reported as pending.
+        """
+        now = self.timer()
+        checks = {}
+        for name in self.checks:
+            result = self.results.get(name)
+            if result is None:
+                checks[name] = {"status": "pending"}
+                continue
+            entry = {key: value for key, value in result.items() if key != "checked_at"}
+            entry["age_seconds"] = round(now - result["checked_at"], 2)
+            if entry["age_seconds"] > self.ttl:
+                entry["status"] = "stale"
+            checks[name] = entry
+        return {
+            "ready": all(entry["status"] == "ok" for entry in checks.values()),
+            "checks": checks,
+        }
+
+
+health_monitor = HealthMonitor(
+    checks={"mongo": check_mongo, "chroma": check_chroma, "providers": check_providers},
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    ttl=settings.HEALTH_CHECK_TTL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
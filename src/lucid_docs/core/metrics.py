@@ -0,0 +1,276 @@
+"""
+Lightweight in-process metrics exposed in the Prometheus text exposition format.
+
+Histograms and counters are kept per worker in plain Python structures guarded by a
+lock; an observation costs a bisect and a dictionary update, so instrumentation can
+stay on in production. Observations are labeled with the route template of the
+request being served, which `bind_route` stores in a ContextVar that propagates into
+`run_in_threadpool` work and Motor's executor threads.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import Request
+from pymongo import monitoring
+
+from lucid_docs.core.tracing import record_span, span
+
+route_var: ContextVar[str] = ContextVar("route", default="-")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """
+    A monotonically increasing counter with labels.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    A histogram of observed values with fixed buckets and labels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[2] if series else 0
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered together by the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "lucid_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("route", "method", "status"),
+))
+stage_duration = registry.register(Histogram(
+    "lucid_stage_duration_seconds",
+    "Latency of pipeline stages (auth, parse, split, embed, retrieve, generate, ...).",
+    ("stage", "route"),
+))
+mongo_command_duration = registry.register(Histogram(
+    "lucid_mongo_command_duration_seconds",
+    "MongoDB command latency.",
+    ("command", "route"),
+))
+mongo_command_failures = registry.register(Counter(
+    "lucid_mongo_command_failures_total",
+    "MongoDB commands that failed.",
+    ("command", "route"),
+))
+ingested_pages = registry.register(Counter(
+    "lucid_ingested_pages_total",
+    "Pages extracted from uploaded documents.",
+))
+ingested_chunks = registry.register(Counter(
+    "lucid_ingested_chunks_total",
+    "Chunks stored in the vector store.",
+))
+embedded_tokens = registry.register(Counter(
+    "lucid_embedded_tokens_total",
+    "Estimated tokens sent to the embedding model.",
+    ("kind",),
+))
+janitor_reclaimed_bytes = registry.register(Counter(
+    "lucid_janitor_reclaimed_bytes_total",
+    "Disk space freed by the janitor.",
+    ("kind",),
+))
+janitor_deleted_vectors = registry.register(Counter(
+    "lucid_janitor_deleted_vectors_total",
+    "Orphaned chunks removed from the vector store by the janitor.",
+    ("reason",),
+))
+llm_tokens = registry.register(Counter(
+    "lucid_llm_tokens_total",
+    "Tokens reported by the language model.",
+    ("type",),
+))
+llm_requests = registry.register(Counter(
+    "lucid_llm_requests_total",
+    "Language model calls by route (primary, fallback) and outcome (ok, error, timeout, rejected).",
+    ("model", "outcome"),
+))
+llm_hedges = registry.register(Counter(
+    "lucid_llm_hedged_requests_total",
+    "Hedged language model calls, launched and won.",
+    ("outcome",),
+))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage, record it under the current route and open a tracing span.
+
+    Args:
+        name (str): The stage name, e.g. "parse" or "generate".
+    """
+    start = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage=name, route=route_var.get())
+
+
+async def bind_route(request: Request) -> None:
+    """
+    App-level dependency storing the matched route template for metric labels.
+
+    Args:
+        request (Request): The incoming request.
+    """
+    route = request.scope.get("route")
+    route_var.set(getattr(route, "path", request.url.path))
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """
+    pymongo command listener recording the latency of every MongoDB command,
+    both as a metric and as a span of the current request trace.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, command=event.command_name, route=route_var.get()
+        )
+        record_span(f"mongo.{event.command_name}", event.duration_micros * 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, command=event.command_name, route=route_var.get()
+        )
+        mongo_command_failures.inc(command=event.command_name, route=route_var.get())
+        record_span(f"mongo.{event.command_name}", event.duration_micros * 1000, error=True)
+
+
+mongo_metrics_listener = MongoMetricsListener()
+
+
+def render_metrics(extra: Optional[list[str]] = None) -> str:
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Args:
+        extra (Optional[list[str]]): Additional pre-rendered lines, e.g. gauges computed on scrape.
+
+    Returns:
+        str: The exposition text.
+    """
+    text = registry.render()
+    if extra:
+        text += "\n".join(extra) + "\n"
+    return text
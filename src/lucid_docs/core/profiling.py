@@ -0,0 +1,228 @@
+"""
+On-demand cProfile capture of individual requests.
+
+A request is profiled when it carries an `X-Profile: 1` header together with an admin's
+bearer token, or when it is picked by PROFILE_SAMPLE_RATE. `ProfilingMiddleware` then
+profiles the event-loop thread for the duration of the request, and threadpool work
+wrapped with `profiled()` is profiled on its worker thread under the same session.
+The merged profile is written to PROFILE_STORAGE_PATH as `<track_id>.prof`, in the
+format read by `pstats` and tools such as snakeviz.
+
+Requests that are not selected only pay for a header scan and, when sampling is
+enabled, one random number. At most one request per worker is profiled at a time;
+the event-loop profile also includes other coroutines that ran while it was active.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import marshal
+import pstats
+import random
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import jwt
+from anyio import to_thread
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.tracing import track_id_var
+from lucid_docs.dependencies import ALGORITHM, SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+TRACK_ID_PATTERN = re.compile(r"^[0-9a-fA-F-]{36}$")
+
+_session_var: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_active = threading.Lock()
+
+
+class ProfileSession:
+    """
+    The cProfile profilers collected, on any thread, while serving one request.
+    """
+
+    def __init__(self, track_id: str):
+        self.track_id = track_id
+        self._profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        """
+        Profile the current thread for the duration of the block.
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            logger.warning("Another profiler is active on this thread; skipping profile segment.")
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profiles.append(profiler)
+
+    def dump(self) -> bytes:
+        """
+        Merge the collected profiles into the marshal format written by `pstats.Stats.dump_stats`.
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(*profiles)
+        return marshal.dumps(stats.stats)
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a function run in the threadpool so it is profiled when its request is.
+
+    Args:
+        func (Callable): The function to wrap.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _session_var.get()
+        if session is None:
+            return func(*args, **kwargs)
+        with session.profile():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _is_admin_token(headers: list[tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except jwt.InvalidTokenError:
+                return False
+            return payload.get("sub") in settings.ADMIN_USERNAMES
+    return False
+
+
+def should_profile(headers: list[tuple[bytes, bytes]]) -> bool:
+    """
+    Decide whether a request is profiled.
+
+    Args:
+        headers (list[tuple[bytes, bytes]]): The raw ASGI request headers.
+
+    Returns:
+        bool: True if the request asked for profiling with an admin token, or was sampled.
+    """
+    for name, value in headers:
+        if name == PROFILE_HEADER and value in (b"1", b"true"):
+            return _is_admin_token(headers)
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def profile_path(track_id: str) -> Optional[Path]:
+    """
+    Return the stored profile file for a track_id, if any.
+
+    Args:
+        track_id (str): The request's track_id.
+
+    Returns:
+        Optional[Path]: The profile path, or None if the id is malformed or unknown.
+    """
+    if not TRACK_ID_PATTERN.match(track_id):
+        return None
+    path = Path(settings.PROFILE_STORAGE_PATH) / f"{track_id}.prof"
+    return path if path.is_file() else None
+
+
+def list_profiles() -> list[str]:
+    """
+    Return the track_ids of stored profiles, most recent first.
+    """
+    directory = Path(settings.PROFILE_STORAGE_PATH)
+    if not directory.is_dir():
+        return []
+    files = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [path.stem for path in files]
+
+
+def profile_summary(path: Path, limit: int = 40) -> str:
+    """
+    Render the top functions of a stored profile by cumulative time.
+
+    Args:
+        path (Path): The profile file.
+        limit (int, optional): Number of rows to include. Defaults to 40.
+
+    Returns:
+        str: The pstats report.
+    """
+    output = io.StringIO()
+    pstats.Stats(str(path), stream=output).sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+
+def _save_profile(track_id: str, data: bytes) -> None:
+    directory = Path(settings.PROFILE_STORAGE_PATH)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{track_id}.prof").write_bytes(data)
+
+    files = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[settings.PROFILE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests and stores the result under their track_id.
+
+    It must run inside `track_id_middleware` so the track_id is already set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        if not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        track_id = track_id_var.get()
+        session = ProfileSession(track_id)
+        token = _session_var.set(session)
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", track_id.encode())]
+            await send(message)
+
+        try:
+            with session.profile():
+                await self.app(scope, receive, send_with_header)
+        finally:
+            _session_var.reset(token)
+            _active.release()
+            try:
+                await to_thread.run_sync(_save_profile, track_id, session.dump())
+                logger.info(f"Stored request profile for track_id {track_id}")
+            except Exception as e:
+                logger.error(f"Failed to store request profile for track_id {track_id}: {e}")
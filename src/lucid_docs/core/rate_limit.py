@@ -0,0 +1,194 @@
+"""
+Per-user and global rate limiting for chat queries, uploads and embedded tokens.
+
+Limits are expressed in the `limits` notation used by slowapi (e.g. "20/minute") and
+enforced with a moving-window strategy: each bucket allows up to N units in any
+window of the given length, which behaves like a token bucket of capacity N that
+refills over the window. Counters live in process memory by default, or in MongoDB
+when RATE_LIMIT_STORAGE=mongo so that all uvicorn workers share them.
+
+In-flight concurrency caps are tracked per worker. They are checked before the
+buckets are charged, so a request rejected for concurrency does not use up the
+user's allowance.
+"""
+
+import logging
+import math
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Optional
+
+from fastapi import Depends
+from limits import RateLimitItem, parse
+from limits.aio.storage import MemoryStorage, MongoDBStorage, Storage
+from limits.aio.strategies import MovingWindowRateLimiter
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.models.database import User
+
+logger = logging.getLogger(__name__)
+
+CHAT = "chat"
+UPLOAD = "upload"
+EMBED_TOKENS = "embed_tokens"
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a request exceeds a rate limit or concurrency quota.
+
+    Attributes:
+        scope (str): The limited resource, e.g. "chat".
+        detail (str): A user-facing description of the limit.
+        retry_after (int): Seconds until the request may be retried.
+    """
+
+    def __init__(self, scope: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.scope = scope
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Enforces the per-user and global buckets configured in `Settings`.
+    """
+
+    def __init__(self):
+        self._storage: Optional[Storage] = None
+        self._strategy: Optional[MovingWindowRateLimiter] = None
+        self._in_flight: dict[tuple[str, str], int] = defaultdict(int)
+        self.limits: dict[str, tuple[RateLimitItem, RateLimitItem]] = {
+            CHAT: (parse(settings.RATE_LIMIT_CHAT_PER_USER), parse(settings.RATE_LIMIT_CHAT_GLOBAL)),
+            UPLOAD: (parse(settings.RATE_LIMIT_UPLOAD_PER_USER), parse(settings.RATE_LIMIT_UPLOAD_GLOBAL)),
+            EMBED_TOKENS: (
+                parse(settings.RATE_LIMIT_EMBED_TOKENS_PER_USER),
+                parse(settings.RATE_LIMIT_EMBED_TOKENS_GLOBAL),
+            ),
+        }
+        self.concurrency: dict[str, int] = {
+            CHAT: settings.MAX_CONCURRENT_CHATS_PER_USER,
+            UPLOAD: settings.MAX_CONCURRENT_UPLOADS_PER_USER,
+        }
+        self.rejections: dict[str, int] = defaultdict(int)
+
+    @property
+    def strategy(self) -> MovingWindowRateLimiter:
+        if self._strategy is None:
+            if settings.RATE_LIMIT_STORAGE.lower() == "mongo":
+                self._storage = MongoDBStorage(
+                    settings.MONGO_URI.replace("mongodb", "async+mongodb", 1),
+                    database_name=settings.MONGO_DB_NAME,
+                    counter_collection_name="rate_limit_counters",
+                    window_collection_name="rate_limit_windows",
+                )
+            else:
+                self._storage = MemoryStorage()
+            self._strategy = MovingWindowRateLimiter(self._storage)
+        return self._strategy
+
+    async def hit(self, scope: str, username: str, cost: int = 1) -> None:
+        """
+        Consume `cost` units from the user's and the global bucket for `scope`.
+
+        Both buckets are checked before either is charged, so a request rejected by
+        the global limit does not use up the user's allowance.
+
+        Args:
+            scope (str): The limited resource (CHAT, UPLOAD or EMBED_TOKENS).
+            username (str): The user making the request.
+            cost (int, optional): Units to consume. Defaults to 1.
+
+        Raises:
+            RateLimitExceeded: If either bucket does not have `cost` units left.
+        """
+        if not settings.RATE_LIMIT_ENABLED or cost <= 0:
+            return
+
+        per_user, global_ = self.limits[scope]
+        buckets = ((per_user, (scope, "user", username)), (global_, (scope, "global")))
+
+        for item, identifiers in buckets:
+            if cost > item.amount or not await self.strategy.test(item, *identifiers, cost=cost):
+                await self._reject(scope, item, identifiers)
+
+        for item, identifiers in buckets:
+            if not await self.strategy.hit(item, *identifiers, cost=cost):
+                await self._reject(scope, item, identifiers)
+
+    async def _reject(self, scope: str, item: RateLimitItem, identifiers: tuple[str, ...]) -> None:
+        stats = await self.strategy.get_window_stats(item, *identifiers)
+        retry_after = max(1, math.ceil(stats.reset_time - time.time()))
+        which = "Global" if identifiers[1] == "global" else "Per-user"
+        self.rejections[scope] += 1
+        logger.warning(f"{which} rate limit {item} exceeded for {scope} by {identifiers[-1]}")
+        raise RateLimitExceeded(scope, f"{which} rate limit exceeded for {scope}: {item}", retry_after)
+
+    @asynccontextmanager
+    async def in_flight(self, scope: str, username: str) -> AsyncIterator[None]:
+        """
+        Hold one of the user's concurrent request slots for `scope`.
+
+        Args:
+            scope (str): The limited resource (CHAT or UPLOAD).
+            username (str): The user making the request.
+
+        Raises:
+            RateLimitExceeded: If the user already has the maximum number of requests in flight.
+        """
+        key = (scope, username)
+        limit = self.concurrency[scope]
+        if settings.RATE_LIMIT_ENABLED and limit > 0 and self._in_flight[key] >= limit:
+            self.rejections[scope] += 1
+            raise RateLimitExceeded(scope, f"Too many concurrent {scope} requests (max {limit})", 1)
+
+        self._in_flight[key] += 1
+        try:
+            yield
+        finally:
+            self._in_flight[key] -= 1
+            if self._in_flight[key] <= 0:
+                del self._in_flight[key]
+
+    def reset(self) -> None:
+        """
+        Drop all counters, e.g. between tests.
+        """
+        self._storage = None
+        self._strategy = None
+        self._in_flight.clear()
+        self.rejections.clear()
+
+
+rate_limiter = RateLimiter()
+
+
+async def limit_chat(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> AsyncIterator[User]:
+    """
+    Dependency enforcing chat query limits and the per-user chat concurrency cap.
+
+    Yields:
+        User: The current active user.
+    """
+    async with rate_limiter.in_flight(CHAT, current_user.username):
+        await rate_limiter.hit(CHAT, current_user.username)
+        yield current_user
+
+
+async def limit_upload(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> AsyncIterator[User]:
+    """
+    Dependency enforcing upload limits and the per-user upload concurrency cap.
+
+    Yields:
+        User: The current active user.
+    """
+    async with rate_limiter.in_flight(UPLOAD, current_user.username):
+        await rate_limiter.hit(UPLOAD, current_user.username)
+        yield current_user
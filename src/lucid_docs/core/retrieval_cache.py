@@ -0,0 +1,126 @@
+"""
+In-process cache of retrieval results.
+
+Follow-up questions in a chat often land in the same neighbourhood of the vector
+store, and dashboards repeat the same searches. Results are cached under the
+user/chat scope, a fingerprint of the query embedding and k, in a size-bounded
+LRU cache with a TTL.
+
+Freshness does not depend on the TTL: every key also carries the scope's
+ingestion version, which is bumped whenever chunks of the scope are added or
+removed, so entries cached before a change are never read again and age out.
+A chat change bumps the chat's version and the user-wide one (queries without a
+chat); a user-level bump invalidates every scope of the user.
+
+Versions live in each worker's memory. With a single worker (WEB_CONCURRENCY=1)
+local bumps are enough. With several, bumps are published to the other workers
+through the same channel as user cache invalidations, and the cache stays off
+unless USER_CACHE_INVALIDATION_CHANNEL is "mongo". The other workers only apply
+a bump on their next poll, so after an upload or deletion they may serve the
+previous results for up to USER_CACHE_INVALIDATION_POLL_SECONDS; the worker that
+handled the change never does.
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Hashable, Optional
+
+import numpy as np
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_CACHE_NAME = "retrieval"
+ANY_CHAT = "*"
+
+retrieval_cache = TTLCache(
+    max_size=settings.RETRIEVAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+_versions: dict[tuple[str, Optional[str]], int] = {}
+_versions_lock = threading.Lock()
+
+
+def retrieval_cache_enabled() -> bool:
+    """
+    Return whether retrieval results may be cached: RETRIEVAL_CACHE_ENABLED and
+    version bumps reach every worker (a single worker, or the "mongo" channel).
+    """
+    return settings.RETRIEVAL_CACHE_ENABLED and (
+        settings.WEB_CONCURRENCY <= 1 or settings.USER_CACHE_INVALIDATION_CHANNEL.lower() == "mongo"
+    )
+
+
+def scope_version(username: str, chat_id: Optional[str] = None) -> tuple[int, int]:
+    """
+    Return the current ingestion version of a retrieval scope.
+
+    Read it before searching: results are then cached under the version they may
+    already be stale for, never under a newer one.
+
+    Args:
+        username (str): The user owning the chunks.
+        chat_id (Optional[str]): The chat, or None for the user's whole collection.
+
+    Returns:
+        tuple[int, int]: The user-level version and the chat (or any-chat) version.
+    """
+    with _versions_lock:
+        return _versions.get((username, None), 0), _versions.get((username, chat_id or ANY_CHAT), 0)
+
+
+def bump_version(username: str, chat_id: Optional[str] = None) -> None:
+    """
+    Invalidate this worker's cached results for a chat, or for every scope of the user.
+
+    Args:
+        username (str): The user whose chunks changed.
+        chat_id (Optional[str]): The chat whose chunks changed, or None when unknown.
+    """
+    with _versions_lock:
+        keys = [(username, chat_id), (username, ANY_CHAT)] if chat_id else [(username, None)]
+        for key in keys:
+            _versions[key] = _versions.get(key, 0) + 1
+
+
+async def invalidate_scope(username: str, chat_id: Optional[str] = None, publish: bool = True) -> None:
+    """
+    Bump the scope's version locally and, if enabled, on the other workers.
+
+    Args:
+        username (str): The user whose chunks changed.
+        chat_id (Optional[str]): The chat whose chunks changed, or None when unknown.
+        publish (bool, optional): Whether to broadcast the bump over the
+            cross-worker channel. Defaults to True.
+    """
+    bump_version(username, chat_id)
+
+    if not publish or settings.USER_CACHE_INVALIDATION_CHANNEL.lower() != "mongo":
+        return
+
+    try:
+        await database.get_collection("cache_invalidations").insert_one({
+            "cache": RETRIEVAL_CACHE_NAME,
+            "key": [username, chat_id],
+            "created_at": datetime.now(timezone.utc),
+        })
+    except Exception as e:
+        logger.error(f"Failed to publish retrieval cache invalidation for user {username}: {e}")
+
+
+def fingerprint(embedding: list[float]) -> str:
+    """
+    Hash a query embedding, rounded so float noise between identical queries does not matter.
+    """
+    rounded = np.round(np.asarray(embedding, dtype=np.float32), 5)
+    return hashlib.blake2b(rounded.tobytes(), digest_size=16).hexdigest()
+
+
+def retrieval_key(username: str, chat_id: Optional[str], version: tuple[int, int], embedding: list[float], k: int) -> Hashable:
+    return username, chat_id, version, fingerprint(embedding), k
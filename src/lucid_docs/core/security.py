@@ -1,3 +1,6 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any, Optional
 
@@ -9,7 +12,14 @@ from lucid_docs.models.database import User, UserInDB
 from lucid_docs.dependencies import pwd_context
 from lucid_docs.dependencies import SECRET_KEY, ALGORITHM
 from lucid_docs.dependencies import oauth2_scheme
+from lucid_docs.core.config import settings
+from lucid_docs.core.metrics import stage
 from lucid_docs.core.database import database
+from lucid_docs.core.user_cache import cache_user, get_cached_user, invalidate_user
+
+logger = logging.getLogger(__name__)
+
+hash_executor: Optional[Executor] = None  # Global variable to hold the password hashing executor
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -39,9 +49,89 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and produce a replacement hash if the stored one is deprecated.
+
+    Args:
+        plain_password (str): The plain text password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        tuple[bool, Optional[str]]: Whether the password matches, and a new hash when the
+            stored hash uses a deprecated scheme or a lower work factor than configured.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def get_hash_executor() -> Executor:
+    """
+    Return the bounded executor used for bcrypt work, creating it on first use.
+
+    bcrypt releases the GIL, so a small thread pool is enough to keep hashing off the
+    event loop; a process pool can be selected with PASSWORD_HASH_EXECUTOR=process.
+
+    Returns:
+        Executor: The password hashing executor.
+    """
+    global hash_executor
+    if hash_executor:
+        return hash_executor
+
+    if settings.PASSWORD_HASH_EXECUTOR.lower() == "process":
+        hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    else:
+        hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    """
+    Shut down the password hashing executor, if it was started.
+    """
+    global hash_executor
+    if hash_executor:
+        hash_executor.shutdown(wait=False, cancel_futures=True)
+        hash_executor = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing executor without blocking the event loop.
+
+    Args:
+        plain_password (str): The plain text password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        tuple[bool, Optional[str]]: Whether the password matches, and a replacement hash if needed.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the hashing executor without blocking the event loop.
+
+    Args:
+        password (str): The plain text password.
+
+    Returns:
+        str: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
+
+
 async def get_user(username: str) -> Optional[UserInDB]:
     """
-    Retrieve a user from the database by username.
+    Retrieve a user by username, serving it from the user cache when possible.
 
     Args:
         username (str): The user's username.
@@ -49,13 +139,36 @@ async def get_user(username: str) -> Optional[UserInDB]:
     Returns:
         Optional[UserInDB]: The user object if found, None otherwise.
     """
+    user = get_cached_user(username)
+    if user is not None:
+        return user
+
     users_collection = database.get_collection("users")
     user_data = await users_collection.find_one({"username": username})
     if user_data is not None:
-        return UserInDB(**user_data)
+        user = UserInDB(**user_data)
+        cache_user(user)
+        return user
     return None
 
 
+async def update_user(username: str, fields: dict[str, Any]) -> bool:
+    """
+    Update a user's stored fields and invalidate the cached record on every worker.
+
+    Args:
+        username (str): The user's username.
+        fields (dict[str, Any]): The fields to set, e.g. {"disabled": True}.
+
+    Returns:
+        bool: True if a user matched the username, False otherwise.
+    """
+    users_collection = database.get_collection("users")
+    result = await users_collection.update_one({"username": username}, {"$set": fields})
+    await invalidate_user(username)
+    return result.matched_count > 0
+
+
 async def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
     """
     Authenticate a user by verifying the username and password.
@@ -70,8 +183,13 @@ async def authenticate_user(username: str, password: str) -> Optional[UserInDB]:
     user = await get_user(username)
     if not user:
         return None
-    if not verify_password(password, user.password):
+    valid, new_hash = await verify_password_async(password, user.password)
+    if not valid:
         return None
+    if new_hash:
+        logger.info(f"Rehashing deprecated password hash for user: {username}")
+        await update_user(username, {"password": new_hash})
+        user = user.model_copy(update={"password": new_hash})
     return user
 
 
@@ -114,15 +232,16 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> Use
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
+    with stage("auth"):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+            token_data = TokenData(username=username)
+        except InvalidTokenError:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except InvalidTokenError:
-        raise credentials_exception
-    user = await get_user(username=token_data.username)
+        user = await get_user(username=token_data.username)
     if user is None:
         raise credentials_exception
     return user
@@ -145,4 +264,24 @@ async def get_current_active_user(
     """
     if current_user.disabled:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_current_admin_user(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> User:
+    """
+    Ensure that the current user is an administrator.
+
+    Args:
+        current_user (Annotated[User, Depends(get_current_active_user)]): The current active user.
+
+    Raises:
+        HTTPException: If the user is not listed in ADMIN_USERNAMES.
+
+    Returns:
+        User: The current admin user.
+    """
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
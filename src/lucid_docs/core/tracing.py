@@ -0,0 +1,286 @@
+"""
+Lightweight in-process request tracing.
+
+`track_id_middleware` opens a trace for every request whose trace id is the request's
+track_id. Code paths open nested spans with `span()`; the active trace and span live in
+ContextVars, so spans opened inside `run_in_threadpool` work and Motor's executor
+threads attach to the right parent. Finished traces are kept in a small in-memory
+buffer for lookup by track_id, summarized in a `Server-Timing` response header, and
+optionally appended to a file as OTLP-compatible JSON lines.
+"""
+
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from lucid_docs.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+    """
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+
+class Trace:
+    """
+    The spans recorded while serving a single request.
+    """
+
+    def __init__(self, trace_id: str, name: str, **attributes: Any):
+        self.trace_id = trace_id
+        self.root = Span(name, _new_span_id(), None, time.time_ns(), attributes=attributes)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def server_timing(self) -> str:
+        """
+        Summarize span durations by name as a `Server-Timing` header value.
+
+        Returns:
+            str: e.g. "auth;dur=2.1, retrieve;dur=40.3, total;dur=51.0".
+        """
+        totals: OrderedDict[str, float] = OrderedDict()
+        with self._lock:
+            spans = list(self.spans)
+        for span in sorted(spans, key=lambda s: s.start_ns):
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Return a readable representation of the trace, spans ordered by start time.
+        """
+        with self._lock:
+            spans = sorted([self.root, *self.spans], key=lambda s: s.start_ns)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "offset_ms": round((span.start_ns - self.root.start_ns) / 1_000_000, 3),
+                    "duration_ms": round(span.duration_ms, 3),
+                    "attributes": span.attributes,
+                }
+                for span in spans
+            ],
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        """
+        Return the trace in the OTLP/JSON `ResourceSpans` layout.
+        """
+        trace_id = self.trace_id.replace("-", "")
+        with self._lock:
+            spans = [self.root, *self.spans]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", settings.PROJECT_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "lucid_docs"},
+                    "spans": [
+                        {
+                            "traceId": trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 2 if span is self.root else 1,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                        }
+                        for span in spans
+                    ],
+                }],
+            }],
+        }
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+track_id_var: ContextVar[str] = ContextVar("track_id", default="-")
+_trace_var: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_span_var: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace_var.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a span as a child of the current span. Does nothing outside of a trace.
+
+    Args:
+        name (str): The span name, e.g. "retrieve".
+        **attributes: Extra attributes stored on the span.
+
+    Yields:
+        Optional[Span]: The open span, or None when no trace is active.
+    """
+    trace = _trace_var.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _span_var.get() or trace.root
+    current = Span(name, _new_span_id(), parent.span_id, time.time_ns(), attributes=attributes)
+    token = _span_var.set(current)
+    try:
+        yield current
+    finally:
+        current.end_ns = time.time_ns()
+        _span_var.reset(token)
+        trace.add(current)
+
+
+def record_span(name: str, duration_ns: int, **attributes: Any) -> None:
+    """
+    Record an already finished operation that ended now, e.g. from a driver callback.
+
+    Args:
+        name (str): The span name.
+        duration_ns (int): How long the operation took, in nanoseconds.
+        **attributes: Extra attributes stored on the span.
+    """
+    trace = _trace_var.get()
+    if trace is None:
+        return
+    parent = _span_var.get() or trace.root
+    end_ns = time.time_ns()
+    trace.add(Span(name, _new_span_id(), parent.span_id, end_ns - duration_ns, end_ns, attributes))
+
+
+class TraceStore:
+    """
+    Bounded buffer of recently finished traces, looked up by track_id.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._traces: OrderedDict[str, Trace] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            while len(self._traces) > self.max_size:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(trace_id)
+
+
+class TraceExporter:
+    """
+    Appends finished traces as OTLP JSON lines to a file from a background thread.
+
+    Traces are handed over through a bounded queue; when the writer falls behind,
+    new traces are dropped and counted rather than blocking request handling.
+    """
+
+    def __init__(self, path: str, max_queue: int = 1000):
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, trace: Trace) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as sink:
+            while True:
+                trace = self._queue.get()
+                try:
+                    sink.write(json.dumps(trace.to_otlp()) + "\n")
+                    if self._queue.empty():
+                        sink.flush()
+                except Exception as e:
+                    logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+trace_store = TraceStore(settings.TRACE_BUFFER_SIZE)
+trace_exporter: Optional[TraceExporter] = TraceExporter(settings.TRACE_EXPORT_PATH) if settings.TRACE_EXPORT_PATH else None
+
+
+@contextmanager
+def trace_request(trace_id: str, name: str, **attributes: Any) -> Iterator[Optional[Trace]]:
+    """
+    Open the root span for a request and publish the trace when it finishes.
+
+    Args:
+        trace_id (str): The request's track_id.
+        name (str): The root span name, e.g. "POST /chat/".
+        **attributes: Extra attributes stored on the root span.
+
+    Yields:
+        Optional[Trace]: The request trace, or None when tracing is disabled.
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    trace = Trace(trace_id, name, **attributes)
+    trace_token = _trace_var.set(trace)
+    span_token = _span_var.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _span_var.reset(span_token)
+        _trace_var.reset(trace_token)
+        trace_store.add(trace)
+        if trace_exporter is not None:
+            trace_exporter.export(trace)
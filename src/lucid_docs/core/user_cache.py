@@ -0,0 +1,156 @@
+"""
+In-process cache of authenticated user records.
+
+Every authenticated request resolves its user through `get_current_user`. This module
+keeps recently loaded `UserInDB` records in a size-bounded TTL cache so that most
+requests avoid a MongoDB round-trip, and optionally propagates invalidations to the
+other uvicorn workers through a MongoDB collection that each worker polls.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.core.retrieval_cache import RETRIEVAL_CACHE_NAME, bump_version
+from lucid_docs.models.database import UserInDB
+from lucid_docs.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATIONS_COLLECTION = "cache_invalidations"
+USERS_CACHE_NAME = "users"
+
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_user(username: str) -> Optional[UserInDB]:
+    """
+    Return the cached user record for `username`, if present and fresh.
+
+    Args:
+        username (str): The user's username.
+
+    Returns:
+        Optional[UserInDB]: The cached user, or None on a miss.
+    """
+    return user_cache.get(username)
+
+
+def cache_user(user: UserInDB) -> None:
+    """
+    Store a user record in the cache.
+
+    Args:
+        user (UserInDB): The user record loaded from the database.
+    """
+    user_cache.set(user.username, user)
+
+
+async def invalidate_user(username: str, publish: bool = True) -> None:
+    """
+    Drop a user from the local cache and, if enabled, notify the other workers.
+
+    Args:
+        username (str): The user's username.
+        publish (bool, optional): Whether to broadcast the invalidation over the
+            cross-worker channel. Defaults to True.
+    """
+    user_cache.invalidate(username)
+
+    if not publish or settings.USER_CACHE_INVALIDATION_CHANNEL.lower() != "mongo":
+        return
+
+    try:
+        await database.get_collection(INVALIDATIONS_COLLECTION).insert_one({
+            "cache": USERS_CACHE_NAME,
+            "key": username,
+            "created_at": datetime.now(timezone.utc),
+        })
+    except Exception as e:
+        logger.error(f"Failed to publish cache invalidation for user {username}: {e}")
+
+
+class InvalidationListener:
+    """
+    Background task that applies user and retrieval cache invalidations published by other workers.
+
+    Invalidations are stored in the `cache_invalidations` collection and polled by
+    creation time. The polling window overlaps slightly with the previous one so that
+    clock skew between workers never loses an event; the ids of the events applied
+    within that overlap are remembered so that each event is applied only once (a
+    re-applied retrieval invalidation would flush the scope's cache again).
+    """
+
+    def __init__(self, poll_seconds: float = settings.USER_CACHE_INVALIDATION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._last_seen = datetime.now(timezone.utc)
+        self._applied: dict[Any, datetime] = {}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("User cache invalidation listener started.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("User cache invalidation listener stopped.")
+
+    async def poll_once(self) -> int:
+        """
+        Fetch and apply the invalidations published since the last poll.
+
+        Returns:
+            int: The number of new invalidation events applied.
+        """
+        since = self._last_seen - timedelta(seconds=self.poll_seconds)
+        cursor = database.get_collection(INVALIDATIONS_COLLECTION).find(
+            {"cache": {"$in": [USERS_CACHE_NAME, RETRIEVAL_CACHE_NAME]}, "created_at": {"$gte": since}},
+            {"cache": 1, "key": 1, "created_at": 1},
+        )
+        events = await cursor.to_list(length=None)
+        applied = 0
+        for event in events:
+            if event["_id"] in self._applied:
+                continue
+            if event.get("cache") == RETRIEVAL_CACHE_NAME:
+                bump_version(*event["key"])
+            else:
+                user_cache.invalidate(event["key"])
+            applied += 1
+            created_at = event["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            self._applied[event["_id"]] = created_at
+            if created_at > self._last_seen:
+                self._last_seen = created_at
+
+        # Events older than the next window can no longer be returned.
+        horizon = self._last_seen - timedelta(seconds=self.poll_seconds)
+        self._applied = {key: created_at for key, created_at in self._applied.items() if created_at >= horizon}
+        return applied
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User cache invalidation poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+
+invalidation_listener = InvalidationListener()
@@ -6,17 +6,36 @@ including authentication with OAuth2, password hashing, database connections (Mo
 and integration with language models and vector databases.
 """
 
+import logging
 import os
+import time
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from langchain_chroma import Chroma
-from chromadb import PersistentClient
+from langchain_core.embeddings import Embeddings
 from lucid_docs.core.config import settings
-from lucid_docs.core.database import get_users_collection, get_messages_collection
-
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from lucid_docs.core.metrics import embedded_tokens, stage
+from lucid_docs.core.retrieval_cache import retrieval_cache
+from lucid_docs.utils.text import estimate_tokens
+from lucid_docs.core.database import (
+    get_conversations_collection,
+    get_documents_collection,
+    get_jobs_collection,
+    get_usage_collection,
+    get_messages_collection,
+    get_users_collection,
+)
+from lucid_docs.services.providers import (
+    EmbeddingTarget,
+    active_embedding_target,
+    create_embeddings,
+    set_active_embedding_target,
+)
+from lucid_docs.services.resilient_llm import create_resilient_llm
+from lucid_docs.services.vector_store import create_vector_client
+
+logger = logging.getLogger(__name__)
 
 # Application secret key and algorithm used for token generation.
 # use openssl to generate a secure key:
@@ -24,64 +43,172 @@ from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmb
 SECRET_KEY = os.getenv('SECRET_KEY', 'acc16580347786582c001ac2d186dd4a52791d9ba1674974dcbf5ba302b0f6e0')
 ALGORITHM = os.getenv('ALGORITHM', 'HS256')
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context using bcrypt. Hashes below the configured work factor
+# are reported as needing an update so they can be rehashed on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
 # OAuth2 token scheme for authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that records embedding latency and estimated token volume.
+    """
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        embedded_tokens.inc(sum(estimate_tokens(text) for text in texts), kind="document")
+        with stage("embed_documents"):
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        embedded_tokens.inc(estimate_tokens(text), kind="query")
+        with stage("embed_query"):
+            return self.inner.embed_query(text)
+
+
 embeddings = None  # Global variable to hold the embeddings service instance
 
 def get_embeddings():
-    # Initialize embeddings service for Google Generative AI
+    # Initialize embeddings service for the active embedding provider and model
     global embeddings
 
     if embeddings:
         return embeddings
 
-    embeddings = GoogleGenerativeAIEmbeddings(
-        model=settings.EMBEDDING_MODEL,
-        google_api_key=settings.GEMINI_API_KEY
-    )
+    embeddings = InstrumentedEmbeddings(create_embeddings())
     return embeddings
 
 llm = None  # Global variable to hold the language model instance
 
 def get_llm():
-    # Initialize language model for Google Generative AI
+    # Initialize language model for the configured LLM_PROVIDER, with its deadlines,
+    # circuit breaker and optional fallback model
     global llm
     if llm:
         return llm
 
-    llm = ChatGoogleGenerativeAI(
-        model=settings.LLM_MODEL,
-        google_api_key=settings.GEMINI_API_KEY,
-        temperature=0
-    )
+    llm = create_resilient_llm()
     return llm
 
+vector_client = None  # Global variable to hold the Chroma client shared by all collections
+
+def get_vector_client():
+    global vector_client
+    if vector_client is None:
+        # Client for the configured VECTOR_STORE_MODE: embedded, Chroma server or writer process
+        vector_client = create_vector_client()
+    return vector_client
+
 chroma = None  # Global variable to hold the Chroma instance
 
+def build_vector_store(target: EmbeddingTarget, embedding_function: Embeddings = None):
+    """
+    Create a langchain Chroma store for an embedding target on the shared client.
+
+    Args:
+        target (EmbeddingTarget): Provider, model and collection of the store.
+        embedding_function (Embeddings, optional): Embeddings to use; built for the
+            target when omitted.
+
+    Returns:
+        Chroma: The vector store.
+    """
+    # langchain_chroma (and chromadb through it) accounts for most of the import time
+    # of the application, so it is loaded with the first client instead of at import.
+    from langchain_chroma import Chroma
+
+    if embedding_function is None:
+        embedding_function = InstrumentedEmbeddings(create_embeddings(target.provider, target.model))
+    return Chroma(
+        client=get_vector_client(),
+        collection_name=target.collection,
+        embedding_function=embedding_function
+    )
+
 def get_chroma():
     global chroma
     if chroma:
         return chroma
 
-    # Persistent client for Chroma
-    client = PersistentClient(path=settings.CHROMA_PERSIST_DIR)
-
-    # Chroma instance linking the persistent client with the embeddings function for document collections
-    chroma = Chroma(
-        client=client,
-        collection_name=settings.CHROMA_COLLECTION_NAME,
-        embedding_function=get_embeddings()
-    )
+    # Chroma instance linking the client with the embeddings function for document collections
+    chroma = build_vector_store(active_embedding_target(), get_embeddings())
     return chroma
 
 
+def activate_embedding_target(target: EmbeddingTarget) -> None:
+    """
+    Serve embeddings and vector queries from another target, e.g. after a migration.
+
+    The new clients are built before the globals are replaced, so concurrent
+    requests see either the old pair or the new one.
+    """
+    global embeddings, chroma
+    if target == active_embedding_target() and chroma is not None:
+        return
+    new_embeddings = InstrumentedEmbeddings(create_embeddings(target.provider, target.model))
+    new_chroma = build_vector_store(target, new_embeddings)
+    set_active_embedding_target(target)
+    embeddings, chroma = new_embeddings, new_chroma
+    # Cached results were found with the previous model's query embeddings.
+    retrieval_cache.clear()
+    logger.info(f"Embedding target switched to {target.provider}/{target.model} ({target.collection})")
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Initialize the embeddings, LLM and Chroma clients and load the vector index.
+
+    Called once per worker during startup so the first request does not pay for
+    client creation. The HNSW index is loaded by querying with a stored vector,
+    which avoids a call to the embedding provider.
+
+    Returns:
+        dict[str, float]: Seconds spent on each step.
+    """
+    timings = {}
+    for name, factory in (("embeddings", get_embeddings), ("llm", get_llm), ("chroma", get_chroma)):
+        start = time.perf_counter()
+        factory()
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    collection = get_chroma()._collection
+    sample = collection.peek(limit=1)
+    if len(sample["ids"]):
+        collection.query(query_embeddings=[sample["embeddings"][0]], n_results=1)
+    timings["index"] = round(time.perf_counter() - start, 3)
+
+    logger.info(f"Warm-up completed: {timings}")
+    return timings
+
+
 async def get_users_collection_dep() -> AsyncIOMotorClient:
     return await get_users_collection()
 
 
 async def get_messages_collection_dep() -> AsyncIOMotorClient:
-    return await get_messages_collection()
\ No newline at end of file
+    return await get_messages_collection()
+
+
+async def get_documents_collection_dep() -> AsyncIOMotorClient:
+    return await get_documents_collection()
+
+
+async def get_jobs_collection_dep() -> AsyncIOMotorClient:
+    return await get_jobs_collection()
+
+
+async def get_usage_collection_dep() -> AsyncIOMotorClient:
+    return await get_usage_collection()
+
+
+async def get_conversations_collection_dep() -> AsyncIOMotorClient:
+    return await get_conversations_collection()
@@ -1,35 +1,55 @@
 import os
 import uuid
+import asyncio
+import atexit
 import logging
+import queue
 import sys
+import time
+import zlib
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from pathlib import Path
 from contextlib import asynccontextmanager
-from contextvars import ContextVar
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from pythonjsonlogger import json as jsonlogger
 
-from lucid_docs.routers import upload, query, authentication
+from lucid_docs.routers import upload, query, documents, authentication, admin, usage
+from lucid_docs.dependencies import warm_up
+from lucid_docs.services.embedding_migration import embedding_migrator
+from lucid_docs.services.janitor import janitor
+from lucid_docs.services.providers import active_embedding_target
+from lucid_docs.services.resilient_llm import llm_status
+from lucid_docs.services.vector_store import describe_vector_store
 from lucid_docs.core.config import settings
 from lucid_docs.core.database import database
-
-
-track_id_var: ContextVar[str] = ContextVar("track_id", default="-")
+from lucid_docs.core.health import health_monitor
+from lucid_docs.core.security import shutdown_hash_executor
+from lucid_docs.core.rate_limit import RateLimitExceeded, rate_limiter
+from lucid_docs.core.circuit_breaker import CLOSED, STATE_VALUES
+from lucid_docs.core.metrics import bind_route, http_request_duration, render_metrics, route_var
+from lucid_docs.core.tracing import trace_request, track_id_var
+from lucid_docs.core.profiling import ProfilingMiddleware
+from lucid_docs.core.retrieval_cache import retrieval_cache, retrieval_cache_enabled
+from lucid_docs.core.user_cache import invalidation_listener, user_cache
 
 
 class PlainTextFormatter(logging.Formatter):
     """
     Custom formatter for plain text logs.
     """
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - [track_id: %(track_id)s] - %(message)s")
+
     def format(self, record):
         if not hasattr(record, 'track_id'):
             record.track_id = track_id_var.get()
-
-        log_fmt = "%(asctime)s - %(name)s - %(levelname)s - [track_id: %(track_id)s] - %(message)s"
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        return super().format(record)
 
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
@@ -38,7 +58,7 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """
     def add_fields(self, log_record, record, message_dict):
         super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
-        log_record['track_id'] = track_id_var.get()
+        log_record['track_id'] = getattr(record, 'track_id', track_id_var.get())
         if log_record.get('level'):
             log_record['level'] = log_record['level'].upper()
         else:
@@ -50,14 +70,83 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         log_record['lineno'] = record.lineno
 
 
-def setup_logging(log_level_str: str = "INFO", log_format: str = "plain"):
+class RequestContextFilter(logging.Filter):
+    """
+    Filter that captures the request's track_id on the logging thread and samples INFO logs per route.
+
+    Records are formatted by the queue listener thread, where the request ContextVars are
+    not visible, so the track_id is copied onto the record here. When a sampling rate is
+    configured for the current route, INFO records are kept only for that fraction of
+    requests; the decision is derived from the track_id so a request is logged either
+    completely or not at all.
+    """
+    def __init__(self, sampling_rates: Optional[dict[str, float]] = None):
+        super().__init__()
+        self.sampling_rates = sampling_rates or {}
+
+    def filter(self, record):
+        track_id = track_id_var.get()
+        record.track_id = track_id
+        if record.levelno == logging.INFO and self.sampling_rates:
+            rate = self.sampling_rates.get(route_var.get())
+            if rate is not None and zlib.crc32(track_id.encode()) % 10000 >= rate * 10000:
+                return False
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops and counts records when the bounded queue is full
+    instead of blocking the caller.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+log_queue_handler: Optional[DroppingQueueHandler] = None
+log_listener: Optional[QueueListener] = None
+
+
+def stop_logging():
+    """
+    Stop the background log writer, flushing the records still in the queue.
+    """
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+
+def setup_logging(
+    log_level_str: str = "INFO",
+    log_format: str = "plain",
+    queue_size: int = 10000,
+    sampling_rates: Optional[dict[str, float]] = None,
+):
     """
     Set up logging configuration with the given log level and format.
 
+    Records are put on a bounded queue by the calling thread and formatted and written
+    to stdout by a background QueueListener thread, so a slow log collector never
+    blocks request handling.
+
     Args:
         log_level_str (str): Logging level as a string (default is "INFO").
         log_format (str): Format of the log output ("plain" or "json").
+        queue_size (int): Maximum number of records waiting to be written; further
+            records are dropped and counted.
+        sampling_rates (Optional[dict[str, float]]): Fraction of requests whose INFO
+            logs are kept, by route template.
     """
+    global log_queue_handler, log_listener
+
     log_level = getattr(logging, log_level_str.upper(), logging.INFO)
 
     logger = logging.getLogger()
@@ -65,6 +154,7 @@ def setup_logging(log_level_str: str = "INFO", log_format: str = "plain"):
 
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    stop_logging()
 
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(log_level)
@@ -77,7 +167,14 @@ def setup_logging(log_level_str: str = "INFO", log_format: str = "plain"):
         formatter = PlainTextFormatter()
 
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+
+    log_queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    log_queue_handler.setLevel(log_level)
+    log_queue_handler.addFilter(RequestContextFilter(sampling_rates))
+    logger.addHandler(log_queue_handler)
+
+    log_listener = QueueListener(log_queue_handler.queue, handler, respect_handler_level=True)
+    log_listener.start()
 
     logging.getLogger("uvicorn.access").propagate = False
     logging.getLogger("uvicorn.error").propagate = True
@@ -86,7 +183,10 @@ def setup_logging(log_level_str: str = "INFO", log_format: str = "plain"):
 
 async def track_id_middleware(request: Request, call_next):
     """
-    Middleware that assigns a unique track_id to each request for logging.
+    Middleware that assigns a unique track_id to each request for logging and tracing.
+
+    The request is traced under its track_id, and the per-stage timing summary is
+    returned in the `Server-Timing` header.
 
     Args:
         request (Request): The incoming request.
@@ -98,13 +198,89 @@ async def track_id_middleware(request: Request, call_next):
     request_track_id = str(uuid.uuid4())
     token = track_id_var.set(request_track_id)
 
-    response: Response = await call_next(request)
+    with trace_request(request_track_id, f"{request.method} {request.url.path}") as trace:
+        response: Response = await call_next(request)
+        if trace is not None:
+            response.headers["Server-Timing"] = trace.server_timing()
     response.headers["X-Track-ID"] = request_track_id
 
     track_id_var.reset(token)
     return response
 
 
+async def metrics_middleware(request: Request, call_next):
+    """
+    Middleware that records the latency of each request, labeled by route template.
+
+    Args:
+        request (Request): The incoming request.
+        call_next: Callable to process the next middleware or endpoint.
+
+    Returns:
+        Response: The response from the endpoint.
+    """
+    start = time.perf_counter()
+    response: Response = await call_next(request)
+    route = request.scope.get("route")
+    http_request_duration.observe(
+        time.perf_counter() - start,
+        route=getattr(route, "path", "unmatched"),
+        method=request.method,
+        status=str(response.status_code),
+    )
+    return response
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """
+    Translate a RateLimitExceeded error into a 429 response with a Retry-After header.
+
+    Args:
+        request (Request): The incoming request.
+        exc (RateLimitExceeded): The rate limit error.
+
+    Returns:
+        JSONResponse: The 429 response.
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Warm-up states in which a worker may take traffic.
+WARMUP_READY = ("ok", "skipped")
+
+
+async def run_warm_up(app: FastAPI) -> bool:
+    """
+    Warm up this worker's clients and record the outcome in `app.state.warmup`.
+
+    Returns:
+        bool: Whether the warm-up succeeded.
+    """
+    try:
+        timings = await run_in_threadpool(warm_up)
+    except Exception as e:
+        logging.error(f"Warm-up failed, clients will be created on first use: {e}")
+        app.state.warmup = {"status": "failed", "error": str(e)}
+        return False
+    app.state.warmup = {"status": "ok", "seconds": timings}
+    return True
+
+
+async def retry_warm_up(app: FastAPI) -> None:
+    """
+    Retry a failed warm-up every HEALTH_CHECK_INTERVAL_SECONDS, so the worker turns
+    ready once its dependencies recover instead of staying out of rotation.
+    """
+    while True:
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+        if await run_warm_up(app):
+            return
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -119,9 +295,13 @@ async def lifespan(app: FastAPI):
     temp_path.mkdir(parents=True, exist_ok=True)
     logging.info(f"Temporary directory: {temp_path.absolute()}")
 
-    chroma_path = Path(settings.CHROMA_PERSIST_DIR)
-    chroma_path.mkdir(parents=True, exist_ok=True)
-    logging.info(f"ChromaDB directory: {chroma_path.absolute()}")
+    vector_store = describe_vector_store()
+    if vector_store["mode"] == "embedded":
+        chroma_path = Path(settings.CHROMA_PERSIST_DIR)
+        chroma_path.mkdir(parents=True, exist_ok=True)
+        logging.info(f"ChromaDB directory: {chroma_path.absolute()}")
+    else:
+        logging.info(f"Vector store mode {vector_store['mode']} at {vector_store['target']}")
 
     try:
         await database.connect()
@@ -130,8 +310,40 @@ async def lifespan(app: FastAPI):
         logging.error(f"Failed to connect to the database: {e}")
         raise
 
+    if settings.USER_CACHE_INVALIDATION_CHANNEL.lower() == "mongo":
+        invalidation_listener.start()
+    elif settings.RETRIEVAL_CACHE_ENABLED and not retrieval_cache_enabled():
+        logging.warning(
+            f"Retrieval cache disabled with {settings.WEB_CONCURRENCY} workers: set "
+            "USER_CACHE_INVALIDATION_CHANNEL=mongo so uploads and deletions invalidate the results "
+            "cached by every worker"
+        )
+
+    try:
+        # Pick up the embedding model switched to by a past migration before warming up.
+        await embedding_migrator.sync_active_target()
+    except Exception as e:
+        logging.error(f"Failed to load the active embedding model: {e}")
+
+    app.state.warmup = {"status": "skipped"}
+    warmup_retry: Optional[asyncio.Task] = None
+    if settings.WARMUP_ENABLED and not await run_warm_up(app):
+        warmup_retry = asyncio.create_task(retry_warm_up(app))
+
+    health_monitor.start()
+    embedding_migrator.start()
+    if settings.JANITOR_ENABLED:
+        janitor.start()
+
     yield
 
+    if warmup_retry is not None:
+        warmup_retry.cancel()
+    await janitor.stop()
+    await embedding_migrator.stop()
+    await health_monitor.stop()
+    await invalidation_listener.stop()
+    shutdown_hash_executor()
     await database.disconnect()
     logging.info("Application terminated")
     
@@ -139,7 +351,13 @@ async def lifespan(app: FastAPI):
 LOG_FORMAT = os.getenv("LOG_FORMAT", "plain")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
-setup_logging(log_level_str=LOG_LEVEL, log_format=LOG_FORMAT)
+setup_logging(
+    log_level_str=LOG_LEVEL,
+    log_format=LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sampling_rates=settings.LOG_SAMPLING_RATES,
+)
+atexit.register(stop_logging)
 
 root_logger = logging.getLogger()
 root_logger.info(f"Application starting with log format: {LOG_FORMAT} and log level: {LOG_LEVEL}")
@@ -154,28 +372,111 @@ def create_app() -> FastAPI:
     """
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        lifespan=lifespan
+        lifespan=lifespan,
+        dependencies=[Depends(bind_route)] if settings.METRICS_ENABLED else []
     )
 
+    app.add_middleware(ProfilingMiddleware)
+    if settings.METRICS_ENABLED:
+        app.middleware("http")(metrics_middleware)
     app.middleware("http")(track_id_middleware)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
     app.include_router(upload.router)
     app.include_router(query.router)
+    app.include_router(documents.router)
     app.include_router(authentication.router)
+    app.include_router(admin.router)
+    app.include_router(usage.router)
 
     @app.get("/health")
-    async def health_check():
+    async def health_check(request: Request):
         """
         Health check endpoint to confirm the service is running.
+
+        Dependency statuses come from the background health monitor, so this never
+        calls MongoDB or Chroma itself.
         """
+        readiness = health_monitor.snapshot()
         health_info = {
             "status": "ok",
-            "services": {}
+            # "services" keeps its original shape for existing consumers; "checks" has the details.
+            "services": {"database": readiness["checks"]["mongo"]["status"] == "ok"},
+            "checks": readiness["checks"],
+            "warmup": getattr(request.app.state, "warmup", {"status": "pending"}),
+            "vector_store": describe_vector_store(),
+            "embeddings": active_embedding_target().to_dict(),
+            "janitor": janitor.last_report,
+            "caches": {"users": user_cache.stats(), "retrieval": retrieval_cache.stats()},
+            "llm": llm_status(),
+            "rate_limit_rejections": dict(rate_limiter.rejections)
         }
-        db_health = await database.health_check()
-        health_info["services"]["database"] = db_health
-        if not health_info["services"]["database"]:
+        # An open LLM circuit degrades the service without failing readiness:
+        # restarting workers does not help a slow provider.
+        circuits_open = any(route["state"] != CLOSED for route in health_info["llm"].values())
+        if not readiness["ready"] or health_info["warmup"]["status"] == "failed" or circuits_open:
             health_info["status"] = "degraded"
         return health_info
 
+    @app.get("/health/live")
+    async def liveness():
+        """
+        Liveness probe: the process is up and its event loop is responding.
+        """
+        return {"status": "ok"}
+
+    @app.get("/health/ready")
+    async def readiness(request: Request):
+        """
+        Readiness probe answered from the cached dependency checks and the warm-up result.
+
+        Returns 503 until every dependency has been checked successfully within
+        HEALTH_CHECK_TTL_SECONDS, and while the worker's warm-up has failed or not
+        finished, so a cold worker does not take traffic.
+        """
+        snapshot = health_monitor.snapshot()
+        warmup = getattr(request.app.state, "warmup", {"status": "pending"})
+        ready = snapshot["ready"] and warmup["status"] in WARMUP_READY
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={"status": "ready" if ready else "not_ready", **snapshot, "ready": ready, "warmup": warmup},
+        )
+
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        async def metrics():
+            """
+            Expose request, pipeline stage and MongoDB metrics in the Prometheus text format.
+            """
+            extra = []
+            for name, cache in (("user", user_cache), ("retrieval", retrieval_cache)):
+                cache_stats = cache.stats()
+                extra += [
+                    f"# TYPE lucid_{name}_cache_hits_total counter",
+                    f"lucid_{name}_cache_hits_total {cache_stats['hits']}",
+                    f"# TYPE lucid_{name}_cache_misses_total counter",
+                    f"lucid_{name}_cache_misses_total {cache_stats['misses']}",
+                    f"# TYPE lucid_{name}_cache_size gauge",
+                    f"lucid_{name}_cache_size {cache_stats['size']}",
+                ]
+            circuits = llm_status()
+            if circuits:
+                extra.append("# TYPE lucid_llm_circuit_state gauge")
+                extra += [
+                    f'lucid_llm_circuit_state{{model="{name}"}} {STATE_VALUES[route["state"]]}'
+                    for name, route in circuits.items()
+                ]
+                extra.append("# TYPE lucid_llm_circuit_trips_total counter")
+                extra += [
+                    f'lucid_llm_circuit_trips_total{{model="{name}"}} {route["trips"]}'
+                    for name, route in circuits.items()
+                ]
+            if log_queue_handler is not None:
+                extra.append("# TYPE lucid_log_records_dropped_total counter")
+                extra.append(f"lucid_log_records_dropped_total {log_queue_handler.dropped}")
+            extra.append("# TYPE lucid_rate_limit_rejections_total counter")
+            for scope, count in rate_limiter.rejections.items():
+                extra.append(f'lucid_rate_limit_rejections_total{{scope="{scope}"}} {count}')
+            return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
     return app
\ No newline at end of file
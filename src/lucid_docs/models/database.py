@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 from uuid import UUID
 from typing import Optional
 from pydantic import BaseModel, Field, EmailStr, field_validator
@@ -60,6 +61,23 @@ class UserInDB(User):
         return value
 
 
+class MessageUsage(BaseModel):
+    """
+    Model representing the cost and latency of producing an assistant message.
+    """
+    prompt_tokens: int = Field(default=0, description="Tokens sent to the chat model, estimated when the provider reports none")
+    completion_tokens: int = Field(default=0, description="Tokens generated by the chat model")
+    context_chars: int = Field(default=0, description="Characters of retrieved context in the prompt")
+    context_chunks: int = Field(default=0, description="Number of retrieved chunks in the prompt")
+    history_chars: int = Field(default=0, description="Characters of conversation history in the prompt")
+    top_k: int = Field(default=0, description="Requested number of chunks")
+    retrieval_ms: float = Field(default=0.0, description="Time spent embedding the question and searching")
+    generation_ms: float = Field(default=0.0, description="Time spent waiting for the chat model")
+    cache_hit: bool = Field(default=False, description="Whether the retrieval was served from the cache")
+    error: bool = Field(default=False, description="Whether the answer is the generic error message")
+    summary_tokens: int = Field(default=0, description="Tokens of the summary update that followed the answer, in summary history mode")
+
+
 class Message(BaseModel):
     """
     Model representing a message within a conversation.
@@ -83,6 +101,10 @@ class Message(BaseModel):
     timestamp: str = Field(
         description="Timestamp of the message in ISO 8601 format"
     )
+    usage: Optional[MessageUsage] = Field(
+        default=None,
+        description="Token and latency accounting, on assistant messages"
+    )
     
     @field_validator("chat_id")
     def validate_chat_id(cls, value: str | None) -> str | None:
@@ -107,4 +129,43 @@ class Conversation(BaseModel):
     """
     Model representing a conversation between users.
     """
-    messages: list[Message]
\ No newline at end of file
+    messages: list[Message]
+
+class StoredDocument(BaseModel):
+    """
+    Model representing an ingested file in the document registry.
+    """
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    hash_file_name: str = Field(description="Stored file name, also the hash_file_name metadata of its chunks")
+    file_name: str = Field(description="Original file name as uploaded")
+    username: str = Field(description="Owner of the document")
+    chat_id: Optional[str] = Field(default=None, description="Chat the document was uploaded to")
+    page_count: int = Field(default=0)
+    chunks: int = Field(default=0, description="Number of chunks stored in the vector store")
+    status: str = Field(default="ready", description="'ingesting', 'ready' or 'deleting'")
+    revision: int = Field(default=1, description="Number of uploads of this document")
+    created_at: str = Field(description="Timestamp of the ingestion in ISO 8601 format")
+    updated_at: Optional[str] = Field(default=None, description="Timestamp of the latest revision")
+
+
+class DocumentList(BaseModel):
+    """
+    Model representing the documents of a user.
+    """
+    documents: list[StoredDocument]
+
+
+class Job(BaseModel):
+    """
+    Model representing a background job and its progress.
+    """
+    id: str = Field(alias="_id", description="Job identifier")
+    type: str = Field(description="Kind of job, e.g. 'delete_document' or 'delete_chat'")
+    username: str
+    target: str = Field(description="hash_file_name or chat_id the job acts on")
+    status: str = Field(description="'queued', 'running', 'completed' or 'failed'")
+    deleted_chunks: int = Field(default=0)
+    compacted: bool = Field(default=False)
+    error: Optional[str] = Field(default=None)
+    created_at: datetime
+    finished_at: Optional[datetime] = Field(default=None)
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional, Union
 from uuid import UUID
 
 from enum import Enum
@@ -17,6 +18,8 @@ class QueryRequest(BaseModel):
         question (str): The question to be queried.
         top_k (int): Number of relevant chunks to retrieve from the vector database.
         chat_id (str): UUID of the chat to associate the query.
+        history (str | None): Previous turns to include: "none", "turns" or "summary";
+            defaults to CHAT_HISTORY_MODE.
     """
     question: str
     top_k: int = Field(
@@ -28,6 +31,10 @@ class QueryRequest(BaseModel):
     chat_id: str = Field(
         description="UUID of the chat to associate the query"
     )
+    history: Optional[Literal["none", "turns", "summary"]] = Field(
+        default=None,
+        description="Conversation history to include in the prompt; defaults to the server setting"
+    )
 
     @field_validator("chat_id")
     def validate_chat_id(cls, value: str | None) -> str | None:
@@ -78,3 +85,105 @@ class TokenData(BaseModel):
         username (str | None): The username associated with the token (optional).
     """
     username: str | None = None
+
+
+class BulkUserResult(BaseModel):
+    """
+    Model representing the outcome of provisioning a single user in a bulk request.
+
+    Attributes:
+        username (str): The username of the row.
+        status (str): "created", "duplicate" or "error".
+        detail (str | None): Additional information when the row was not created.
+    """
+    username: str
+    status: str
+    detail: str | None = None
+
+
+class BulkUserResponse(BaseModel):
+    """
+    Response model for a bulk user provisioning operation.
+
+    Attributes:
+        created (int): Number of users created.
+        failed (int): Number of rows that were not created.
+        results (list[BulkUserResult]): Per-row results, in request order.
+    """
+    created: int
+    failed: int
+    results: list[BulkUserResult]
+
+
+class EmbeddingMigrationRequest(BaseModel):
+    """
+    Request model for starting an embedding model migration.
+
+    Attributes:
+        provider (str): Registered embedding provider of the new model.
+        model (str): Name of the new embedding model.
+    """
+    provider: str = Field(description="Embedding provider, e.g. 'gemini' or 'hashing'")
+    model: str = Field(min_length=1, description="Embedding model to migrate to")
+
+
+class UsageSummary(BaseModel):
+    """
+    Model representing the accumulated usage of a set of chat answers.
+
+    Attributes:
+        messages (int): Number of answers.
+        prompt_tokens (int): Tokens sent to the chat model.
+        completion_tokens (int): Tokens generated by the chat model.
+        context_chars (int): Characters of retrieved context.
+        context_chunks (int): Retrieved chunks.
+        retrieval_ms (float): Total retrieval time.
+        generation_ms (float): Total generation time.
+        cache_hits (int): Answers whose retrieval was served from the cache.
+        errors (int): Answers that failed.
+        summary_tokens (int): Tokens of the chat summary updates that followed the answers.
+        avg_retrieval_ms (float): Mean retrieval time per answer.
+        avg_generation_ms (float): Mean generation time per answer.
+        cache_hit_ratio (float): Share of answers with a cached retrieval.
+    """
+    messages: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    context_chars: int = 0
+    context_chunks: int = 0
+    retrieval_ms: float = 0.0
+    generation_ms: float = 0.0
+    cache_hits: int = 0
+    errors: int = 0
+    summary_tokens: int = 0
+    avg_retrieval_ms: float = 0.0
+    avg_generation_ms: float = 0.0
+    cache_hit_ratio: float = 0.0
+
+
+class UsageGroup(UsageSummary):
+    """
+    Model representing the usage of one group of a usage report.
+
+    Attributes:
+        key (str | int | None): The day, chat_id, top_k or username of the group.
+    """
+    key: Union[str, int, None]
+
+
+class UsageReport(BaseModel):
+    """
+    Response model for a usage report.
+
+    Attributes:
+        start (str): First day included, YYYY-MM-DD.
+        end (str): Last day included, YYYY-MM-DD.
+        group_by (str): Field the groups are keyed by.
+        totals (UsageSummary): Usage over the whole range.
+        groups (list[UsageGroup]): Usage per group, ordered by key.
+    """
+    start: str
+    end: str
+    group_by: str
+    totals: UsageSummary
+    groups: list[UsageGroup]
@@ -0,0 +1,139 @@
+"""
+Administrative routes for inspecting the behaviour of individual requests.
+"""
+
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from lucid_docs.core.profiling import list_profiles, profile_path, profile_summary
+from lucid_docs.core.security import get_current_admin_user
+from lucid_docs.core.tracing import trace_store
+from lucid_docs.models.database import User
+from lucid_docs.models.schemas import EmbeddingMigrationRequest
+from lucid_docs.services.embedding_migration import MigrationInProgress, get_migration, start_migration
+from lucid_docs.services.providers import active_embedding_target
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/traces/{track_id}")
+async def get_trace(
+    track_id: str,
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """
+    Retrieve the recorded spans of a recent request by its X-Track-ID.
+
+    Args:
+        track_id (str): The track_id returned in the request's X-Track-ID header.
+
+    Raises:
+        HTTPException: If the trace is not in the recent trace buffer, with status code 404.
+
+    Returns:
+        dict[str, Any]: The trace with its spans ordered by start time.
+    """
+    trace = trace_store.get(track_id)
+    if trace is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+    return trace.to_dict()
+
+
+@router.get("/profiles")
+async def get_profiles(
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, list[str]]:
+    """
+    List the track_ids of the request profiles stored on this node, most recent first.
+
+    Returns:
+        dict[str, list[str]]: The stored profile track_ids.
+    """
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{track_id}")
+async def download_profile(
+    track_id: str,
+    _: Annotated[User, Depends(get_current_admin_user)],
+    format: str = "prof",
+):
+    """
+    Download a stored request profile.
+
+    Args:
+        track_id (str): The track_id of the profiled request.
+        format (str): "prof" for the raw pstats file, or "text" for a cumulative-time report.
+
+    Raises:
+        HTTPException: If no profile is stored for the track_id, with status code 404.
+
+    Returns:
+        FileResponse | PlainTextResponse: The profile file or its text report.
+    """
+    path = profile_path(track_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "text":
+        return PlainTextResponse(profile_summary(path))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/embeddings")
+async def get_embeddings_status(
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """
+    Show the embedding model serving queries and the latest migration.
+
+    Returns:
+        dict[str, Any]: The active provider, model and collection, and the latest migration.
+    """
+    return {"active": active_embedding_target().to_dict(), "migration": await get_migration()}
+
+
+@router.post("/embeddings/migrations", status_code=status.HTTP_202_ACCEPTED)
+async def create_embedding_migration(
+    request: EmbeddingMigrationRequest,
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """
+    Start re-embedding the vector store with another model in the background.
+
+    Queries are served from the current collection until the new one is complete.
+
+    Raises:
+        HTTPException: 400 for an unknown provider or the already active model,
+            409 if a migration is already running.
+
+    Returns:
+        dict[str, Any]: The migration; poll GET /admin/embeddings/migrations/{id}.
+    """
+    try:
+        return await start_migration(request.provider, request.model)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except MigrationInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/embeddings/migrations/{migration_id}")
+async def get_embedding_migration(
+    migration_id: str,
+    _: Annotated[User, Depends(get_current_admin_user)],
+) -> dict[str, Any]:
+    """
+    Retrieve the progress of an embedding migration.
+
+    Raises:
+        HTTPException: If the migration does not exist, with status code 404.
+
+    Returns:
+        dict[str, Any]: The migration with its phase, checkpoint and counters.
+    """
+    migration = await get_migration(migration_id)
+    if migration is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Migration not found")
+    return migration
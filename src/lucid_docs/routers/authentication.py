@@ -2,26 +2,31 @@
 Authentication routes for user login, registration, and retrieval of current user information.
 """
 
+import asyncio
 from datetime import timedelta
 from typing import Annotated
 
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from fastapi import APIRouter
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from lucid_docs.core.security import get_password_hash
+from lucid_docs.core.security import get_password_hash_async
 from lucid_docs.models.database import User, UserInDB
-from lucid_docs.models.schemas import Token
+from lucid_docs.models.schemas import Token, BulkUserResponse, BulkUserResult
 from lucid_docs.dependencies import get_users_collection_dep
 
 from lucid_docs.core.security import (
     authenticate_user,
     create_access_token,
     get_current_active_user,
+    get_current_admin_user,
 )
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+MAX_BULK_USERS = 1000
+DUPLICATE_KEY_ERROR_CODE = 11000
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -80,27 +85,99 @@ async def register_user(
     """
     Register a new user.
 
+    The user is inserted directly and the unique indexes on username and email
+    reject duplicates, so registration costs a single database round-trip.
+
     Args:
         user (UserInDB): The user data for registration.
 
     Raises:
-        HTTPException: If the username is already registered with status code 400.
+        HTTPException: If the username or email is already registered with status code 400.
 
     Returns:
         User: The registered user data.
     """
-    if await users_collection.find_one({"username": user.username}):
+    user.password = await get_password_hash_async(user.password)
+    try:
+        await users_collection.insert_one(user.model_dump(by_alias=True, exclude={"id"}))
+    except DuplicateKeyError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered",
+            detail=_duplicate_key_detail(e.details),
         )
 
-    user.password = get_password_hash(user.password)
-    await users_collection.insert_one(user.model_dump(by_alias=True, exclude={"id"}))
-
     return User(
         username=user.username,
         full_name=user.full_name,
         email=user.email,
         disabled=user.disabled,
     )
+
+
+@router.post("/users/bulk/", response_model=BulkUserResponse)
+async def provision_users(
+    users: list[UserInDB],
+    _: Annotated[User, Depends(get_current_admin_user)],
+    users_collection: AsyncIOMotorCollection = Depends(get_users_collection_dep)
+):
+    """
+    Provision many users at once, e.g. from an SSO synchronization job.
+
+    Passwords are hashed in parallel on the hashing executor and all rows are
+    written with a single unordered `insert_many`, so one duplicate does not
+    prevent the remaining users from being created.
+
+    Args:
+        users (list[UserInDB]): The users to create.
+
+    Raises:
+        HTTPException: If the request is empty or exceeds MAX_BULK_USERS, with status code 400.
+
+    Returns:
+        BulkUserResponse: Per-row results in request order.
+    """
+    if not users:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No users provided")
+    if len(users) > MAX_BULK_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_USERS} users can be provisioned per request",
+        )
+
+    hashes = await asyncio.gather(*(get_password_hash_async(user.password) for user in users))
+    documents = []
+    for user, password_hash in zip(users, hashes):
+        user.password = password_hash
+        documents.append(user.model_dump(by_alias=True, exclude={"id"}))
+
+    results = [BulkUserResult(username=user.username, status="created") for user in users]
+    try:
+        await users_collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            row = results[write_error["index"]]
+            if write_error.get("code") == DUPLICATE_KEY_ERROR_CODE:
+                row.status = "duplicate"
+                row.detail = _duplicate_key_detail(write_error)
+            else:
+                row.status = "error"
+                row.detail = write_error.get("errmsg")
+
+    created = sum(1 for row in results if row.status == "created")
+    return BulkUserResponse(created=created, failed=len(results) - created, results=results)
+
+
+def _duplicate_key_detail(error_details: dict | None) -> str:
+    """
+    Build a user-facing message for a duplicate key error on the users collection.
+
+    Args:
+        error_details (dict | None): The error document returned by MongoDB.
+
+    Returns:
+        str: Which unique field was already registered.
+    """
+    key_pattern = (error_details or {}).get("keyPattern") or {}
+    if "email" in key_pattern:
+        return "Email already registered"
+    return "Username already registered"
@@ -0,0 +1,150 @@
+import logging
+from typing import Annotated, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING
+
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.dependencies import get_documents_collection_dep, get_jobs_collection_dep
+from lucid_docs.models.database import DocumentList, Job, User
+from lucid_docs.services.document_service import (
+    DELETE_CHAT,
+    DELETE_DOCUMENT,
+    chat_filter,
+    create_job,
+    document_filter,
+    has_vectors,
+    run_delete_job,
+)
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+logger = logging.getLogger(__name__)
+
+
+def _validate_chat_id(chat_id: str) -> None:
+    try:
+        if UUID(chat_id).version != 4:
+            raise HTTPException(status_code=400, detail="Chat ID must be a valid UUID version 4")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format")
+
+
+@router.get("/", response_model=DocumentList, response_model_by_alias=False)
+async def list_documents(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    documents_collection: AsyncIOMotorCollection = Depends(get_documents_collection_dep),
+    chat_id: Optional[str] = None,
+):
+    """
+    List the documents uploaded by the user, optionally restricted to one chat.
+
+    Args:
+        current_user (User): Authenticated user.
+        chat_id (Optional[str]): UUIDv4 of the chat to filter by.
+
+    Returns:
+        DocumentList: The user's documents ordered by chat and upload time.
+    """
+    query = {"username": current_user.username}
+    if chat_id:
+        _validate_chat_id(chat_id)
+        query["chat_id"] = chat_id
+
+    documents = await documents_collection.find(query, {"page_hashes": 0}).sort(
+        [("chat_id", ASCENDING), ("created_at", ASCENDING)]
+    ).to_list(length=None)
+    return DocumentList(documents=documents)
+
+
+@router.delete("/chat/{chat_id}", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def delete_chat_documents(
+    chat_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    documents_collection: AsyncIOMotorCollection = Depends(get_documents_collection_dep),
+    jobs_collection: AsyncIOMotorCollection = Depends(get_jobs_collection_dep),
+):
+    """
+    Schedule the removal of every document of a chat.
+
+    Args:
+        chat_id (str): UUIDv4 of the chat.
+        current_user (User): Authenticated user.
+
+    Returns:
+        Job: The queued job; poll GET /documents/jobs/{id} for its progress.
+    """
+    _validate_chat_id(chat_id)
+    registry_query = {"username": current_user.username, "chat_id": chat_id}
+    await documents_collection.update_many(registry_query, {"$set": {"status": "deleting"}})
+
+    job = await create_job(jobs_collection, DELETE_CHAT, current_user.username, chat_id)
+    background_tasks.add_task(
+        run_delete_job, job["_id"], chat_filter(current_user.username, chat_id),
+        registry_query, documents_collection, jobs_collection,
+    )
+    return job
+
+
+@router.delete("/{hash_file_name}", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def delete_document(
+    hash_file_name: str,
+    background_tasks: BackgroundTasks,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    documents_collection: AsyncIOMotorCollection = Depends(get_documents_collection_dep),
+    jobs_collection: AsyncIOMotorCollection = Depends(get_jobs_collection_dep),
+):
+    """
+    Schedule the removal of a document and all of its chunks.
+
+    Documents ingested before the registry existed are found through their chunks.
+
+    Args:
+        hash_file_name (str): The stored file name returned by the upload.
+        current_user (User): Authenticated user.
+
+    Raises:
+        HTTPException: If the user has no such document, with status code 404.
+
+    Returns:
+        Job: The queued job; poll GET /documents/jobs/{id} for its progress.
+    """
+    registry_query = {"username": current_user.username, "hash_file_name": hash_file_name}
+    where = document_filter(current_user.username, hash_file_name)
+
+    result = await documents_collection.update_one(registry_query, {"$set": {"status": "deleting"}})
+    if not result.matched_count and not await run_in_threadpool(has_vectors, where):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    job = await create_job(jobs_collection, DELETE_DOCUMENT, current_user.username, hash_file_name)
+    background_tasks.add_task(run_delete_job, job["_id"], where, registry_query, documents_collection, jobs_collection)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    jobs_collection: AsyncIOMotorCollection = Depends(get_jobs_collection_dep),
+):
+    """
+    Retrieve the progress of a document deletion job.
+
+    Args:
+        job_id (str): The job identifier.
+        current_user (User): Authenticated user.
+
+    Raises:
+        HTTPException: If the user has no such job, with status code 404.
+
+    Returns:
+        Job: The job.
+    """
+    job = await jobs_collection.find_one({"_id": job_id, "username": current_user.username})
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
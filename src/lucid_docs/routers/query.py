@@ -3,30 +3,66 @@ from uuid import UUID
 from pymongo import ASCENDING
 from motor.motor_asyncio import AsyncIOMotorCollection
 from typing import Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from lucid_docs.core.config import settings
 from lucid_docs.core.security import get_current_active_user
+from lucid_docs.utils.text import estimate_tokens
+from lucid_docs.core.rate_limit import EMBED_TOKENS, limit_chat, rate_limiter
 from lucid_docs.services.chroma_service import query_collection
 from lucid_docs.models.schemas import QueryRequest, QueryResponse, RoleEnum
-from lucid_docs.models.database import User, Conversation, Message
-from lucid_docs.dependencies import get_messages_collection_dep
+from lucid_docs.models.database import User, Conversation, Message, MessageUsage
+from lucid_docs.dependencies import (
+    get_conversations_collection_dep,
+    get_messages_collection_dep,
+    get_usage_collection_dep,
+)
+from lucid_docs.services.history_service import SUMMARY, load_history, summarize_turn
+from lucid_docs.services.usage_service import record_usage
 from lucid_docs.utils.date import current_utc_timestamp
+from lucid_docs.utils.responses import json_response
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 logger = logging.getLogger(__name__)
 
+MESSAGE_PROJECTION = {"chat_id": 1, "username": 1, "role": 1, "content": 1, "timestamp": 1, "usage": 1}
+
+
+def message_to_json(document: dict) -> dict:
+    """
+    Shape a stored message like `Message` serialized by field name, without validating it.
+    """
+    return {
+        "id": str(document["_id"]) if document.get("_id") is not None else None,
+        "chat_id": document.get("chat_id"),
+        "username": document.get("username"),
+        "role": document.get("role"),
+        "content": document.get("content"),
+        "timestamp": document.get("timestamp"),
+        "usage": document.get("usage"),
+    }
+
 
 @router.post("/", response_model=QueryResponse)
 async def ask_question(
     request: QueryRequest, 
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    messages_collection: AsyncIOMotorCollection = Depends(get_messages_collection_dep)
+    background_tasks: BackgroundTasks,
+    current_user: Annotated[User, Depends(limit_chat)],
+    messages_collection: AsyncIOMotorCollection = Depends(get_messages_collection_dep),
+    usage_collection: AsyncIOMotorCollection = Depends(get_usage_collection_dep),
+    conversations_collection: AsyncIOMotorCollection = Depends(get_conversations_collection_dep),
 ):
     """
     Process a chat query request and return the corresponding results.
 
     This endpoint receives a query through the request body, performs the query operation
-    using the provided user's credentials, and returns the query results.
+    using the provided user's credentials, and returns the query results. The assistant
+    message records its token and latency usage, which is also added to the daily rollups.
+
+    With history enabled (`request.history` or CHAT_HISTORY_MODE), the last turns or
+    the chat's rolling summary are added to the prompt; in summary mode the summary
+    is updated with the new turn after the response is sent, charged to the chat rate
+    limit and recorded as the answer's `summary_tokens`.
 
     Args:
         request (QueryRequest): The request body containing the chat question and additional parameters.
@@ -35,6 +71,14 @@ async def ask_question(
     Returns:
         QueryResponse: A response model containing the results from the query.
     """
+    await rate_limiter.hit(EMBED_TOKENS, current_user.username, estimate_tokens(request.question))
+
+    # Loaded before the question is stored, so it only holds previous turns.
+    history_mode = request.history or settings.CHAT_HISTORY_MODE
+    history, summarized_turns = await load_history(
+        history_mode, messages_collection, conversations_collection, current_user.username, request.chat_id
+    )
+
     user_message = Message(
         chat_id=request.chat_id,
         username=current_user.username,
@@ -47,19 +91,31 @@ async def ask_question(
         user_message.model_dump(by_alias=True, exclude=["id"])
     )
 
-    results = await query_collection(request.question, current_user.username, request.chat_id, request.top_k)
+    results, usage = await query_collection(
+        request.question, current_user.username, request.chat_id, request.top_k, history
+    )
 
     assistant_message = Message(
         chat_id=request.chat_id,
         username=current_user.username,
         role=RoleEnum.assistant,
         content=results,
-        timestamp=current_utc_timestamp()
+        timestamp=current_utc_timestamp(),
+        usage=MessageUsage(**usage)
     )
 
-    await messages_collection.insert_one(
+    inserted = await messages_collection.insert_one(
         assistant_message.model_dump(by_alias=True, exclude=["id"])
     )
+    await record_usage(
+        usage_collection, current_user.username, request.chat_id, assistant_message.usage, assistant_message.timestamp
+    )
+    if history_mode == SUMMARY and not usage.get("error"):
+        background_tasks.add_task(
+            summarize_turn, conversations_collection, messages_collection, usage_collection,
+            current_user.username, request.chat_id, inserted.inserted_id, history, summarized_turns,
+            request.question, results, assistant_message.usage.top_k, assistant_message.timestamp,
+        )
    
     return {"results": results}
 
@@ -77,6 +133,7 @@ async def ask_question(
     response_model_by_alias=False,
 )
 async def list_messages(
+    request: Request,
     current_user: Annotated[User, Depends(get_current_active_user)],
     messages_collection: AsyncIOMotorCollection = Depends(get_messages_collection_dep),
     id: Optional[str] = None
@@ -84,6 +141,10 @@ async def list_messages(
     """
     Retrieve messages by conversation ID if provided, or all user messages.
 
+    Messages were validated when they were written, so they are serialized straight
+    from the Motor documents with a fast JSON encoder instead of going through the
+    response model, and large responses are compressed (brotli or gzip).
+
     Args:
         id (Optional[str]): UUIDv4 of the conversation.
         current_user (User): Authenticated user.
@@ -103,7 +164,7 @@ async def list_messages(
 
         query["chat_id"] = id
         logger.info(f"Fetching messages for conversation ID: {id} by user: {current_user.username}")
-        conversation_messages = await messages_collection.find(query).to_list(length=None)
+        conversation_messages = await messages_collection.find(query, MESSAGE_PROJECTION).to_list(length=None)
     else:
         logger.info(f"Fetching all messages for user: {current_user.username}")
         pipeline = [
@@ -127,4 +188,6 @@ async def list_messages(
         ]
         conversation_messages = await messages_collection.aggregate(pipeline).to_list(length=None)
 
-    return Conversation(messages=conversation_messages)
+    return await json_response(
+        request, {"messages": [message_to_json(message) for message in conversation_messages]}
+    )
@@ -1,27 +1,58 @@
+import uuid
+from pathlib import Path
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from anyio import from_thread
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
 from fastapi.concurrency import run_in_threadpool
 from fastapi.openapi.models import Example
 from typing import Annotated, Any, Dict, Optional
-from lucid_docs.core.security import get_current_active_user
+from motor.motor_asyncio import AsyncIOMotorCollection
+from lucid_docs.utils.text import estimate_tokens
+from lucid_docs.core.rate_limit import EMBED_TOKENS, limit_upload, rate_limiter
 from lucid_docs.models.database import User
-from lucid_docs.services.file_processing import process_pdf
-from lucid_docs.utils.storage import save_temp_file
+from lucid_docs.dependencies import get_documents_collection_dep
+from lucid_docs.services.document_service import (
+    delete_vectors,
+    discard_ingestion,
+    document_filter,
+    mark_ingesting,
+    register_document,
+)
+from lucid_docs.services.file_processing import process_document
+from lucid_docs.services.loaders import UnsupportedDocumentError, get_loader
+from lucid_docs.utils.storage import DetachedUpload, open_upload
 from lucid_docs.core.config import settings
+from lucid_docs.core.profiling import profiled
+from lucid_docs.core.retrieval_cache import invalidate_scope
 
 router = APIRouter(prefix="/upload", tags=["File Upload"])
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
+
+def ingest_upload(file: UploadFile, hash_file_name: str, *args, **kwargs) -> Dict[str, Any]:
+    """
+    Run `process_document` on the upload's own buffer, without writing a temporary copy.
+    """
+    with open_upload(file) as source:
+        return process_document(
+            source, file.filename, *args, hash_file_name=hash_file_name, content_type=file.content_type, **kwargs
+        )
+
+
+@router.post("/document",
+             summary="Upload Document",
+             description="Process and store a PDF, DOCX, text, Markdown or HTML file.",
+             response_model=Dict[str, Any])
 @router.post("/pdf", 
              summary="Upload PDF File", 
-             description="Process and store a PDF file.",
+             description="Process and store a PDF file. Other supported formats are accepted too.",
              response_model=Dict[str, Any])
 async def upload_pdf(
     file: Annotated[
         UploadFile,
         File(
-            description="Accepts only PDF files",
+            description="PDF, DOCX, plain text, Markdown or HTML file",
             examples=[
                 Example(
                     value="arquivo.pdf",
@@ -30,27 +61,48 @@ async def upload_pdf(
             ],
         ),
     ],
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    chat_id: Annotated[UUID, Form(description="UUIDv4 identifier for the process")]
+    current_user: Annotated[User, Depends(limit_upload)],
+    chat_id: Annotated[UUID, Form(description="UUIDv4 identifier for the process")],
+    background_tasks: BackgroundTasks,
+    document_id: Annotated[Optional[str], Form(
+        description="hash_file_name of a previously uploaded document; the file is ingested "
+                    "as a new revision and only changed pages are embedded again"
+    )] = None,
+    keep_original: Annotated[Optional[bool], Form(
+        description="Store the original file for later download; defaults to KEEP_ORIGINAL_UPLOADS"
+    )] = None,
+    documents_collection: AsyncIOMotorCollection = Depends(get_documents_collection_dep),
 ):
     """
-    Upload and process a PDF file.
+    Upload and process a document.
 
-    This endpoint receives a PDF file, saves it to temporary storage,
-    processes it, and returns processed metadata. It also optionally accepts
-    a UUIDv4 that will be validated before processing.
+    This endpoint receives a PDF, DOCX, text, Markdown or HTML file, parses it straight from the upload buffer
+    (memory-mapped when the upload spilled to disk) with the loader registered for
+    its content type, and returns processed metadata.
+    The original is written to ORIGINALS_STORAGE_PATH after the response only when
+    `keep_original` is set. It also optionally accepts a UUIDv4 that will be
+    validated before processing.
+
+    When `document_id` is given the upload replaces that document incrementally:
+    pages are compared by content hash against the stored revision, so only new or
+    changed pages are embedded and the chunks of removed pages are deleted.
     
     Args:
-        file (UploadFile): The PDF file to be uploaded.
+        file (UploadFile): The file to be uploaded.
         current_user (User): The current active user.
         chat_id (Optional[UUID]): An optional UUIDv4 identifier.
+        document_id (Optional[str]): The hash_file_name of the document being revised.
+        keep_original (Optional[bool]): Whether to store the original file.
 
     Returns:
         dict: A confirmation message and metadata if the file was processed successfully,
-              or an error message with a 400 status code if validations fail.
+              or an error message with a 400 status code if validations fail or the
+              file cannot be parsed.
     """
-    if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="Invalid file format. Only PDF files are accepted.")
+    try:
+        loader = get_loader(file.content_type, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid file format. {e}")
 
     if chat_id is not None and chat_id.version != 4:
         raise HTTPException(status_code=400, detail="UUID must be version 4.")
@@ -58,7 +110,57 @@ async def upload_pdf(
     if file.size > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail=f"File size exceeds the maximum limit of {MAX_FILE_SIZE / (1024 * 1024)} MB.")
 
-    temp_path = await run_in_threadpool(save_temp_file, file, settings.TEMP_STORAGE_PATH)
-    processed_data = await run_in_threadpool(process_pdf, temp_path, file.filename, current_user.username, str(chat_id))
+    def charge_embedding_tokens(splits):
+        tokens = sum(estimate_tokens(split.page_content) for split in splits)
+        from_thread.run(rate_limiter.hit, EMBED_TOKENS, current_user.username, tokens)
+
+    previous_hashes, previous_chunks = None, 0
+    if document_id is not None:
+        existing = await documents_collection.find_one(
+            {"username": current_user.username, "hash_file_name": document_id}
+        )
+        if existing is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        if existing.get("chat_id") != str(chat_id):
+            raise HTTPException(status_code=400, detail="A revision must be uploaded to the document's chat.")
+        previous_hashes = existing.get("page_hashes")
+        previous_chunks = existing.get("chunks", 0)
+        if previous_hashes is None:
+            # Ingested before page hashes were recorded: nothing can be reused.
+            await run_in_threadpool(
+                delete_vectors, document_filter(current_user.username, document_id), settings.VECTOR_DELETE_BATCH_SIZE
+            )
+            previous_hashes, previous_chunks = [], 0
+
+    # A revision keeps the document's hash_file_name so its unchanged chunks are reused.
+    hash_file_name = document_id or f"{uuid.uuid4()}{loader.extension}"
+    if document_id is None:
+        await mark_ingesting(documents_collection, current_user.username, str(chat_id), hash_file_name, file.filename)
+
+    try:
+        processed_data = await run_in_threadpool(
+            profiled(ingest_upload), file, hash_file_name, current_user.username, str(chat_id),
+            charge_embedding_tokens, previous_hashes,
+        )
+        await register_document(
+            documents_collection, current_user.username, str(chat_id), processed_data, file.filename, previous_chunks
+        )
+    except Exception as e:
+        if document_id is None:
+            # Parse error, exhausted embedding quota or store failure: nothing of the upload is kept.
+            await discard_ingestion(documents_collection, current_user.username, str(chat_id), hash_file_name)
+        if isinstance(e, UnsupportedDocumentError):
+            raise HTTPException(status_code=400, detail=f"Invalid file. {e}")
+        raise
+    # process_document bumped this worker's version; tell the others.
+    await invalidate_scope(current_user.username, str(chat_id))
+    processed_data.pop("page_hashes")
+
+    original_path = Path(settings.ORIGINALS_STORAGE_PATH) / hash_file_name
+    if settings.KEEP_ORIGINAL_UPLOADS if keep_original is None else keep_original:
+        background_tasks.add_task(DetachedUpload(file).save, original_path)
+    elif document_id is not None:
+        # The stored original, if any, belongs to the previous revision.
+        background_tasks.add_task(original_path.unlink, missing_ok=True)
 
     return {"message": "File processed successfully", "metadata": processed_data}
@@ -0,0 +1,67 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.dependencies import get_usage_collection_dep
+from lucid_docs.models.database import User
+from lucid_docs.models.schemas import UsageReport
+from lucid_docs.services.usage_service import usage_report
+
+router = APIRouter(prefix="/usage", tags=["Usage"])
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+@router.get("", response_model=UsageReport)
+async def get_usage(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    usage_collection: AsyncIOMotorCollection = Depends(get_usage_collection_dep),
+    start: Annotated[Optional[date], Query(description="First day, defaults to 30 days before end")] = None,
+    end: Annotated[Optional[date], Query(description="Last day (UTC), defaults to today")] = None,
+    group_by: Literal["day", "chat_id", "top_k", "username"] = "day",
+    username: Annotated[Optional[str], Query(description="User to report on; admins only")] = None,
+):
+    """
+    Report token usage and latency of chat answers from the daily rollups.
+
+    Users see their own usage. Administrators can report on another user with
+    `username`, or on everyone by grouping by username without one.
+
+    Args:
+        start (Optional[date]): First day included.
+        end (Optional[date]): Last day included.
+        group_by (str): "day", "chat_id", "top_k" or, for admins, "username".
+        username (Optional[str]): User to report on.
+        current_user (User): Authenticated user.
+
+    Raises:
+        HTTPException: If a non-admin asks for another user or groups by username,
+            with status code 403; if the range is invalid, with status code 400.
+
+    Returns:
+        UsageReport: Totals and per-group usage over the range.
+    """
+    is_admin = current_user.username in settings.ADMIN_USERNAMES
+    if not is_admin and (group_by == "username" or username not in (None, current_user.username)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    if not is_admin or (username is None and group_by != "username"):
+        username = username or current_user.username
+
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"The range cannot exceed {MAX_RANGE_DAYS} days"
+        )
+
+    return await usage_report(usage_collection, start, end, group_by, username)
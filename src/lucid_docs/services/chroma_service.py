@@ -1,28 +1,54 @@
 import logging
+import time
+from typing import Any
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.documents import Document
 from langchain_core.prompts import PromptTemplate
 from lucid_docs.dependencies import get_llm, get_chroma
+from lucid_docs.core.config import settings
+from lucid_docs.core.metrics import llm_tokens, stage
+from lucid_docs.core.retrieval_cache import retrieval_cache, retrieval_cache_enabled, retrieval_key, scope_version
+from lucid_docs.services.dedup import collapse_duplicates
+from lucid_docs.services.resilient_llm import LLMUnavailableError
+from lucid_docs.utils.text import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
-async def query_collection(question: str, username: str, chat_id: str = None, top_k: int = 3):
+
+def format_context(documents: list[Document]) -> str:
     """
-    Query the collection using a Retrieval-Augmented Generation (RAG) chain.
+    Join the retrieved chunks into the plain-text context block of the prompt.
 
-    This function retrieves up to `top_k` documents from the Chroma store that belong
-    to the specified user, builds a prompt with the retrieved context and the given question,
-    and then invokes a language model chain to generate an answer based solely on the provided context.
+    Args:
+        documents (list[Document]): The retrieved documents.
+
+    Returns:
+        str: The page contents separated by blank lines.
+    """
+    return "\n\n".join(document.page_content for document in documents)
+
+
+async def retrieve(question: str, username: str, chat_id: str = None, top_k: int = 3) -> list[Document]:
+    """
+    Find the `top_k` chunks of the user (and chat) closest to the question.
+
+    Results are cached by scope, query embedding and k, under the scope's ingestion
+    version, so a new upload or deletion in the scope is never answered from the cache.
 
     Args:
-        question (str): The question to be answered.
+        question (str): The question to search for.
         username (str): The user identifier used to filter the documents.
-        chat_id (str): The identifier for the chat session.
-        top_k (int, optional): The number of documents to retrieve. Defaults to 3.
+        chat_id (str): Optional chat to restrict the search to.
+        top_k (int, optional): The number of documents to return. Defaults to 3.
 
     Returns:
-        str: The answer generated by the language model.
+        list[Document]: The closest chunks, most similar first.
     """
+    documents, _ = await _retrieve(question, username, chat_id, top_k)
+    return documents
+
+
+async def _retrieve(question: str, username: str, chat_id: str, top_k: int) -> tuple[list[Document], bool]:
     if chat_id:
         filter_query = {"$and": [{"user_id": username}, {"chat_id": chat_id}]}
     else:
@@ -30,13 +56,53 @@ async def query_collection(question: str, username: str, chat_id: str = None, to
 
     logger.debug(f"Filter query for Chroma: {filter_query}")
 
-    retriever = get_chroma().as_retriever(
-        search_kwargs={
-            "k": top_k,
-            "filter": filter_query
-        }
-    )
+    # Linked near-duplicates share a vector and would fill the context with copies,
+    # so extra results are fetched and collapsed back to top_k.
+    k = top_k * 2 if settings.DEDUP_ENABLED else top_k
+    store = get_chroma()
+    version = scope_version(username, chat_id)
+    embedding = await store.embeddings.aembed_query(question)
+
+    key = retrieval_key(username, chat_id, version, embedding, k)
+    enabled = retrieval_cache_enabled()
+    documents = retrieval_cache.get(key) if enabled else None
+    cache_hit = documents is not None
+    if not cache_hit:
+        documents = await store.asimilarity_search_by_vector(embedding, k=k, filter=filter_query)
+        if enabled:
+            retrieval_cache.set(key, documents)
+    return collapse_duplicates(documents, top_k), cache_hit
 
+
+HISTORY_PROMPT = """
+    Histórico da conversa (use apenas para entender a pergunta):
+    {history}
+    """
+
+
+async def query_collection(
+    question: str, username: str, chat_id: str = None, top_k: int = 3, history: str = ""
+) -> tuple[str, dict[str, Any]]:
+    """
+    Query the collection using a Retrieval-Augmented Generation (RAG) chain.
+
+    This function retrieves up to `top_k` documents from the Chroma store that belong
+    to the specified user, builds a prompt with the retrieved context and the given question,
+    and then invokes a language model chain to generate an answer based solely on the provided context.
+
+    Args:
+        question (str): The question to be answered.
+        username (str): The user identifier used to filter the documents.
+        chat_id (str): The identifier for the chat session.
+        top_k (int, optional): The number of documents to retrieve. Defaults to 3.
+        history (str, optional): Previous turns or their summary, placed before the
+            context so follow-up questions can be understood. Defaults to none.
+
+    Returns:
+        tuple[str, dict[str, Any]]: The answer generated by the language model and its
+        usage: prompt and completion tokens, context size, retrieval and generation
+        milliseconds, whether the retrieval was cached and whether it failed.
+    """
     prompt_template = """
     Responda à pergunta com base apenas no contexto fornecido abaixo:
     Contexto: {context}
@@ -45,19 +111,43 @@ async def query_collection(question: str, username: str, chat_id: str = None, to
     Resposta:
     """
     
+    if history:
+        prompt_template = HISTORY_PROMPT + prompt_template
     custom_rag_prompt = PromptTemplate.from_template(prompt_template)
 
-    rag_chain = (
-        {"context": retriever, "question": RunnablePassthrough()}
-        | custom_rag_prompt
-        | get_llm()
-        | StrOutputParser()
-    )
+    generation_chain = custom_rag_prompt | get_llm()
 
+    usage: dict[str, Any] = {"top_k": top_k, "history_chars": len(history)}
     try:
-        response = await rag_chain.ainvoke(question)
+        start = time.perf_counter()
+        with stage("retrieve"):
+            documents, usage["cache_hit"] = await _retrieve(question, username, chat_id, top_k)
+            context = format_context(documents)
+        usage["retrieval_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        usage["context_chars"] = len(context)
+        usage["context_chunks"] = len(documents)
+
+        start = time.perf_counter()
+        with stage("generate"):
+            message = await generation_chain.ainvoke({"context": context, "question": question, "history": history})
+        usage["generation_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        reported = getattr(message, "usage_metadata", None) or {}
+        llm_tokens.inc(reported.get("input_tokens", 0), type="prompt")
+        llm_tokens.inc(reported.get("output_tokens", 0), type="completion")
+
+        response = StrOutputParser().invoke(message)
+        usage["prompt_tokens"] = reported.get("input_tokens") or estimate_tokens(
+            custom_rag_prompt.format(context=context, question=question, history=history)
+        )
+        usage["completion_tokens"] = reported.get("output_tokens") or estimate_tokens(response)
+    except LLMUnavailableError as e:
+        logger.error(f"Language model unavailable: {e}")
+        response = "The language model is temporarily unavailable. Please try again later."
+        usage["error"] = True
     except Exception as e:
         logger.error(f"Error during RAG chain invocation: {e}")
         response = "An error occurred while processing your request. Please try again later."
+        usage["error"] = True
 
-    return response
+    return response, usage
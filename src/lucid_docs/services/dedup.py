@@ -0,0 +1,245 @@
+"""
+Near-duplicate chunk detection with MinHash and locality-sensitive hashing.
+
+Each chunk gets a MinHash signature of its word shingles. The signature is cut
+into DEDUP_BANDS bands, and each band is hashed into a key stored in the chunk's
+metadata (``lsh_0`` ... ``lsh_<n>``). Chunks sharing any band key are candidates.
+The keys live next to the vectors, so they are removed with them and every
+lookup is a metadata filter on the user's own chunks. Candidates are confirmed
+with the exact Jaccard similarity of their shingles against DEDUP_THRESHOLD.
+
+A near-duplicate of a chunk of the same document is skipped. Its page is
+recorded on the kept chunk (``duplicate_pages``) so a revision that removes the
+kept chunk's page can hand it over. A near-duplicate of another document's chunk
+is linked instead: it is stored with the existing vector, without calling the
+embedding model, and marked ``duplicate_of``, so deleting either document never
+loses the other's text. Retrieval collapses linked copies.
+"""
+
+import hashlib
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from lucid_docs.core.config import settings
+from lucid_docs.services.local_models import tokenize
+
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+BAND_PREFIX = "lsh_"
+DUPLICATE_PAGES = "duplicate_pages"
+DUPLICATE_OF = "duplicate_of"
+
+
+def shingles(text: str) -> set[str]:
+    """
+    Return the word shingles of a text; short texts are one shingle.
+    """
+    tokens = tokenize(text)
+    if len(tokens) <= SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(first: set[str], second: set[str]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class MinHasher:
+    """
+    MinHash signatures with universal hashing ``(a * x + b) mod p`` over 32-bit shingle hashes.
+
+    Args:
+        num_perm (int): Signature length.
+        bands (int): Number of LSH bands; must divide `num_perm`.
+        seed (int): Seed of the permutations, fixed so keys stay comparable across runs.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, items: set[str]) -> np.ndarray:
+        if not items:
+            return np.full(len(self._a), MAX_HASH, dtype=np.uint64)
+        values = np.fromiter(
+            (struct.unpack("<I", hashlib.blake2b(item.encode(), digest_size=4).digest())[0] for item in items),
+            dtype=np.uint64,
+            count=len(items),
+        )
+        hashed = (np.outer(values, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return hashed.min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> dict[str, str]:
+        return {
+            f"{BAND_PREFIX}{band}": hashlib.blake2b(
+                signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        }
+
+
+_hasher: Optional[MinHasher] = None
+
+
+def get_hasher() -> MinHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = MinHasher(settings.DEDUP_NUM_PERM, settings.DEDUP_BANDS)
+    return _hasher
+
+
+@dataclass
+class DedupResult:
+    """
+    Outcome of deduplicating a batch of chunks.
+
+    Attributes:
+        embed (list[int]): Indexes of chunks to embed and store.
+        linked (dict[int, tuple[str, list[float]]]): Chunk index to the id and vector
+            of the chunk it duplicates, in another document.
+        skipped (list[int]): Indexes of chunks dropped as duplicates within the document.
+        canonical_updates (dict[str, dict[str, Any]]): New metadata of stored chunks
+            that gained skipped duplicates.
+    """
+
+    embed: list[int] = field(default_factory=list)
+    linked: dict[int, tuple[str, list[float]]] = field(default_factory=dict)
+    skipped: list[int] = field(default_factory=list)
+    canonical_updates: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+def _add_duplicate_page(metadata: dict[str, Any], page_hash: str) -> None:
+    pages = [page for page in (metadata.get(DUPLICATE_PAGES) or "").split(",") if page]
+    prefix = page_hash[:16]
+    if prefix != metadata.get("page_hash", "")[:16] and prefix not in pages:
+        metadata[DUPLICATE_PAGES] = ",".join(pages + [prefix])
+
+
+def deduplicate(
+    chunks: list[Document],
+    collection,
+    username: str,
+    hash_file_name: str,
+    excluded_pages: set[str] = frozenset(),
+    threshold: Optional[float] = None,
+) -> DedupResult:
+    """
+    Sort new chunks into ones to embed, ones to link and ones to skip.
+
+    Adds the LSH band keys to the metadata of every chunk. Candidates are the user's
+    stored chunks sharing a band key, except those on `excluded_pages` (pages a
+    revision is removing), and the earlier chunks of the batch.
+
+    Args:
+        chunks (list[Document]): New chunks with ``page_hash`` metadata.
+        collection: The raw Chroma collection.
+        username (str): Owner; only their chunks are compared.
+        hash_file_name (str): Document the chunks belong to.
+        excluded_pages (set[str]): Page hashes whose stored chunks are about to be deleted.
+        threshold (Optional[float]): Minimum Jaccard similarity; defaults to DEDUP_THRESHOLD.
+
+    Returns:
+        DedupResult: The decision for every chunk.
+    """
+    threshold = settings.DEDUP_THRESHOLD if threshold is None else threshold
+    hasher = get_hasher()
+    chunk_shingles = [shingles(chunk.page_content) for chunk in chunks]
+    for chunk, items in zip(chunks, chunk_shingles):
+        chunk.metadata.update(hasher.band_keys(hasher.signature(items)))
+
+    keys_by_band: dict[str, set[str]] = {}
+    for chunk in chunks:
+        for band, key in chunk.metadata.items():
+            if band.startswith(BAND_PREFIX):
+                keys_by_band.setdefault(band, set()).add(key)
+
+    stored: dict[str, tuple[dict[str, Any], set[str]]] = {}
+    if chunks:
+        clauses = [{band: {"$in": sorted(keys)}} for band, keys in sorted(keys_by_band.items())]
+        candidates = collection.get(
+            where={"$and": [{"user_id": username}, clauses[0] if len(clauses) == 1 else {"$or": clauses}]},
+            include=["metadatas", "documents"],
+        )
+        for chunk_id, metadata, text in zip(candidates["ids"], candidates["metadatas"], candidates["documents"]):
+            if metadata.get("hash_file_name") == hash_file_name and metadata.get("page_hash") in excluded_pages:
+                continue
+            if metadata.get(DUPLICATE_OF):
+                continue
+            stored[chunk_id] = (dict(metadata), shingles(text or ""))
+
+    result = DedupResult()
+    kept_in_batch: list[int] = []
+    vectors_needed: dict[int, str] = {}
+    for index, (chunk, items) in enumerate(zip(chunks, chunk_shingles)):
+        keys = {key for band, key in chunk.metadata.items() if band.startswith(BAND_PREFIX)}
+        match = None
+        for other in kept_in_batch:
+            if keys & _keys(chunks[other].metadata) and jaccard(items, chunk_shingles[other]) >= threshold:
+                match = ("batch", other)
+                break
+        if match is None:
+            for chunk_id, (metadata, other_shingles) in stored.items():
+                if keys & _keys(metadata) and jaccard(items, other_shingles) >= threshold:
+                    match = ("stored", chunk_id)
+                    break
+
+        if match is None:
+            kept_in_batch.append(index)
+            result.embed.append(index)
+        elif match[0] == "batch":
+            # Earlier chunk of this upload: same document, so the duplicate is dropped.
+            _add_duplicate_page(chunks[match[1]].metadata, chunk.metadata["page_hash"])
+            result.skipped.append(index)
+        else:
+            metadata = stored[match[1]][0]
+            if metadata.get("hash_file_name") == hash_file_name:
+                _add_duplicate_page(metadata, chunk.metadata["page_hash"])
+                result.canonical_updates[match[1]] = metadata
+                result.skipped.append(index)
+            else:
+                vectors_needed[index] = match[1]
+
+    if vectors_needed:
+        found = collection.get(ids=sorted(set(vectors_needed.values())), include=["embeddings"])
+        vectors = dict(zip(found["ids"], found["embeddings"]))
+        for index, chunk_id in vectors_needed.items():
+            if chunk_id in vectors:
+                chunks[index].metadata[DUPLICATE_OF] = chunk_id
+                result.linked[index] = (chunk_id, list(vectors[chunk_id]))
+            else:
+                result.embed.append(index)
+        result.embed.sort()
+    return result
+
+
+def _keys(metadata: dict[str, Any]) -> set[str]:
+    return {value for key, value in metadata.items() if key.startswith(BAND_PREFIX)}
+
+
+def collapse_duplicates(documents: list[Document], k: int) -> list[Document]:
+    """
+    Keep the first of each group of linked duplicates, up to `k` documents.
+    """
+    seen: set[str] = set()
+    collapsed = []
+    for document in documents:
+        key = document.metadata.get(DUPLICATE_OF) or document.id or document.page_content
+        if key in seen:
+            continue
+        seen.add(key)
+        collapsed.append(document)
+        if len(collapsed) == k:
+            break
+    return collapsed
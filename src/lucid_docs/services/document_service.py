@@ -0,0 +1,239 @@
+"""
+Document registry and removal of a document's chunks from the vector store.
+
+Every ingested file is recorded in the "documents" collection so users can list and
+delete what they uploaded. Deletions run as background jobs tracked in the "jobs"
+collection: chunks are removed in batches selected by metadata filter, so memory and
+the time the vector store spends on each call stay bounded, and the store is
+compacted afterwards when enough chunks were removed.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.retrieval_cache import invalidate_scope
+from lucid_docs.dependencies import get_chroma, get_vector_client
+from lucid_docs.services.vector_store import WRITER, vector_store_mode
+from lucid_docs.utils.date import current_utc_timestamp
+
+logger = logging.getLogger(__name__)
+
+DELETE_DOCUMENT = "delete_document"
+DELETE_CHAT = "delete_chat"
+
+
+def document_filter(username: str, hash_file_name: str) -> dict[str, Any]:
+    return {"$and": [{"user_id": username}, {"hash_file_name": hash_file_name}]}
+
+
+def chat_filter(username: str, chat_id: str) -> dict[str, Any]:
+    return {"$and": [{"user_id": username}, {"chat_id": chat_id}]}
+
+
+async def mark_ingesting(
+    documents_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: Optional[str],
+    hash_file_name: str,
+    file_name: str,
+) -> None:
+    """
+    Record a new upload before its chunks are stored.
+
+    The entry becomes "ready" in `register_document`, or is removed by
+    `discard_ingestion` when the ingestion fails; one left "ingesting" marks a worker
+    that died midway, whose partial chunks the janitor removes.
+    """
+    now = current_utc_timestamp()
+    await documents_collection.insert_one({
+        "hash_file_name": hash_file_name,
+        "file_name": file_name,
+        "username": username,
+        "chat_id": chat_id,
+        "page_count": 0,
+        "chunks": 0,
+        "status": "ingesting",
+        "revision": 0,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+
+async def register_document(
+    documents_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: Optional[str],
+    processed: dict[str, Any],
+    file_name: str,
+    previous_chunks: int = 0,
+) -> None:
+    """
+    Record an ingested file, or a new revision of it, in the document registry.
+
+    Args:
+        documents_collection (AsyncIOMotorCollection): The documents collection.
+        username (str): Owner of the document.
+        chat_id (Optional[str]): Chat the document was uploaded to.
+        processed (dict[str, Any]): The result of `process_pdf`.
+        file_name (str): The original file name.
+        previous_chunks (int): Chunks stored for the previous revision, if any.
+    """
+    now = current_utc_timestamp()
+    await documents_collection.update_one(
+        {"hash_file_name": processed["hash_file_name"]},
+        {
+            "$set": {
+                "file_name": file_name,
+                "username": username,
+                "chat_id": chat_id,
+                "page_count": processed["page_count"],
+                "chunks": previous_chunks - processed["removed_chunks"] + processed["chunks"],
+                "page_hashes": processed["page_hashes"],
+                "status": "ready",
+                "updated_at": now,
+            },
+            "$setOnInsert": {"created_at": now},
+            "$inc": {"revision": 1},
+        },
+        upsert=True,
+    )
+
+
+async def discard_ingestion(
+    documents_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: Optional[str],
+    hash_file_name: str,
+) -> None:
+    """
+    Undo a failed upload: delete the chunks already stored for it and its "ingesting" entry.
+
+    Failures are logged and swallowed so the caller can report the original error;
+    whatever is left behind stays "ingesting" and is removed by the janitor.
+
+    Args:
+        documents_collection (AsyncIOMotorCollection): The documents collection.
+        username (str): Owner of the upload.
+        chat_id (Optional[str]): Chat the file was uploaded to.
+        hash_file_name (str): Name the upload was being stored under.
+    """
+    try:
+        deleted = await run_in_threadpool(
+            delete_vectors, document_filter(username, hash_file_name), settings.VECTOR_DELETE_BATCH_SIZE
+        )
+        if deleted:
+            await invalidate_scope(username, chat_id)
+        await documents_collection.delete_one(
+            {"username": username, "hash_file_name": hash_file_name, "status": "ingesting"}
+        )
+    except Exception as e:
+        logger.error(f"Failed to discard the failed upload {hash_file_name}: {e}")
+
+
+def has_vectors(where: dict[str, Any]) -> bool:
+    return bool(get_chroma()._collection.get(where=where, limit=1, include=[])["ids"])
+
+
+def delete_vectors(where: dict[str, Any], batch_size: int) -> int:
+    """
+    Delete every chunk matching a metadata filter, one batch of ids at a time.
+
+    Args:
+        where (dict[str, Any]): Chroma metadata filter.
+        batch_size (int): Number of chunks removed per call.
+
+    Returns:
+        int: The number of chunks deleted.
+    """
+    collection = get_chroma()._collection
+    deleted = 0
+    while True:
+        ids = collection.get(where=where, limit=batch_size, include=[])["ids"]
+        if not ids:
+            return deleted
+        collection.delete(ids=ids)
+        deleted += len(ids)
+
+
+def compact_vector_store() -> bool:
+    """
+    Reclaim the space left by deleted chunks in the vector store.
+
+    Only the writer process owns the store, so compaction runs there, between its
+    writes. In embedded mode every uvicorn worker has the SQLite file open and a
+    VACUUM would fail their writes, so it is skipped; a Chroma server (http mode)
+    manages its own storage.
+
+    Returns:
+        bool: Whether the store was compacted.
+    """
+    if vector_store_mode() != WRITER:
+        return False
+    return get_vector_client().compact()
+
+
+async def create_job(
+    jobs_collection: AsyncIOMotorCollection, job_type: str, username: str, target: str
+) -> dict[str, Any]:
+    job = {
+        "_id": str(uuid.uuid4()),
+        "type": job_type,
+        "username": username,
+        "target": target,
+        "status": "queued",
+        "deleted_chunks": 0,
+        "compacted": False,
+        "error": None,
+        "created_at": datetime.now(timezone.utc),
+        "finished_at": None,
+    }
+    await jobs_collection.insert_one(job)
+    return job
+
+
+async def run_delete_job(
+    job_id: str,
+    where: dict[str, Any],
+    registry_query: dict[str, Any],
+    documents_collection: AsyncIOMotorCollection,
+    jobs_collection: AsyncIOMotorCollection,
+) -> None:
+    """
+    Remove chunks and registry entries of a document or chat, recording progress on the job.
+
+    Args:
+        job_id (str): The job to update.
+        where (dict[str, Any]): Chroma metadata filter selecting the chunks.
+        registry_query (dict[str, Any]): Mongo query selecting the registry entries.
+        documents_collection (AsyncIOMotorCollection): The documents collection.
+        jobs_collection (AsyncIOMotorCollection): The jobs collection.
+    """
+    await jobs_collection.update_one({"_id": job_id}, {"$set": {"status": "running"}})
+    try:
+        deleted = await run_in_threadpool(delete_vectors, where, settings.VECTOR_DELETE_BATCH_SIZE)
+        await invalidate_scope(registry_query["username"], registry_query.get("chat_id"))
+        documents = await documents_collection.find(registry_query, {"hash_file_name": 1}).to_list(length=None)
+        await documents_collection.delete_many(registry_query)
+        for document in documents:
+            Path(settings.TEMP_STORAGE_PATH, document["hash_file_name"]).unlink(missing_ok=True)
+            Path(settings.ORIGINALS_STORAGE_PATH, document["hash_file_name"]).unlink(missing_ok=True)
+
+        compacted = False
+        if deleted >= settings.VECTOR_STORE_COMPACT_MIN_DELETED:
+            compacted = await run_in_threadpool(compact_vector_store)
+
+        logger.info(f"Job {job_id} deleted {deleted} chunks (compacted: {compacted})")
+        update = {"status": "completed", "deleted_chunks": deleted, "compacted": compacted}
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        update = {"status": "failed", "error": str(e)}
+
+    update["finished_at"] = datetime.now(timezone.utc)
+    await jobs_collection.update_one({"_id": job_id}, {"$set": update})
@@ -0,0 +1,385 @@
+"""
+Background migration of the vector store to another embedding model.
+
+A migration copies every chunk of the active collection into a shadow collection,
+re-embedding the stored chunk text with the target model in throttled batches. One
+worker at a time drives it, holding a lease in Mongo; the batch offset is
+checkpointed after every batch, so a restarted or replacement worker resumes where
+the previous one stopped.
+
+Queries keep using the old collection while the copy runs. Once it has caught up,
+reconciliation passes copy chunks added and drop chunks deleted meanwhile. Then the
+"active" document in the embedding_state collection is switched in one update.
+Every worker polls that document and swaps its embeddings and Chroma clients. After
+the switch a last pass applies the writes and deletions that reached the old
+collection before every worker had switched. Copied chunks carry the migration id
+in their metadata, so that pass can tell chunks deleted from the old collection
+from chunks that switched workers wrote to the new one. The old collection is kept
+for rollback.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.dependencies import InstrumentedEmbeddings, activate_embedding_target, get_vector_client
+from lucid_docs.services.providers import (
+    EMBEDDING_PROVIDERS,
+    EmbeddingTarget,
+    active_embedding_target,
+    create_embeddings,
+    migration_collection_name,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = "embedding_state"
+MIGRATIONS_COLLECTION = "embedding_migrations"
+ACTIVE_STATE_ID = "active"
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+COPY = "copy"
+RECONCILE = "reconcile"
+CATCH_UP = "catch_up"
+
+MAX_RECONCILE_PASSES = 3
+ID_PAGE_SIZE = 1000
+MIGRATION_KEY = "migration_id"
+
+
+class MigrationInProgress(Exception):
+    """
+    Raised when a migration is requested while another one is running.
+    """
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _target(document: dict[str, str]) -> EmbeddingTarget:
+    return EmbeddingTarget(document["provider"], document["model"], document["collection"])
+
+
+async def load_active_target() -> Optional[EmbeddingTarget]:
+    """
+    Return the embedding target recorded by the latest switch, if any.
+    """
+    state = await database.get_collection(STATE_COLLECTION).find_one({"_id": ACTIVE_STATE_ID})
+    return _target(state) if state else None
+
+
+async def start_migration(provider: str, model: str) -> dict[str, Any]:
+    """
+    Create a migration from the active embedding target to a new provider and model.
+
+    Args:
+        provider (str): Registered embedding provider of the target.
+        model (str): Embedding model of the target.
+
+    Raises:
+        ValueError: If the provider is unknown or the target is already active.
+        MigrationInProgress: If another migration is running.
+
+    Returns:
+        dict[str, Any]: The migration document.
+    """
+    provider = provider.lower()
+    if provider not in EMBEDDING_PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{provider}'. Available: {sorted(EMBEDDING_PROVIDERS)}")
+    source = active_embedding_target()
+    if (provider, model) == (source.provider, source.model):
+        raise ValueError("The requested embedding model is already active")
+    target = EmbeddingTarget(provider, model, migration_collection_name(provider, model))
+
+    now = _now()
+    migration = {
+        "_id": str(uuid.uuid4()),
+        "source": source.to_dict(),
+        "target": target.to_dict(),
+        "status": RUNNING,
+        "phase": COPY,
+        "offset": 0,
+        "copied": 0,
+        "deleted": 0,
+        "attempts": 0,
+        "owner": None,
+        "lease_until": now,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "switched_at": None,
+        "finished_at": None,
+    }
+    try:
+        await database.get_collection(MIGRATIONS_COLLECTION).insert_one(migration)
+    except DuplicateKeyError:
+        raise MigrationInProgress("An embedding migration is already running")
+    logger.info(f"Embedding migration {migration['_id']} created: {source.collection} -> {target.collection}")
+    return migration
+
+
+async def get_migration(migration_id: Optional[str] = None) -> Optional[dict[str, Any]]:
+    """
+    Return a migration by id, or the most recent one.
+    """
+    collection = database.get_collection(MIGRATIONS_COLLECTION)
+    if migration_id is not None:
+        return await collection.find_one({"_id": migration_id})
+    migrations = await collection.find({}).sort("created_at", -1).limit(1).to_list(length=1)
+    return migrations[0] if migrations else None
+
+
+def _raw_collection(target: EmbeddingTarget):
+    return get_vector_client().get_or_create_collection(name=target.collection, embedding_function=None)
+
+
+def _all_ids(collection, where: Optional[dict[str, Any]] = None) -> set[str]:
+    ids: set[str] = set()
+    offset = 0
+    while True:
+        page = collection.get(where=where, limit=ID_PAGE_SIZE, offset=offset, include=[])["ids"]
+        ids.update(page)
+        if len(page) < ID_PAGE_SIZE:
+            return ids
+        offset += len(page)
+
+
+def _copy(batch: dict[str, Any], target_collection, embeddings, migration_id: str) -> int:
+    if not batch["ids"]:
+        return 0
+    vectors = embeddings.embed_documents(batch["documents"])
+    metadatas = [{**(metadata or {}), MIGRATION_KEY: migration_id} for metadata in batch["metadatas"]]
+    target_collection.upsert(
+        ids=batch["ids"], embeddings=vectors, metadatas=metadatas, documents=batch["documents"]
+    )
+    return len(batch["ids"])
+
+
+class EmbeddingMigrator:
+    """
+    Background task that follows the active embedding target and drives migrations.
+
+    Every worker runs one: each poll applies a switch made elsewhere and tries to
+    claim the running migration, whose lease is renewed with every checkpoint.
+    """
+
+    def __init__(
+        self,
+        poll_seconds: float = settings.EMBEDDING_MIGRATION_POLL_SECONDS,
+        batch_size: int = settings.EMBEDDING_MIGRATION_BATCH_SIZE,
+        batch_interval: float = settings.EMBEDDING_MIGRATION_BATCH_INTERVAL_SECONDS,
+        lease_seconds: float = settings.EMBEDDING_MIGRATION_LEASE_SECONDS,
+        max_attempts: int = settings.EMBEDDING_MIGRATION_MAX_RETRIES,
+    ):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Embedding migration poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def sync_active_target(self) -> None:
+        target = await load_active_target()
+        if target is not None and target != active_embedding_target():
+            await run_in_threadpool(activate_embedding_target, target)
+
+    async def poll_once(self) -> Optional[str]:
+        """
+        Apply the active target and advance the running migration if this worker can claim it.
+
+        Returns:
+            Optional[str]: The status of the migration driven during this poll, if any.
+        """
+        await self.sync_active_target()
+        migration = await self._claim()
+        if migration is None:
+            return None
+        try:
+            await self._drive(migration)
+        except Exception as e:
+            attempts = migration.get("attempts", 0) + 1
+            logger.error(f"Embedding migration {migration['_id']} attempt {attempts} failed: {e}")
+            update: dict[str, Any] = {"attempts": attempts, "error": str(e), "lease_until": _now()}
+            if attempts >= self.max_attempts:
+                update.update({"status": FAILED, "finished_at": _now()})
+            await self._checkpoint(migration["_id"], update)
+        current = await get_migration(migration["_id"])
+        return current["status"] if current else None
+
+    async def _claim(self) -> Optional[dict[str, Any]]:
+        now = _now()
+        return await database.get_collection(MIGRATIONS_COLLECTION).find_one_and_update(
+            {"status": RUNNING, "$or": [{"owner": self.worker_id}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"owner": self.worker_id, "lease_until": now + timedelta(seconds=self.lease_seconds)}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _checkpoint(self, migration_id: str, update: dict[str, Any]) -> bool:
+        """
+        Persist progress and renew the lease; returns False when the lease was lost.
+        """
+        fields = {"lease_until": _now() + timedelta(seconds=self.lease_seconds), **update, "updated_at": _now()}
+        result = await database.get_collection(MIGRATIONS_COLLECTION).update_one(
+            {"_id": migration_id, "owner": self.worker_id}, {"$set": fields}
+        )
+        return result.matched_count > 0
+
+    async def _renew(self, migration_id: str) -> bool:
+        if await self._checkpoint(migration_id, {}):
+            return True
+        logger.warning(f"Lost the lease on embedding migration {migration_id}")
+        return False
+
+    async def _drive(self, migration: dict[str, Any]) -> None:
+        migration_id = migration["_id"]
+        source, target = _target(migration["source"]), _target(migration["target"])
+        source_collection = await run_in_threadpool(_raw_collection, source)
+        target_collection = await run_in_threadpool(_raw_collection, target)
+        embeddings = InstrumentedEmbeddings(create_embeddings(target.provider, target.model))
+
+        if migration["phase"] == COPY:
+            offset, copied = migration["offset"], migration["copied"]
+            while True:
+                batch = await run_in_threadpool(
+                    source_collection.get, limit=self.batch_size, offset=offset, include=["documents", "metadatas"]
+                )
+                count = await run_in_threadpool(_copy, batch, target_collection, embeddings, migration_id)
+                offset, copied = offset + count, copied + count
+                done = count < self.batch_size
+                update = {"offset": offset, "copied": copied, "attempts": 0}
+                if done:
+                    update["phase"] = RECONCILE
+                if not await self._checkpoint(migration_id, update):
+                    logger.warning(f"Lost the lease on embedding migration {migration_id}")
+                    return
+                if done:
+                    break
+                await asyncio.sleep(self.batch_interval)
+            migration["phase"] = RECONCILE
+
+        if migration["phase"] == RECONCILE:
+            for _ in range(MAX_RECONCILE_PASSES):
+                result = await self._reconcile(migration_id, source_collection, target_collection, embeddings)
+                if result is None:
+                    return
+                copied, deleted = result
+                if not await self._checkpoint(migration_id, {"copied_in_reconcile": copied, "deleted": deleted}):
+                    return
+                if not copied and not deleted:
+                    break
+
+            await database.get_collection(STATE_COLLECTION).update_one(
+                {"_id": ACTIVE_STATE_ID},
+                {"$set": {**target.to_dict(), "switched_at": _now()}, "$inc": {"version": 1}},
+                upsert=True,
+            )
+            await run_in_threadpool(activate_embedding_target, target)
+            if not await self._checkpoint(migration_id, {"phase": CATCH_UP, "switched_at": _now()}):
+                return
+            logger.info(f"Embedding migration {migration_id} switched queries to {target.collection}")
+            migration["phase"] = CATCH_UP
+
+        if migration["phase"] == CATCH_UP:
+            # Give every worker time to pick up the switch before the final pass.
+            await asyncio.sleep(2 * self.poll_seconds)
+            if not await self._renew(migration_id):
+                return
+            result = await self._reconcile(
+                migration_id, source_collection, target_collection, embeddings, after_switch=True
+            )
+            if result is None:
+                return
+            copied, deleted = result
+            await self._checkpoint(
+                migration_id,
+                {
+                    "status": COMPLETED,
+                    "copied_after_switch": copied,
+                    "deleted_after_switch": deleted,
+                    "error": None,
+                    "finished_at": _now(),
+                },
+            )
+            logger.info(f"Embedding migration {migration_id} completed")
+
+    async def _reconcile(
+        self, migration_id: str, source_collection, target_collection, embeddings, after_switch: bool = False
+    ) -> Optional[tuple[int, int]]:
+        """
+        Copy chunks missing from the target and delete chunks removed from the source.
+
+        Before the switch only the migration writes to the target, so every target
+        chunk absent from the source is removed. After it, switched workers write
+        new chunks to the target; only chunks this migration copied are compared.
+        The lease is renewed after the listing and every batch.
+
+        Returns:
+            Optional[tuple[int, int]]: Chunks copied and deleted, or None if the lease was lost.
+        """
+        source_ids = await run_in_threadpool(_all_ids, source_collection)
+        target_ids = await run_in_threadpool(_all_ids, target_collection)
+        missing = sorted(source_ids - target_ids)
+        if after_switch:
+            copied_ids = await run_in_threadpool(_all_ids, target_collection, {MIGRATION_KEY: migration_id})
+            extra = sorted(copied_ids - source_ids)
+        else:
+            extra = sorted(target_ids - source_ids)
+
+        copied = deleted = 0
+        if not await self._renew(migration_id):
+            return None
+        for start in range(0, len(missing), self.batch_size):
+            ids = missing[start:start + self.batch_size]
+            batch = await run_in_threadpool(source_collection.get, ids=ids, include=["documents", "metadatas"])
+            copied += await run_in_threadpool(_copy, batch, target_collection, embeddings, migration_id)
+            if not await self._renew(migration_id):
+                return None
+            await asyncio.sleep(self.batch_interval)
+        for start in range(0, len(extra), self.batch_size):
+            ids = extra[start:start + self.batch_size]
+            await run_in_threadpool(target_collection.delete, ids=ids)
+            deleted += len(ids)
+            if not await self._renew(migration_id):
+                return None
+        return copied, deleted
+
+
+embedding_migrator = EmbeddingMigrator()
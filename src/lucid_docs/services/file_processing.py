@@ -1,42 +1,123 @@
+import hashlib
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Union
 import logging
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+from lucid_docs.core.config import settings
 from lucid_docs.dependencies import get_chroma
+from lucid_docs.core.retrieval_cache import bump_version
+from lucid_docs.services.dedup import DUPLICATE_PAGES, deduplicate
+from lucid_docs.services.loaders import PDF, UnsupportedDocumentError, get_loader
+from lucid_docs.core.metrics import ingested_chunks, ingested_pages, stage
 
 
 logger = logging.getLogger(__name__)
 
 
-def process_pdf(file_path: Path, filename: str, username: str, chat_id: str = None):
+def page_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def process_document(
+    source: Union[Path, BinaryIO],
+    filename: str,
+    username: str,
+    chat_id: str = None,
+    before_embed: Optional[Callable[[list[Document]], None]] = None,
+    previous_page_hashes: Optional[list[str]] = None,
+    hash_file_name: Optional[str] = None,
+    content_type: str = PDF,
+):
     """
-    Process a PDF file by extracting pages, splitting the text into chunks,
+    Process a document by extracting pages, splitting the text into chunks,
     attaching metadata, and storing the documents.
 
+    The file is read from a path or directly from the upload's buffer, without a
+    temporary copy, by the loader registered for its content type (PDF, DOCX, text,
+    Markdown or HTML). Every page is identified by the hash of its extracted text, and
+    chunk ids are derived from the stored file name and page hash. When
+    `previous_page_hashes` is given the file is a new revision of the document stored
+    as `hash_file_name`: only pages whose
+    hash is new are split and embedded, chunks of pages that disappeared are deleted,
+    and unchanged pages keep their vectors (only their page number is updated if
+    they moved). Identical pages are stored once.
+
     Parameters:
-        file_path (Path): The path to the PDF file.
+        source (Path | BinaryIO): The file, or a seekable stream over its content.
         filename (str): The original file name as provided by the user.
         username (str): The identifier for the user.
         chat_id (str, optional): An optional chat identifier.
+        before_embed (Callable, optional): Called with the chunks before they are
+            embedded; may raise to abort ingestion (e.g. when a quota is exhausted).
+        previous_page_hashes (list[str], optional): Page hashes of the stored revision.
+        hash_file_name (str, optional): Name the document is stored under; defaults to
+            the file name of `source`, and is required when `source` is a stream.
+        content_type (str): MIME type selecting the loader; the file extension is
+            used when the type is not registered.
+
+    Raises:
+        ValueError: If the format is not supported.
+        UnsupportedDocumentError: If the file cannot be parsed as its format.
 
     Returns:
-        dict: A dictionary with the processing status, the number of pages,
-              and the number of chunks created.
+        dict: A dictionary with the processing status, the stored file name,
+              the number of pages, the number of chunks created and removed,
+              the page diff counts and the ordered page hashes.
     """
-    loader = PyPDFLoader(str(file_path))
-    pages = loader.load()
+    # Imported here so the splitter stack loads on first ingestion, not at startup.
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    if hash_file_name is None:
+        if not isinstance(source, Path):
+            raise ValueError("hash_file_name is required when the document is read from a stream")
+        hash_file_name = source.name
+    loader = get_loader(content_type, filename)
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    splits = text_splitter.split_documents(pages)
+    with stage("parse"):
+        try:
+            if isinstance(source, Path):
+                with source.open("rb") as stream:
+                    pages = list(loader.load(stream, hash_file_name))
+            else:
+                pages = list(loader.load(source, hash_file_name))
+        except Exception as e:
+            # Every parser has its own exceptions (pypdf, zipfile, XML, HTML); report one.
+            logger.warning(f"Failed to parse {filename} as {loader.content_type}: {e}")
+            raise UnsupportedDocumentError(f"The file could not be read as {loader.extension}: {e}") from e
 
+    hashes = [page_hash(page.page_content) for page in pages]
+    previous = previous_page_hashes or []
+    previous_index = {}
+    for index, value in enumerate(previous):
+        previous_index.setdefault(value, index)
+
+    new_pages, moved = [], {}
+    seen = set()
+    for index, (page, value) in enumerate(zip(pages, hashes)):
+        if value in seen:
+            continue
+        seen.add(value)
+        page.metadata["page_hash"] = value
+        if value not in previous_index:
+            new_pages.append(page)
+        elif previous_index[value] != index:
+            moved[value] = index
+    removed = set(previous_index) - seen
+
+    with stage("split"):
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200
+        )
+        splits = text_splitter.split_documents(new_pages)
+
+    ids = []
+    chunk_numbers: dict[str, int] = {}
     for split in splits:
         metadata = {
             "user_id": username,
-            "hash_file_name": file_path.name,
+            "hash_file_name": hash_file_name,
             "file_name": filename,
             "timestamp": datetime.now().isoformat()
         }
@@ -45,11 +126,103 @@ def process_pdf(file_path: Path, filename: str, username: str, chat_id: str = No
             metadata["chat_id"] = str(chat_id)
 
         split.metadata.update(metadata)
+        number = chunk_numbers.get(split.metadata["page_hash"], 0)
+        chunk_numbers[split.metadata["page_hash"]] = number + 1
+        ids.append(f"{hash_file_name}:{split.metadata['page_hash'][:16]}:{number}")
+
+    store = get_chroma()
+    embed, linked, skipped, canonical_updates = list(range(len(splits))), {}, [], {}
+    if settings.DEDUP_ENABLED and splits:
+        with stage("dedup"):
+            result = deduplicate(splits, store._collection, username, hash_file_name, excluded_pages=removed)
+        embed, linked, skipped, canonical_updates = (
+            result.embed, result.linked, result.skipped, result.canonical_updates
+        )
 
-    get_chroma().add_documents(documents=splits)
+    to_embed = [splits[index] for index in embed]
+    if before_embed is not None:
+        before_embed(to_embed)
+
+    removed_chunks = 0
+    with stage("store"):
+        if to_embed:
+            store.add_documents(documents=to_embed, ids=[ids[index] for index in embed])
+        if linked:
+            # Near-duplicates of other documents reuse the stored vector instead of being embedded.
+            store._collection.upsert(
+                ids=[ids[index] for index in linked],
+                embeddings=[vector for _, vector in linked.values()],
+                metadatas=[splits[index].metadata for index in linked],
+                documents=[splits[index].page_content for index in linked],
+            )
+        if canonical_updates:
+            store._collection.update(ids=list(canonical_updates), metadatas=list(canonical_updates.values()))
+        if removed or moved:
+            removed_chunks = _apply_page_diff(hash_file_name, removed, moved, hashes)
+        if to_embed or linked or canonical_updates or removed or moved:
+            # After the writes, so a concurrent search cannot cache pre-ingestion results as current.
+            bump_version(username, chat_id)
+
+    stored = len(to_embed) + len(linked)
+    ingested_pages.inc(len(new_pages))
+    ingested_chunks.inc(stored)
 
     return {
         "status": "processed",
+        "hash_file_name": hash_file_name,
         "page_count": len(pages),
-        "chunks": len(splits)
-    }
\ No newline at end of file
+        "chunks": stored,
+        "duplicates_skipped": len(skipped),
+        "duplicates_linked": len(linked),
+        "removed_chunks": removed_chunks,
+        "pages_added": len(new_pages),
+        "pages_removed": len(removed),
+        "pages_unchanged": len(seen) - len(new_pages),
+        "page_hashes": hashes,
+    }
+
+
+def _apply_page_diff(hash_file_name: str, removed: set[str], moved: dict[str, int], hashes: list[str]) -> int:
+    """
+    Delete the chunks of removed pages and renumber the chunks of moved pages.
+
+    A chunk whose skipped near-duplicates sit on a page that is still in the document
+    is moved to that page instead of being deleted.
+
+    Returns:
+        int: The number of chunks deleted.
+    """
+    collection = get_chroma()._collection
+    removed_chunks = 0
+    if removed:
+        surviving = {}
+        for index, value in enumerate(hashes):
+            surviving.setdefault(value[:16], (value, index))
+        existing = collection.get(
+            where={"$and": [{"hash_file_name": hash_file_name}, {"page_hash": {"$in": sorted(removed)}}]},
+            include=["metadatas"],
+        )
+        doomed, handed_over = [], {}
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            pages = [page for page in (metadata.get(DUPLICATE_PAGES) or "").split(",") if page in surviving]
+            if not pages:
+                doomed.append(chunk_id)
+                continue
+            value, index = surviving[pages[0]]
+            handed_over[chunk_id] = {
+                **metadata, "page_hash": value, "page": moved.get(value, index), DUPLICATE_PAGES: ",".join(pages[1:]),
+            }
+        if handed_over:
+            collection.update(ids=list(handed_over), metadatas=list(handed_over.values()))
+        for start in range(0, len(doomed), settings.VECTOR_DELETE_BATCH_SIZE):
+            collection.delete(ids=doomed[start:start + settings.VECTOR_DELETE_BATCH_SIZE])
+        removed_chunks = len(doomed)
+    if moved:
+        existing = collection.get(
+            where={"$and": [{"hash_file_name": hash_file_name}, {"page_hash": {"$in": sorted(moved)}}]},
+            include=["metadatas"],
+        )
+        if existing["ids"]:
+            metadatas = [{**metadata, "page": moved[metadata["page_hash"]]} for metadata in existing["metadatas"]]
+            collection.update(ids=existing["ids"], metadatas=metadatas)
+    return removed_chunks
@@ -0,0 +1,261 @@
+"""
+Conversation history for follow-up questions.
+
+Two modes keep the cost per request independent of the chat's length:
+
+- "turns": the last CHAT_HISTORY_TURNS question/answer pairs, read through the
+  (chat_id, timestamp) index newest first, with a projection and a limit;
+- "summary": a rolling summary stored on the chat's record in the
+  `conversations` collection, read with one indexed find_one. After each answer
+  the summary is updated from the previous summary and the new turn only, in a
+  background task, so it never re-reads the chat. That extra model call is charged
+  to the user's chat rate limit and its tokens are recorded as `summary_tokens`
+  on the answer and in the daily usage rollup.
+"""
+
+import logging
+from typing import Any, Optional
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DESCENDING
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.metrics import llm_tokens, stage
+from lucid_docs.core.rate_limit import CHAT, RateLimitExceeded, rate_limiter
+from lucid_docs.dependencies import get_llm
+from lucid_docs.services.usage_service import record_summary_usage
+from lucid_docs.utils.date import current_utc_timestamp
+from lucid_docs.utils.text import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+NONE = "none"
+TURNS = "turns"
+SUMMARY = "summary"
+HISTORY_MODES = (NONE, TURNS, SUMMARY)
+
+ROLE_LABELS = {"user": "Usuário", "assistant": "Assistente"}
+
+SUMMARY_PROMPT = PromptTemplate.from_template("""
+    Você mantém o resumo de uma conversa entre um usuário e um assistente que responde
+    perguntas sobre documentos. Reescreva o resumo atual incorporando a nova troca de
+    mensagens. Preserve nomes, números, fatos e decisões que possam ser retomados em
+    perguntas futuras, descarte cumprimentos e repetições e escreva em terceira pessoa,
+    em no máximo {max_chars} caracteres. Responda apenas com o resumo.
+
+    Resumo atual:
+    {summary}
+
+    Nova troca:
+    {question}
+    {answer}
+
+    Resumo atualizado:
+    """)
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def format_turns(messages: list[dict[str, Any]]) -> str:
+    """
+    Render messages, oldest first, as "Role: content" lines clipped to CHAT_HISTORY_MESSAGE_CHARS.
+    """
+    return "\n".join(
+        f"{ROLE_LABELS.get(message.get('role'), message.get('role'))}: "
+        f"{_clip(message.get('content', ''), settings.CHAT_HISTORY_MESSAGE_CHARS)}"
+        for message in messages
+    )
+
+
+async def recent_turns(
+    messages_collection: AsyncIOMotorCollection, username: str, chat_id: str, turns: int
+) -> str:
+    """
+    Load the last `turns` question/answer pairs of a chat.
+
+    Args:
+        messages_collection (AsyncIOMotorCollection): The messages collection.
+        username (str): The chat's owner.
+        chat_id (str): The chat.
+        turns (int): Number of pairs to include.
+
+    Returns:
+        str: The formatted messages, oldest first, or an empty string.
+    """
+    if turns <= 0:
+        return ""
+    cursor = messages_collection.find(
+        {"chat_id": chat_id, "username": username},
+        {"_id": 0, "role": 1, "content": 1},
+    ).sort("timestamp", DESCENDING).limit(turns * 2)
+    messages = await cursor.to_list(length=turns * 2)
+    return format_turns(list(reversed(messages)))
+
+
+async def load_summary(
+    conversations_collection: AsyncIOMotorCollection, username: str, chat_id: str
+) -> tuple[str, int]:
+    """
+    Load the rolling summary of a chat.
+
+    Returns:
+        tuple[str, int]: The summary (empty if none) and the number of turns it covers.
+    """
+    record = await conversations_collection.find_one(
+        {"username": username, "chat_id": chat_id}, {"_id": 0, "summary": 1, "turns": 1}
+    )
+    if record is None:
+        return "", 0
+    return record.get("summary", ""), record.get("turns", 0)
+
+
+async def load_history(
+    mode: str,
+    messages_collection: AsyncIOMotorCollection,
+    conversations_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: str,
+) -> tuple[str, int]:
+    """
+    Load the history to include in the prompt for the given mode.
+
+    Returns:
+        tuple[str, int]: The history text and, in summary mode, the number of turns
+        the summary covers (0 otherwise).
+    """
+    if mode == TURNS:
+        return await recent_turns(messages_collection, username, chat_id, settings.CHAT_HISTORY_TURNS), 0
+    if mode == SUMMARY:
+        return await load_summary(conversations_collection, username, chat_id)
+    return "", 0
+
+
+async def update_summary(
+    conversations_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: str,
+    summary: str,
+    turns: int,
+    question: str,
+    answer: str,
+) -> tuple[Optional[str], int]:
+    """
+    Fold a new turn into the chat's rolling summary.
+
+    The write only applies if no other request updated the summary since it was
+    read (`turns` still matches); a concurrent turn is then left out of the
+    summary rather than overwriting the other update.
+
+    Args:
+        conversations_collection (AsyncIOMotorCollection): The conversations collection.
+        username (str): The chat's owner.
+        chat_id (str): The chat.
+        summary (str): The summary the answer was generated with.
+        turns (int): The number of turns that summary covers.
+        question (str): The new question.
+        answer (str): The new answer.
+
+    Returns:
+        tuple[Optional[str], int]: The new summary, or None if it was not stored, and
+        the tokens the summarization call used (0 if it failed).
+    """
+    inputs = {
+        "max_chars": settings.CHAT_SUMMARY_MAX_CHARS,
+        "summary": summary or "(vazio)",
+        "question": format_turns([{"role": "user", "content": question}]),
+        "answer": format_turns([{"role": "assistant", "content": answer}]),
+    }
+    chain = SUMMARY_PROMPT | get_llm()
+    try:
+        with stage("summarize"):
+            message = await chain.ainvoke(inputs)
+    except Exception as e:
+        logger.error(f"Failed to summarize chat {chat_id}: {e}")
+        return None, 0
+
+    reported = getattr(message, "usage_metadata", None) or {}
+    llm_tokens.inc(reported.get("input_tokens", 0), type="prompt")
+    llm_tokens.inc(reported.get("output_tokens", 0), type="completion")
+    updated = StrOutputParser().invoke(message).strip()
+    tokens = (
+        (reported.get("input_tokens") or estimate_tokens(SUMMARY_PROMPT.format(**inputs)))
+        + (reported.get("output_tokens") or estimate_tokens(updated))
+    )
+    updated = _clip(updated, settings.CHAT_SUMMARY_MAX_CHARS)
+
+    query = {"username": username, "chat_id": chat_id, "turns": turns or {"$exists": False}}
+    try:
+        result = await conversations_collection.update_one(
+            query,
+            {"$set": {"summary": updated, "turns": turns + 1, "updated_at": current_utc_timestamp()}},
+            upsert=not turns,
+        )
+    except Exception as e:
+        # A concurrent first turn created the record (duplicate key) or Mongo is unavailable.
+        logger.warning(f"Summary of chat {chat_id} not stored: {e}")
+        return None, tokens
+    if not result.matched_count and not result.upserted_id:
+        logger.info(f"Summary of chat {chat_id} changed concurrently; skipping this turn")
+        return None, tokens
+    return updated, tokens
+
+
+async def summarize_turn(
+    conversations_collection: AsyncIOMotorCollection,
+    messages_collection: AsyncIOMotorCollection,
+    usage_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: str,
+    message_id: Any,
+    summary: str,
+    turns: int,
+    question: str,
+    answer: str,
+    top_k: int,
+    timestamp: str,
+) -> Optional[str]:
+    """
+    Background task updating the rolling summary after an answer, with its accounting.
+
+    The summarization call counts as one chat request against the user's rate
+    limit; when the limit is reached the turn is left out of the summary. The
+    tokens it used are stored as `usage.summary_tokens` on the assistant message
+    and added to the daily usage rollup.
+
+    Args:
+        conversations_collection (AsyncIOMotorCollection): The conversations collection.
+        messages_collection (AsyncIOMotorCollection): The messages collection.
+        usage_collection (AsyncIOMotorCollection): The usage_daily collection.
+        username (str): The chat's owner.
+        chat_id (str): The chat.
+        message_id (Any): The _id of the assistant message the turn ended with.
+        summary (str): The summary the answer was generated with.
+        turns (int): The number of turns that summary covers.
+        question (str): The new question.
+        answer (str): The new answer.
+        top_k (int): The answer's top_k, part of the rollup key.
+        timestamp (str): The answer's timestamp, an ISO 8601 UTC string.
+
+    Returns:
+        Optional[str]: The new summary, or None if it was not stored.
+    """
+    try:
+        await rate_limiter.hit(CHAT, username)
+    except RateLimitExceeded:
+        logger.info(f"Chat rate limit reached for user {username}; summary of chat {chat_id} not updated")
+        return None
+
+    updated, tokens = await update_summary(
+        conversations_collection, username, chat_id, summary, turns, question, answer
+    )
+    if tokens:
+        await record_summary_usage(usage_collection, username, chat_id, top_k, tokens, timestamp)
+        try:
+            await messages_collection.update_one({"_id": message_id}, {"$set": {"usage.summary_tokens": tokens}})
+        except Exception as e:
+            logger.error(f"Failed to record summary usage on message {message_id}: {e}")
+    return updated
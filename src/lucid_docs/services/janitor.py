@@ -0,0 +1,271 @@
+"""
+Garbage collection of temporary uploads and orphaned vectors.
+
+Uploads used to be written to TEMP_STORAGE_PATH before parsing (they are now read
+from the request buffer), and nothing reads those files once the document is
+registered. A failed ingestion can also leave a part of a document's chunks in
+Chroma. The janitor runs every JANITOR_INTERVAL_SECONDS and:
+
+- deletes temp files of registered documents older than TEMP_FILE_GRACE_SECONDS,
+  and any file older than TEMP_FILE_MAX_AGE_SECONDS;
+- removes the chunks and registry entry of documents still "ingesting" after
+  INGESTION_TIMEOUT_SECONDS;
+- removes the chunks and registry entries of users that no longer exist.
+
+Chunks are deleted in batches of VECTOR_DELETE_BATCH_SIZE. When several workers
+run, a lease in Mongo lets only one of them run each sweep.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.core.metrics import janitor_deleted_vectors, janitor_reclaimed_bytes
+from lucid_docs.core.retrieval_cache import invalidate_scope
+from lucid_docs.dependencies import get_chroma
+from lucid_docs.services.document_service import compact_vector_store, delete_vectors, document_filter
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = "janitor_state"
+LEASE_ID = "janitor"
+METADATA_PAGE_SIZE = 1000
+
+
+def _sqlite_size() -> int:
+    path = Path(settings.CHROMA_PERSIST_DIR) / "chroma.sqlite3"
+    return path.stat().st_size if path.exists() else 0
+
+
+def _chunk_user_ids() -> set[str]:
+    collection = get_chroma()._collection
+    user_ids: set[str] = set()
+    offset = 0
+    while True:
+        metadatas = collection.get(limit=METADATA_PAGE_SIZE, offset=offset, include=["metadatas"])["metadatas"]
+        user_ids.update(metadata["user_id"] for metadata in metadatas if metadata and "user_id" in metadata)
+        if len(metadatas) < METADATA_PAGE_SIZE:
+            return user_ids
+        offset += len(metadatas)
+
+
+class Janitor:
+    """
+    Background task that periodically reclaims disk space and vector store entries.
+
+    Args:
+        interval (float): Seconds between sweeps.
+        grace (float): Age after which the temp file of a registered document is removed.
+        max_age (float): Age after which any temp file is removed.
+        ingestion_timeout (float): Age after which an unfinished ingestion is discarded.
+        batch_size (int): Number of chunks deleted per vector store call.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.JANITOR_INTERVAL_SECONDS,
+        grace: float = settings.TEMP_FILE_GRACE_SECONDS,
+        max_age: float = settings.TEMP_FILE_MAX_AGE_SECONDS,
+        ingestion_timeout: float = settings.INGESTION_TIMEOUT_SECONDS,
+        batch_size: int = settings.VECTOR_DELETE_BATCH_SIZE,
+    ):
+        self.interval = interval
+        self.grace = grace
+        self.max_age = max_age
+        self.ingestion_timeout = ingestion_timeout
+        self.batch_size = batch_size
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.last_report: Optional[dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Janitor sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=self.interval * 0.9)
+        try:
+            claimed = await database.get_collection(STATE_COLLECTION).find_one_and_update(
+                {"_id": LEASE_ID, "lease_until": {"$lt": now}},
+                {"$set": {"owner": self.worker_id, "lease_until": lease_until}},
+            )
+            if claimed is None:
+                await database.get_collection(STATE_COLLECTION).insert_one(
+                    {"_id": LEASE_ID, "owner": self.worker_id, "lease_until": lease_until}
+                )
+        except Exception:
+            # Another worker holds the lease (insert hit the existing _id) or Mongo is unavailable.
+            return False
+        return True
+
+    async def poll_once(self) -> Optional[dict[str, Any]]:
+        """
+        Run a sweep if no other worker ran one during the current interval.
+
+        Returns:
+            Optional[dict[str, Any]]: The sweep report, or None when skipped.
+        """
+        if not await self._acquire_lease():
+            return None
+        return await self.run_once()
+
+    async def run_once(self) -> dict[str, Any]:
+        """
+        Run every cleanup step once.
+
+        Returns:
+            dict[str, Any]: Files removed and bytes reclaimed, chunks deleted by reason,
+            discarded ingestions and removed users.
+        """
+        start = time.perf_counter()
+        documents_collection = database.get_collection("documents")
+        size_before = await run_in_threadpool(_sqlite_size)
+
+        temp_files, temp_bytes = await self.sweep_temp_files(documents_collection)
+        stalled, stalled_vectors = await self.sweep_stalled_ingestions(documents_collection)
+        orphan_users, orphan_vectors = await self.sweep_orphaned_users(documents_collection)
+
+        deleted = stalled_vectors + orphan_vectors
+        compacted_bytes = 0
+        if deleted >= settings.VECTOR_STORE_COMPACT_MIN_DELETED and await run_in_threadpool(compact_vector_store):
+            compacted_bytes = max(size_before - await run_in_threadpool(_sqlite_size), 0)
+
+        janitor_reclaimed_bytes.inc(temp_bytes, kind="temp_files")
+        janitor_reclaimed_bytes.inc(compacted_bytes, kind="vector_store")
+        janitor_deleted_vectors.inc(stalled_vectors, reason="stalled_ingestion")
+        janitor_deleted_vectors.inc(orphan_vectors, reason="deleted_user")
+
+        report = {
+            "temp_files": temp_files,
+            "reclaimed_bytes": temp_bytes + compacted_bytes,
+            "deleted_vectors": {"stalled_ingestion": stalled_vectors, "deleted_user": orphan_vectors},
+            "stalled_documents": stalled,
+            "orphaned_users": orphan_users,
+            "duration_seconds": round(time.perf_counter() - start, 3),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.last_report = report
+        logger.info(
+            f"Janitor removed {temp_files} temp files, {deleted} chunks and reclaimed "
+            f"{report['reclaimed_bytes']} bytes in {report['duration_seconds']}s"
+        )
+        return report
+
+    async def sweep_temp_files(self, documents_collection) -> tuple[int, int]:
+        """
+        Delete temp files that are no longer needed.
+
+        Returns:
+            tuple[int, int]: Files removed and their total size in bytes.
+        """
+        temp_dir = Path(settings.TEMP_STORAGE_PATH)
+        if not temp_dir.is_dir():
+            return 0, 0
+        now = time.time()
+        candidates: dict[str, tuple[Path, float, int]] = {}
+        for entry in os.scandir(temp_dir):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            age = now - stat.st_mtime
+            if age > self.grace:
+                candidates[entry.name] = (Path(entry.path), age, stat.st_size)
+        if not candidates:
+            return 0, 0
+
+        registered = await documents_collection.find(
+            {"hash_file_name": {"$in": list(candidates)}, "status": {"$ne": "ingesting"}}, {"hash_file_name": 1}
+        ).to_list(length=None)
+        processed = {document["hash_file_name"] for document in registered}
+
+        removed = reclaimed = 0
+        for name, (path, age, size) in candidates.items():
+            if name in processed or age > self.max_age:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                reclaimed += size
+        return removed, reclaimed
+
+    async def sweep_stalled_ingestions(self, documents_collection) -> tuple[int, int]:
+        """
+        Discard documents whose ingestion never finished, with their partial chunks.
+
+        Returns:
+            tuple[int, int]: Documents discarded and chunks deleted.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.ingestion_timeout)).isoformat()
+        stalled = await documents_collection.find(
+            {"status": "ingesting", "updated_at": {"$lt": cutoff}}, {"hash_file_name": 1, "username": 1, "chat_id": 1}
+        ).to_list(length=None)
+
+        deleted = 0
+        for document in stalled:
+            where = document_filter(document["username"], document["hash_file_name"])
+            deleted += await run_in_threadpool(delete_vectors, where, self.batch_size)
+            await invalidate_scope(document["username"], document.get("chat_id"))
+            await documents_collection.delete_one({"_id": document["_id"], "status": "ingesting"})
+            Path(settings.TEMP_STORAGE_PATH, document["hash_file_name"]).unlink(missing_ok=True)
+            logger.info(f"Discarded unfinished ingestion of {document['hash_file_name']}")
+        return len(stalled), deleted
+
+    async def sweep_orphaned_users(self, documents_collection) -> tuple[int, int]:
+        """
+        Remove the chunks and registry entries of users that no longer exist.
+
+        Returns:
+            tuple[int, int]: Users cleaned up and chunks deleted.
+        """
+        user_ids = await run_in_threadpool(_chunk_user_ids)
+        if not user_ids:
+            return 0, 0
+        existing = await database.get_collection("users").find(
+            {"username": {"$in": sorted(user_ids)}}, {"username": 1}
+        ).to_list(length=None)
+        if not existing:
+            # No owner of any chunk exists: more likely a wrong database than deleted users.
+            logger.warning(f"None of the {len(user_ids)} chunk owners were found; skipping orphan cleanup")
+            return 0, 0
+        missing = sorted(user_ids - {user["username"] for user in existing})
+        if not missing:
+            return 0, 0
+
+        deleted = await run_in_threadpool(delete_vectors, {"user_id": {"$in": missing}}, self.batch_size)
+        await documents_collection.delete_many({"username": {"$in": missing}})
+        logger.info(f"Removed {deleted} chunks of {len(missing)} deleted users")
+        return len(missing), deleted
+
+
+janitor = Janitor()
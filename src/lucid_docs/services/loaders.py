@@ -0,0 +1,315 @@
+"""
+Document loaders by content type.
+
+Every loader reads a seekable binary stream (the upload buffer, a memory-mapped
+file or an open file) and yields one Document per page, with ``source`` and
+``page`` metadata, so all formats go through the same split, metadata and embed
+pipeline in `process_document`.
+
+PDFs have real pages. The other formats are read incrementally and cut into
+page-equivalents of about LOADER_PAGE_CHARS characters. A new page also starts at
+every heading and at explicit page breaks, so after an edit the page boundaries
+realign and an incremental revision only re-embeds the pages around the change.
+"""
+
+import codecs
+import re
+import zipfile
+from contextlib import nullcontext
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import PurePath
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional
+from xml.etree.ElementTree import iterparse
+
+from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
+
+from lucid_docs.core.config import settings
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT = "text/plain"
+MARKDOWN = "text/markdown"
+HTML = "text/html"
+
+READ_SIZE = 64 * 1024
+
+# A block of text and whether it must start a new page (heading or page break).
+Block = tuple[str, bool]
+Loader = Callable[[BinaryIO, str], Iterator[Document]]
+
+
+@dataclass(frozen=True)
+class LoaderSpec:
+    """
+    A registered loader with the content type and file extension it handles.
+    """
+
+    content_type: str
+    extensions: tuple[str, ...]
+    load: Loader
+
+    @property
+    def extension(self) -> str:
+        return self.extensions[0]
+
+
+LOADERS: dict[str, LoaderSpec] = {}
+
+
+class UnsupportedDocumentError(ValueError):
+    """
+    Raised when a file cannot be parsed by the loader of its format, e.g. a corrupt
+    PDF or a DOCX that is not a valid zip archive.
+    """
+
+
+def register_loader(content_type: str, extensions: tuple[str, ...], aliases: Iterable[str] = ()):
+    """
+    Register a loader for a content type, its extensions (canonical first) and alias types.
+    """
+    def decorator(load: Loader) -> Loader:
+        spec = LoaderSpec(content_type, extensions, load)
+        for name in (content_type, *aliases):
+            LOADERS[name] = spec
+        return load
+    return decorator
+
+
+def get_loader(content_type: Optional[str], filename: Optional[str] = None) -> LoaderSpec:
+    """
+    Find the loader for an upload, by content type or else by file extension.
+
+    Browsers often send Markdown and text files as application/octet-stream, so the
+    extension is used when the content type is not registered.
+
+    Raises:
+        ValueError: If neither the content type nor the extension is supported.
+
+    Returns:
+        LoaderSpec: The matching loader.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in LOADERS:
+        return LOADERS[content_type]
+    suffix = PurePath(filename or "").suffix.lower()
+    for spec in LOADERS.values():
+        if suffix in spec.extensions:
+            return spec
+    accepted = sorted({extension for spec in LOADERS.values() for extension in spec.extensions})
+    raise ValueError(f"Unsupported file format. Accepted: {', '.join(accepted)}")
+
+
+def paginate(blocks: Iterable[Block], name: str, page_chars: Optional[int] = None) -> Iterator[Document]:
+    """
+    Group text blocks into page-equivalents.
+
+    Args:
+        blocks (Iterable[Block]): Paragraph texts, each flagged when it starts a section.
+        name (str): Value of the ``source`` metadata.
+        page_chars (Optional[int]): Target page size; defaults to LOADER_PAGE_CHARS.
+
+    Yields:
+        Document: One document per page, numbered from 0.
+    """
+    page_chars = page_chars or settings.LOADER_PAGE_CHARS
+    parts: list[str] = []
+    size = 0
+    page = 0
+    for text, breaks in blocks:
+        text = text.strip()
+        if parts and (breaks or size + len(text) > page_chars):
+            yield Document(page_content="\n\n".join(parts), metadata={"source": name, "page": page})
+            parts, size, page = [], 0, page + 1
+        if text:
+            parts.append(text)
+            size += len(text) + 2
+    if parts:
+        yield Document(page_content="\n\n".join(parts), metadata={"source": name, "page": page})
+
+
+def _decoded(source: BinaryIO) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    source.seek(0)
+    while chunk := source.read(READ_SIZE):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _lines(source: BinaryIO) -> Iterator[str]:
+    pending = ""
+    for text in _decoded(source):
+        pending += text
+        *lines, pending = pending.split("\n")
+        yield from lines
+    if pending:
+        yield pending
+
+
+class StreamBlob(Blob):
+    """
+    Blob read from an already open stream instead of bytes or a path.
+    """
+    stream: Any = None
+
+    def as_bytes_io(self):
+        self.stream.seek(0)
+        return nullcontext(self.stream)
+
+
+@register_loader(PDF, (".pdf",))
+def load_pdf(source: BinaryIO, name: str) -> Iterator[Document]:
+    # Same parser as PyPDFLoader, so page hashes match documents ingested from a path.
+    from langchain_community.document_loaders.parsers.pdf import PyPDFParser
+
+    return PyPDFParser().lazy_parse(StreamBlob(stream=source, path=name))
+
+
+@register_loader(TEXT, (".txt",))
+def load_text(source: BinaryIO, name: str) -> Iterator[Document]:
+    def blocks() -> Iterator[Block]:
+        paragraph: list[str] = []
+        for line in _lines(source):
+            if "\f" in line:
+                # Form feed: an explicit page break in plain text exports.
+                before, _, after = line.partition("\f")
+                paragraph.append(before)
+                yield "\n".join(paragraph), False
+                yield "", True
+                paragraph = [after]
+            elif line.strip():
+                paragraph.append(line.rstrip())
+            elif paragraph:
+                yield "\n".join(paragraph), False
+                paragraph = []
+        if paragraph:
+            yield "\n".join(paragraph), False
+
+    return paginate(blocks(), name)
+
+
+MARKDOWN_HEADING = re.compile(r"^#{1,3}\s")
+MARKDOWN_FENCE = re.compile(r"^(```|~~~)")
+
+
+@register_loader(MARKDOWN, (".md", ".markdown"), aliases=("text/x-markdown",))
+def load_markdown(source: BinaryIO, name: str) -> Iterator[Document]:
+    def blocks() -> Iterator[Block]:
+        paragraph: list[str] = []
+        heading = False
+        fenced = False
+        for line in _lines(source):
+            if MARKDOWN_FENCE.match(line):
+                fenced = not fenced
+            if not fenced and MARKDOWN_HEADING.match(line):
+                if paragraph:
+                    yield "\n".join(paragraph), heading
+                paragraph, heading = [line.rstrip()], True
+            elif line.strip() or fenced:
+                paragraph.append(line.rstrip())
+            elif paragraph:
+                yield "\n".join(paragraph), heading
+                paragraph, heading = [], False
+        if paragraph:
+            yield "\n".join(paragraph), heading
+
+    return paginate(blocks(), name)
+
+
+class _HTMLBlocks(HTMLParser):
+    """
+    Incremental HTML parser that emits the text of block elements.
+    """
+
+    BLOCK_TAGS = {
+        "p", "div", "li", "tr", "br", "pre", "blockquote", "section", "article", "table",
+        "ul", "ol", "dd", "dt", "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer",
+    }
+    SECTION_TAGS = {"h1", "h2", "h3"}
+    SKIPPED_TAGS = {"script", "style", "head", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: list[Block] = []
+        self._text: list[str] = []
+        self._skip = 0
+        self._section = False
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._text).split())
+        if text:
+            self.blocks.append((text, self._section))
+            self._section = False
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            if tag in self.SECTION_TAGS:
+                self._section = True
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text.append(data)
+
+
+@register_loader(HTML, (".html", ".htm"), aliases=("application/xhtml+xml",))
+def load_html(source: BinaryIO, name: str) -> Iterator[Document]:
+    def blocks() -> Iterator[Block]:
+        parser = _HTMLBlocks()
+        for text in _decoded(source):
+            parser.feed(text)
+            yield from parser.blocks
+            parser.blocks.clear()
+        parser.close()
+        parser._flush()
+        yield from parser.blocks
+
+    return paginate(blocks(), name)
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@register_loader(DOCX, (".docx",))
+def load_docx(source: BinaryIO, name: str) -> Iterator[Document]:
+    def blocks() -> Iterator[Block]:
+        source.seek(0)
+        with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+            text: list[str] = []
+            breaks = False
+            for event, element in iterparse(xml, events=("start", "end")):
+                if event == "start":
+                    if element.tag == f"{W}p":
+                        text, breaks = [], False
+                    continue
+                tag = element.tag
+                if tag == f"{W}t":
+                    text.append(element.text or "")
+                elif tag == f"{W}tab":
+                    text.append("\t")
+                elif tag == f"{W}br":
+                    if element.get(f"{W}type") == "page":
+                        yield "".join(text), breaks
+                        text, breaks = [], True
+                    else:
+                        text.append("\n")
+                elif tag == f"{W}pStyle" and (element.get(f"{W}val") or "").lower().startswith(("heading", "title")):
+                    breaks = True
+                elif tag == f"{W}pageBreakBefore":
+                    breaks = True
+                elif tag == f"{W}p":
+                    yield "".join(text), breaks
+                    # Release parsed paragraphs so memory stays flat for large documents.
+                    element.clear()
+
+    return paginate(blocks(), name)
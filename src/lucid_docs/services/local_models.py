@@ -0,0 +1,133 @@
+"""
+Deterministic CPU-only embedding and chat models.
+
+They allow the service to ingest and answer questions without any external provider
+(air-gapped deployments, offline regression tests) and make it possible to measure our
+own overhead separately from provider latency, using exactly the same code path as the
+Gemini backends. An artificial latency can be configured to model a remote provider.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Feature-hashing embedder, equivalent to a sparse random projection of the bag of words.
+
+    Every token is hashed to a dimension and a sign; vectors are L2-normalized so cosine
+    similarity reflects shared vocabulary. Identical texts always map to identical vectors.
+    """
+
+    def __init__(self, dimensions: int = 384, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for token in tokenize(text):
+            value = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
+
+
+class ExtractiveChatModel(BaseChatModel):
+    """
+    Chat model that answers with the context sentences that best overlap the question.
+
+    It expects the RAG prompt layout used by `query_collection` ("Contexto: ...
+    Pergunta: ... Resposta:") and falls back to treating the whole prompt as context.
+    """
+
+    max_sentences: int = 3
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "extractive"
+
+    @staticmethod
+    def _split_prompt(prompt: str) -> tuple[str, str]:
+        context, question = prompt, ""
+        if "Contexto:" in prompt:
+            context = prompt.split("Contexto:", 1)[1]
+        if "Pergunta:" in context:
+            context, question = context.split("Pergunta:", 1)
+        question = question.split("Resposta:", 1)[0]
+        return context.strip(), question.strip()
+
+    def answer(self, prompt: str) -> str:
+        context, question = self._split_prompt(prompt)
+        sentences = [s.strip() for s in SENTENCE_PATTERN.split(context) if s.strip()]
+        if not sentences:
+            return ""
+        question_tokens = set(tokenize(question))
+        scored = sorted(
+            range(len(sentences)),
+            key=lambda i: (-len(question_tokens & set(tokenize(sentences[i]))), i),
+        )
+        selected = sorted(scored[: self.max_sentences])
+        return " ".join(sentences[i] for i in selected)
+
+    def _respond(self, messages: list[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        answer = self.answer(prompt)
+        message = AIMessage(
+            content=answer,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(answer) // 4,
+                "total_tokens": (len(prompt) + len(answer)) // 4,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
@@ -0,0 +1,178 @@
+"""
+Registry of embedding and language model providers.
+
+Providers are selected by name through EMBEDDING_PROVIDER and LLM_PROVIDER. Each entry
+is a factory that imports its client library only when called, so backends that are
+not selected cost nothing at import time. New backends are added with the
+`register_embedding_provider` / `register_llm_provider` decorators.
+"""
+
+import re
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from lucid_docs.core.config import settings
+
+EMBEDDING_PROVIDERS: dict[str, Callable[[str], Embeddings]] = {}
+LLM_PROVIDERS: dict[str, Callable[[str], BaseChatModel]] = {}
+
+
+def register_embedding_provider(name: str):
+    def decorator(factory: Callable[[str], Embeddings]) -> Callable[[str], Embeddings]:
+        EMBEDDING_PROVIDERS[name] = factory
+        return factory
+    return decorator
+
+
+def register_llm_provider(name: str):
+    def decorator(factory: Callable[[str], BaseChatModel]) -> Callable[[str], BaseChatModel]:
+        LLM_PROVIDERS[name] = factory
+        return factory
+    return decorator
+
+
+@register_embedding_provider("gemini")
+def _gemini_embeddings(model: str) -> Embeddings:
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(
+        model=model,
+        google_api_key=settings.GEMINI_API_KEY
+    )
+
+
+@register_embedding_provider("hashing")
+def _hashing_embeddings(model: str) -> Embeddings:
+    from lucid_docs.services.local_models import HashingEmbeddings
+
+    return HashingEmbeddings(
+        dimensions=settings.LOCAL_EMBEDDING_DIMENSIONS,
+        latency=settings.LOCAL_EMBEDDING_LATENCY_MS / 1000,
+    )
+
+
+@register_llm_provider("gemini")
+def _gemini_llm(model: str) -> BaseChatModel:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    # Deadlines, fallback and the circuit breaker are handled by ResilientChatModel;
+    # long client-side retries with backoff would only hide failures from it.
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=settings.GEMINI_API_KEY,
+        temperature=0,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        max_retries=settings.LLM_MAX_RETRIES,
+    )
+
+
+@register_llm_provider("extractive")
+def _extractive_llm(model: str) -> BaseChatModel:
+    from lucid_docs.services.local_models import ExtractiveChatModel
+
+    return ExtractiveChatModel(
+        max_sentences=settings.LOCAL_LLM_MAX_SENTENCES,
+        latency=settings.LOCAL_LLM_LATENCY_MS / 1000,
+    )
+
+
+def create_embeddings(name: str | None = None, model: str | None = None) -> Embeddings:
+    """
+    Build the embeddings client for a provider.
+
+    Args:
+        name (str | None): Provider name. Defaults to the active embedding provider.
+        model (str | None): Model name. Defaults to the active embedding model.
+
+    Raises:
+        ValueError: If the provider is not registered.
+
+    Returns:
+        Embeddings: The embeddings client.
+    """
+    active = active_embedding_target()
+    name = (name or active.provider).lower()
+    if name not in EMBEDDING_PROVIDERS:
+        raise ValueError(f"Unknown embedding provider '{name}'. Available: {sorted(EMBEDDING_PROVIDERS)}")
+    return EMBEDDING_PROVIDERS[name](model or active.model)
+
+
+def create_llm(name: str | None = None, model: str | None = None) -> BaseChatModel:
+    """
+    Build the chat model for a provider.
+
+    Args:
+        name (str | None): Provider name. Defaults to LLM_PROVIDER.
+        model (str | None): Model name. Defaults to LLM_MODEL.
+
+    Raises:
+        ValueError: If the provider is not registered.
+
+    Returns:
+        BaseChatModel: The chat model.
+    """
+    name = (name or settings.LLM_PROVIDER).lower()
+    if name not in LLM_PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}'. Available: {sorted(LLM_PROVIDERS)}")
+    return LLM_PROVIDERS[name](model or settings.LLM_MODEL)
+
+
+def collection_name() -> str:
+    """
+    Return the Chroma collection for the configured embedding provider.
+
+    Vectors from different providers are not comparable, so non-default providers
+    get their own collection instead of mixing dimensions in one.
+
+    Returns:
+        str: The collection name.
+    """
+    provider = settings.EMBEDDING_PROVIDER.lower()
+    if provider == "gemini":
+        return settings.CHROMA_COLLECTION_NAME
+    return f"{settings.CHROMA_COLLECTION_NAME}__{provider}"
+
+
+def migration_collection_name(provider: str, model: str) -> str:
+    """
+    Return the shadow collection that holds vectors of an embedding migration target.
+    """
+    slug = re.sub(r"[^a-zA-Z0-9._-]+", "-", model).strip("-._") or "default"
+    return f"{settings.CHROMA_COLLECTION_NAME}__{provider.lower()}__{slug}"
+
+
+@dataclass(frozen=True)
+class EmbeddingTarget:
+    """
+    An embedding provider and model together with the collection holding its vectors.
+    """
+
+    provider: str
+    model: str
+    collection: str
+
+    def to_dict(self) -> dict[str, str]:
+        return asdict(self)
+
+
+_active_target: Optional[EmbeddingTarget] = None
+
+
+def default_embedding_target() -> EmbeddingTarget:
+    return EmbeddingTarget(settings.EMBEDDING_PROVIDER.lower(), settings.EMBEDDING_MODEL, collection_name())
+
+
+def active_embedding_target() -> EmbeddingTarget:
+    """
+    Return the embedding target serving queries: the one switched to by the latest
+    completed migration, or the one configured in settings.
+    """
+    return _active_target or default_embedding_target()
+
+
+def set_active_embedding_target(target: Optional[EmbeddingTarget]) -> None:
+    global _active_target
+    _active_target = target
@@ -0,0 +1,289 @@
+"""
+Deadlines, circuit breaking, fallback and hedging for language model calls.
+
+`get_llm` returns a `ResilientChatModel` wrapping the model of LLM_PROVIDER and,
+when LLM_FALLBACK_PROVIDER is set, a fallback model. On every call:
+
+- each attempt is bounded by LLM_TIMEOUT_SECONDS and the whole call, fallback
+  included, by LLM_DEADLINE_SECONDS;
+- each model has a circuit breaker that opens on a high share of failed or slow
+  calls, so requests fail over (or fail fast) instead of waiting on a degraded
+  provider;
+- when the primary model fails, times out or its circuit is open, the fallback
+  model answers;
+- with LLM_HEDGE_ENABLED, a second request to the same model is sent when the
+  first has not answered after the model's recent p95 latency, and the first
+  answer wins. This costs about 5% more calls and cuts the tail latency.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from lucid_docs.core.circuit_breaker import CircuitBreaker
+from lucid_docs.core.config import settings
+from lucid_docs.core.metrics import llm_hedges, llm_requests
+from lucid_docs.services.providers import create_llm
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """
+    Raised when no language model can answer: every circuit is open or the deadline passed.
+    """
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """
+    Raised when a language model does not answer within its timeout.
+    """
+
+
+def create_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name=f"llm.{name}",
+        window=settings.LLM_BREAKER_WINDOW,
+        min_calls=settings.LLM_BREAKER_MIN_CALLS,
+        error_rate=settings.LLM_BREAKER_ERROR_RATE,
+        slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate=settings.LLM_BREAKER_SLOW_CALL_RATE,
+        open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+    )
+
+
+class LLMRoute:
+    """
+    A chat model with its circuit breaker and recent latencies.
+
+    Args:
+        name (str): Route name used in metrics and status, e.g. "primary".
+        model (BaseChatModel): The chat model.
+        breaker (CircuitBreaker): The model's circuit breaker.
+        provider (str): Provider name, for status reports.
+        model_name (str): Model name, for status reports.
+        latency_window (int): Number of successful call latencies kept for hedging.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: BaseChatModel,
+        breaker: CircuitBreaker,
+        provider: str = "",
+        model_name: str = "",
+        latency_window: int = 200,
+    ):
+        self.name = name
+        self.model = model
+        self.breaker = breaker
+        self.provider = provider
+        self.model_name = model_name
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+
+    def record(self, success: bool, start: float, outcome: str) -> None:
+        latency = time.perf_counter() - start
+        self.breaker.record(success, latency)
+        if success:
+            self.latencies.append(latency)
+        llm_requests.inc(model=self.name, outcome=outcome)
+
+    def percentile(self, fraction: float) -> float:
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    def status(self) -> dict[str, Any]:
+        return {"provider": self.provider, "model": self.model_name, **self.breaker.stats()}
+
+
+class ResilientChatModel(BaseChatModel):
+    """
+    Chat model that routes each call to the first available model of `routes`.
+
+    The answer's `response_metadata["llm_route"]` names the route that produced it.
+    Only the async path enforces deadlines and hedges: a blocking call cannot be
+    cancelled, so `invoke` just skips open circuits and falls back on errors.
+    """
+
+    routes: list[Any]
+    timeout: float = 30.0
+    deadline: float = 45.0
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient"
+
+    def hedge_delay(self, route: LLMRoute) -> Optional[float]:
+        """
+        Return how long to wait for `route` before hedging, or None to not hedge.
+        """
+        if not self.hedge or len(route.latencies) < self.hedge_min_samples:
+            return None
+        return route.percentile(self.hedge_percentile)
+
+    def status(self) -> dict[str, Any]:
+        return {route.name: route.status() for route in self.routes}
+
+    @staticmethod
+    def _result(route: LLMRoute, message: BaseMessage) -> ChatResult:
+        message = message.model_copy(
+            update={"response_metadata": {**message.response_metadata, "llm_route": route.name}}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for route in self.routes:
+            if not route.breaker.allow():
+                llm_requests.inc(model=route.name, outcome="rejected")
+                continue
+            start = time.perf_counter()
+            try:
+                message = route.model.invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                route.record(False, start, "error")
+                logger.warning(f"LLM route {route.name} failed: {e}")
+                last_error = e
+                continue
+            route.record(True, start, "ok")
+            return self._result(route, message)
+        raise last_error or LLMUnavailableError("Every language model circuit is open")
+
+    async def _attempt(
+        self, route: LLMRoute, messages: list[BaseMessage], stop: Optional[list[str]], timeout: float, **kwargs: Any
+    ) -> ChatResult:
+        start = time.perf_counter()
+        try:
+            message = await asyncio.wait_for(route.model.ainvoke(messages, stop=stop, **kwargs), timeout=timeout)
+        except asyncio.CancelledError:
+            # Lost a hedge race or the request was cancelled: no outcome to record.
+            route.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            route.record(False, start, "timeout")
+            raise LLMTimeoutError(f"LLM route {route.name} did not answer within {timeout:.1f}s") from None
+        except Exception:
+            route.record(False, start, "error")
+            raise
+        route.record(True, start, "ok")
+        return self._result(route, message)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        candidates = iter(self.routes)
+        attempts: dict[asyncio.Task, tuple[LLMRoute, bool]] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch(route: LLMRoute, hedged: bool = False) -> None:
+            timeout = min(self.timeout, deadline - loop.time())
+            task = asyncio.create_task(self._attempt(route, messages, stop, timeout, **kwargs))
+            attempts[task] = (route, hedged)
+
+        def launch_next() -> Optional[LLMRoute]:
+            for route in candidates:
+                if route.breaker.allow():
+                    launch(route)
+                    return route
+                llm_requests.inc(model=route.name, outcome="rejected")
+            return None
+
+        route = launch_next()
+        if route is None:
+            raise LLMUnavailableError("Every language model circuit is open")
+        hedge_at = None
+        hedge_delay = self.hedge_delay(route)
+        if hedge_delay is not None:
+            hedge_at = loop.time() + hedge_delay
+
+        try:
+            while attempts:
+                now = loop.time()
+                if now >= deadline:
+                    raise LLMTimeoutError(f"No language model answered within {self.deadline:.1f}s")
+                wait = deadline - now if hedge_at is None else max(0.0, min(deadline, hedge_at) - now)
+                done, _ = await asyncio.wait(attempts, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if hedge_at is not None and loop.time() >= hedge_at:
+                        hedge_at = None
+                        if route.breaker.allow():
+                            launch(route, hedged=True)
+                            llm_hedges.inc(outcome="launched")
+                    continue
+                for task in done:
+                    _, hedged = attempts.pop(task)
+                    if task.exception() is None:
+                        if hedged:
+                            llm_hedges.inc(outcome="won")
+                        return task.result()
+                    last_error = task.exception()
+                if not attempts and loop.time() < deadline:
+                    # Hedging only applies to the first route.
+                    hedge_at = None
+                    next_route = launch_next()
+                    if next_route is not None:
+                        logger.warning(f"LLM route {route.name} failed, falling back to {next_route.name}: {last_error}")
+                        route = next_route
+            raise last_error or LLMUnavailableError("Every language model circuit is open")
+        finally:
+            for task in attempts:
+                task.cancel()
+
+
+def create_resilient_llm() -> ResilientChatModel:
+    """
+    Build the primary model of LLM_PROVIDER and the optional fallback model behind breakers.
+
+    Returns:
+        ResilientChatModel: The model to use in chains.
+    """
+    routes = [LLMRoute(
+        "primary", create_llm(), create_breaker("primary"),
+        settings.LLM_PROVIDER, settings.LLM_MODEL, settings.LLM_HEDGE_WINDOW,
+    )]
+    if settings.LLM_FALLBACK_PROVIDER:
+        model_name = settings.LLM_FALLBACK_MODEL or settings.LLM_MODEL
+        routes.append(LLMRoute(
+            "fallback", create_llm(settings.LLM_FALLBACK_PROVIDER, model_name), create_breaker("fallback"),
+            settings.LLM_FALLBACK_PROVIDER, model_name, settings.LLM_HEDGE_WINDOW,
+        ))
+    return ResilientChatModel(
+        routes=routes,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        deadline=settings.LLM_DEADLINE_SECONDS,
+        hedge=settings.LLM_HEDGE_ENABLED,
+        hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+        hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    )
+
+
+def llm_status() -> dict[str, Any]:
+    """
+    Return the breaker state of every LLM route, or an empty dict before the model is built.
+    """
+    from lucid_docs import dependencies
+
+    llm = dependencies.llm
+    return llm.status() if isinstance(llm, ResilientChatModel) else {}
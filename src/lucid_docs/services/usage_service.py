@@ -0,0 +1,156 @@
+"""
+Token and latency accounting of chat answers.
+
+Every assistant message stores its own usage. It is also added to a daily rollup
+in the `usage_daily` collection, one document per day, user, chat and top_k,
+updated with a single upsert per answer. In summary history mode the tokens of
+the summarization call that follows an answer are added to the same rollup as
+`summary_tokens`. `GET /usage` aggregates these rollups,
+so a report reads at most one document per chat and day instead of scanning the
+messages collection.
+"""
+
+import logging
+from datetime import date
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from lucid_docs.models.database import MessageUsage
+
+logger = logging.getLogger(__name__)
+
+USAGE_COLLECTION = "usage_daily"
+COUNTERS = (
+    "messages", "prompt_tokens", "completion_tokens", "context_chars", "context_chunks",
+    "retrieval_ms", "generation_ms", "cache_hits", "errors", "summary_tokens",
+)
+GROUP_FIELDS = ("day", "chat_id", "top_k", "username")
+
+
+async def record_usage(
+    usage_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: str,
+    usage: MessageUsage,
+    timestamp: str,
+) -> None:
+    """
+    Add an answer's usage to its daily rollup.
+
+    Failures are logged and swallowed: accounting must never fail a chat request.
+
+    Args:
+        usage_collection (AsyncIOMotorCollection): The usage_daily collection.
+        username (str): The user who asked.
+        chat_id (str): The chat of the message.
+        usage (MessageUsage): The usage recorded on the assistant message.
+        timestamp (str): The message timestamp, an ISO 8601 UTC string.
+    """
+    increments = {
+        "messages": 1,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "context_chars": usage.context_chars,
+        "context_chunks": usage.context_chunks,
+        "retrieval_ms": usage.retrieval_ms,
+        "generation_ms": usage.generation_ms,
+        "cache_hits": int(usage.cache_hit),
+        "errors": int(usage.error),
+    }
+    try:
+        await usage_collection.update_one(
+            {"day": timestamp[:10], "username": username, "chat_id": chat_id, "top_k": usage.top_k},
+            {"$inc": increments},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.error(f"Failed to record usage for user {username}: {e}")
+
+
+async def record_summary_usage(
+    usage_collection: AsyncIOMotorCollection,
+    username: str,
+    chat_id: str,
+    top_k: int,
+    tokens: int,
+    timestamp: str,
+) -> None:
+    """
+    Add the tokens of a chat summary update to the daily rollup of its answer.
+
+    Failures are logged and swallowed, like `record_usage`.
+
+    Args:
+        usage_collection (AsyncIOMotorCollection): The usage_daily collection.
+        username (str): The chat's owner.
+        chat_id (str): The chat.
+        top_k (int): The answer's top_k.
+        tokens (int): Prompt and completion tokens of the summarization call.
+        timestamp (str): The answer's timestamp, an ISO 8601 UTC string.
+    """
+    try:
+        await usage_collection.update_one(
+            {"day": timestamp[:10], "username": username, "chat_id": chat_id, "top_k": top_k},
+            {"$inc": {"summary_tokens": tokens}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.error(f"Failed to record summary usage for user {username}: {e}")
+
+
+def _summarize(counters: dict[str, Any]) -> dict[str, Any]:
+    summary = {name: counters.get(name, 0) for name in COUNTERS}
+    for name in ("retrieval_ms", "generation_ms"):
+        summary[name] = round(summary[name], 2)
+    messages = summary["messages"]
+    summary["avg_retrieval_ms"] = round(summary["retrieval_ms"] / messages, 2) if messages else 0.0
+    summary["avg_generation_ms"] = round(summary["generation_ms"] / messages, 2) if messages else 0.0
+    summary["cache_hit_ratio"] = round(summary["cache_hits"] / messages, 4) if messages else 0.0
+    return summary
+
+
+async def usage_report(
+    usage_collection: AsyncIOMotorCollection,
+    start: date,
+    end: date,
+    group_by: str = "day",
+    username: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Aggregate the daily rollups of a date range.
+
+    Args:
+        usage_collection (AsyncIOMotorCollection): The usage_daily collection.
+        start (date): First day included.
+        end (date): Last day included.
+        group_by (str): One of "day", "chat_id", "top_k" or "username".
+        username (Optional[str]): Restrict the report to a user; None covers everyone.
+
+    Raises:
+        ValueError: If `group_by` is not a rollup field.
+
+    Returns:
+        dict[str, Any]: The range, the totals and one entry per group, ordered by key.
+    """
+    if group_by not in GROUP_FIELDS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUP_FIELDS)}")
+
+    match: dict[str, Any] = {"day": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+    if username is not None:
+        match["username"] = username
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": f"${group_by}", **{name: {"$sum": f"${name}"} for name in COUNTERS}}},
+        {"$sort": {"_id": 1}},
+    ]
+    rows = await usage_collection.aggregate(pipeline).to_list(length=None)
+
+    totals = {name: sum(row.get(name, 0) for row in rows) for name in COUNTERS}
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "totals": _summarize(totals),
+        "groups": [{"key": row["_id"], **_summarize(row)} for row in rows],
+    }
@@ -0,0 +1,364 @@
+"""
+Vector store topology.
+
+VECTOR_STORE_MODE selects how the API workers reach Chroma:
+
+- ``embedded``: every process opens its own PersistentClient on CHROMA_PERSIST_DIR.
+  Fine for a single worker; with several workers the index is loaded once per worker
+  and concurrent writes contend on the same files.
+- ``http``: a Chroma server (``chroma run --path <dir> --port <port>``) owns the index.
+  Each worker keeps one HttpClient whose keep-alive connection pool is shared by all
+  requests of that worker.
+- ``writer``: one writer process (``python -m lucid_docs.services.vector_store``) owns
+  an embedded client and the workers forward collection operations to it over a local
+  socket. Queries go through the writer too, since it is the only process whose
+  in-memory index sees every write.
+
+Embeddings are always computed in the workers; only vectors and metadata cross the
+process boundary.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Union
+
+from lucid_docs.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDED = "embedded"
+HTTP = "http"
+WRITER = "writer"
+
+COLLECTION_METHODS = {"add", "upsert", "update", "delete", "get", "query", "count", "peek", "modify"}
+COLLECTION_ATTRIBUTES = {"id", "metadata", "configuration"}
+WRITE_METHODS = {"add", "upsert", "update", "delete", "modify", "delete_collection"}
+COMPACT = "compact"
+
+
+def vector_store_mode() -> str:
+    return settings.VECTOR_STORE_MODE.lower()
+
+
+def writer_address() -> Union[str, tuple[str, int]]:
+    """
+    Parse VECTOR_STORE_WRITER_ADDRESS: ``host:port`` for TCP, anything else is a Unix socket path.
+    """
+    address = settings.VECTOR_STORE_WRITER_ADDRESS
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def writer_authkey() -> bytes:
+    """
+    Return VECTOR_STORE_WRITER_AUTHKEY, the shared secret of the writer and its clients.
+
+    Raises:
+        ValueError: If the key is not set.
+    """
+    return _require_authkey(settings.VECTOR_STORE_WRITER_AUTHKEY.encode())
+
+
+def _require_authkey(authkey: bytes) -> bytes:
+    # The writer unpickles what it receives: without a key, multiprocessing skips the
+    # challenge handshake and any peer that reaches the socket could run code in it.
+    if not authkey:
+        raise ValueError("VECTOR_STORE_WRITER_AUTHKEY must be set to use the vector store writer")
+    return authkey
+
+
+def vacuum(persist_dir: str) -> bool:
+    """
+    Run VACUUM on the Chroma SQLite file of a persist directory.
+
+    The file holds chunk text and metadata; the HNSW index reuses the slots of
+    deleted vectors on later inserts. VACUUM locks the whole file, so only the
+    process that owns the store may run it.
+
+    Returns:
+        bool: Whether the file existed and was compacted.
+    """
+    path = Path(persist_dir) / "chroma.sqlite3"
+    if not path.exists():
+        return False
+    connection = sqlite3.connect(str(path), timeout=30)
+    try:
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    return True
+
+
+def describe_vector_store() -> dict[str, Any]:
+    """
+    Describe the active topology for the health endpoint.
+
+    Returns:
+        dict[str, Any]: The mode and where the index lives.
+    """
+    mode = vector_store_mode()
+    if mode == HTTP:
+        scheme = "https" if settings.CHROMA_SSL else "http"
+        return {"mode": mode, "target": f"{scheme}://{settings.CHROMA_HOST}:{settings.CHROMA_PORT}"}
+    if mode == WRITER:
+        return {"mode": mode, "target": settings.VECTOR_STORE_WRITER_ADDRESS}
+    return {"mode": mode, "target": settings.CHROMA_PERSIST_DIR}
+
+
+def create_vector_client():
+    """
+    Create the Chroma client for the configured VECTOR_STORE_MODE.
+
+    Raises:
+        ValueError: If the mode is unknown.
+
+    Returns:
+        A client exposing ``get_or_create_collection`` that can be passed to langchain's Chroma.
+    """
+    mode = vector_store_mode()
+    if mode == EMBEDDED:
+        from chromadb import PersistentClient
+
+        return PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+
+    if mode == HTTP:
+        from chromadb import HttpClient
+        from chromadb.config import Settings as ChromaSettings
+
+        return HttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            ssl=settings.CHROMA_SSL,
+            settings=ChromaSettings(
+                anonymized_telemetry=False,
+                chroma_http_keepalive_secs=60,
+                chroma_http_max_connections=settings.VECTOR_STORE_POOL_SIZE,
+                chroma_http_max_keepalive_connections=settings.VECTOR_STORE_POOL_SIZE,
+            ),
+        )
+
+    if mode == WRITER:
+        return WriterClient(writer_address(), writer_authkey(), settings.VECTOR_STORE_POOL_SIZE)
+
+    raise ValueError(f"Unknown VECTOR_STORE_MODE '{mode}'. Use '{EMBEDDED}', '{HTTP}' or '{WRITER}'.")
+
+
+class WriterClient:
+    """
+    Chroma client stand-in that forwards collection operations to the writer process.
+
+    Connections are pooled: each call borrows one, so concurrent requests of a worker
+    never share a socket, and idle connections are reused instead of reconnecting.
+    """
+
+    def __init__(self, address, authkey: bytes, pool_size: int = 16):
+        self.address = address
+        self.authkey = _require_authkey(authkey)
+        self._pool: queue.LifoQueue[Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _connect(self) -> Connection:
+        deadline = time.monotonic() + settings.VECTOR_STORE_CONNECT_TIMEOUT_SECONDS
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (ConnectionRefusedError, FileNotFoundError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    @contextmanager
+    def _connection(self):
+        with self._slots:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            except BaseException:
+                connection.close()
+                raise
+            self._pool.put(connection)
+
+    def call(self, collection: str, method: str, *args, **kwargs) -> Any:
+        with self._connection() as connection:
+            connection.send((collection, method, args, kwargs))
+            status, result = connection.recv()
+        if status == "error":
+            raise result
+        return result
+
+    def get_or_create_collection(self, name: str, metadata=None, **kwargs) -> "RemoteCollection":
+        self.call(name, "get_or_create_collection", metadata=metadata)
+        return RemoteCollection(self, name)
+
+    def get_collection(self, name: str, **kwargs) -> "RemoteCollection":
+        self.call(name, "get_collection")
+        return RemoteCollection(self, name)
+
+    def compact(self) -> bool:
+        """
+        Ask the writer to VACUUM the store it owns; see `vacuum`.
+        """
+        return self.call("", COMPACT)
+
+    def delete_collection(self, name: str) -> None:
+        self.call(name, "delete_collection")
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteCollection:
+    """
+    Proxy for a chromadb Collection living in the writer process.
+    """
+
+    def __init__(self, client: WriterClient, name: str):
+        self._client = client
+        self.name = name
+
+    def __getattr__(self, attribute: str):
+        if attribute in COLLECTION_ATTRIBUTES:
+            return self._client.call(self.name, attribute)
+        if attribute in COLLECTION_METHODS:
+            return lambda *args, **kwargs: self._client.call(self.name, attribute, *args, **kwargs)
+        raise AttributeError(attribute)
+
+
+class VectorStoreWriter:
+    """
+    Process that owns the embedded Chroma index and serves collection operations.
+
+    Reads run concurrently on connection threads; writes are serialized so there is
+    exactly one writer on the persisted files.
+    """
+
+    def __init__(self, address, authkey: bytes, persist_dir: str):
+        from chromadb import PersistentClient
+
+        self.authkey = _require_authkey(authkey)
+        self.client = PersistentClient(path=persist_dir)
+        self.persist_dir = persist_dir
+        self.address = address
+        self._collections: dict[str, Any] = {}
+        self._write_lock = threading.Lock()
+        self._listener: Listener | None = None
+
+    def _collection(self, name: str):
+        if name not in self._collections:
+            self._collections[name] = self.client.get_or_create_collection(name=name, embedding_function=None)
+        return self._collections[name]
+
+    def execute(self, name: str, method: str, args: tuple, kwargs: dict) -> Any:
+        if method == "get_or_create_collection":
+            self._collections[name] = self.client.get_or_create_collection(
+                name=name, embedding_function=None, metadata=kwargs.get("metadata")
+            )
+            return None
+        if method == "get_collection":
+            self._collections[name] = self.client.get_collection(name=name, embedding_function=None)
+            return None
+        if method == COMPACT:
+            # Writes wait for the compaction instead of failing on the locked file.
+            with self._write_lock:
+                return vacuum(self.persist_dir)
+        if method == "delete_collection":
+            with self._write_lock:
+                self._collections.pop(name, None)
+                self.client.delete_collection(name)
+            return None
+        if method in COLLECTION_ATTRIBUTES:
+            return getattr(self._collection(name), method)
+        if method not in COLLECTION_METHODS:
+            raise ValueError(f"Unsupported vector store operation '{method}'")
+        if method in WRITE_METHODS:
+            with self._write_lock:
+                return getattr(self._collection(name), method)(*args, **kwargs)
+        return getattr(self._collection(name), method)(*args, **kwargs)
+
+    def _handle(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    name, method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    connection.send(("ok", self.execute(name, method, args, kwargs)))
+                except Exception as e:
+                    logger.error(f"Vector store operation {method} on {name} failed: {e}")
+                    connection.send(("error", e if _picklable(e) else RuntimeError(str(e))))
+
+    def start(self) -> None:
+        if isinstance(self.address, str):
+            if Path(self.address).exists():
+                Path(self.address).unlink()
+            # Only the service user may connect to the Unix socket: created 0600.
+            umask = os.umask(0o177)
+            try:
+                self._listener = Listener(self.address, authkey=self.authkey)
+            finally:
+                os.umask(umask)
+            os.chmod(self.address, 0o600)
+        else:
+            self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self.serve_forever, name="vector-store-writer", daemon=True).start()
+
+    def serve_forever(self) -> None:
+        logger.info(f"Vector store writer listening on {self.address}")
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return
+            except Exception as e:
+                logger.warning(f"Rejected vector store connection: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+
+def _picklable(error: Exception) -> bool:
+    import pickle
+
+    try:
+        pickle.loads(pickle.dumps(error))
+        return True
+    except Exception:
+        return False
+
+
+def main() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    Path(settings.CHROMA_PERSIST_DIR).mkdir(parents=True, exist_ok=True)
+    writer = VectorStoreWriter(writer_address(), writer_authkey(), settings.CHROMA_PERSIST_DIR)
+    writer.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
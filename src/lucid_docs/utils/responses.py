@@ -0,0 +1,104 @@
+"""
+Fast JSON encoding and negotiated compression for large responses.
+
+FastAPI validates a returned model against `response_model`, converts it with
+`jsonable_encoder` and encodes it with the stdlib `json`. For documents that we
+wrote ourselves this validation is redundant, and for thousands of items it
+dominates the request. `json_response` encodes plain dicts with orjson (stdlib
+`json` when it is not installed) and compresses bodies above
+RESPONSE_COMPRESSION_MIN_BYTES with brotli (when installed) or gzip, according
+to the client's Accept-Encoding.
+"""
+
+import gzip
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from lucid_docs.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with chromadb
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 1
+BROTLI_QUALITY = 4
+# Compressing megabytes takes milliseconds: do it off the event loop.
+THREADPOOL_MIN_BYTES = 256 * 1024
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode JSON-compatible content (str keys, no custom types) to UTF-8 bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the preferred supported content coding of an Accept-Encoding header.
+
+    Args:
+        accept_encoding (Optional[str]): The header value, e.g. "gzip, br;q=0.9".
+
+    Returns:
+        Optional[str]: "br", "gzip" or None for an uncompressed response.
+    """
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    weights: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, parameters = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith("q="):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+    candidates = [(weights.get(coding, weights.get("*", 0.0)), -index, coding) for index, coding in enumerate(supported)]
+    quality, _, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+async def json_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Build a JSON response without model validation, compressed when worthwhile.
+
+    Args:
+        request (Request): The request, for its Accept-Encoding header.
+        content (Any): JSON-compatible content.
+        status_code (int, optional): The response status. Defaults to 200.
+
+    Returns:
+        Response: The encoded, possibly compressed, response.
+    """
+    body = dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None and len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        if len(body) >= THREADPOOL_MIN_BYTES:
+            body = await run_in_threadpool(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
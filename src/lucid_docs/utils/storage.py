@@ -1,25 +1,86 @@
+import mmap
+import os
+from contextlib import contextmanager
 from pathlib import Path
-import shutil
-import uuid
+from typing import BinaryIO, Iterator, Optional
 
 from fastapi import UploadFile
 
-def save_temp_file(file: UploadFile, temp_dir: str) -> Path:
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _spilled_to_disk(spooled) -> bool:
+    # SpooledTemporaryFile keeps small uploads in a BytesIO and moves them to an
+    # anonymous temp file past max_size; fileno() would force that rollover.
+    return getattr(spooled, "_rolled", True)
+
+
+@contextmanager
+def open_upload(file: UploadFile) -> Iterator[BinaryIO]:
     """
-    Save an uploaded file to a temporary directory.
+    Give read access to an upload's content without copying it.
 
-    This function takes an UploadFile object and a specified temporary directory path,
-    generates a unique filename with a .pdf extension using UUID, and writes the file's
-    content to the generated path. It returns the Path object of the saved file.
+    Starlette spools uploads in memory up to 1 MB and spills larger ones to an
+    anonymous temporary file. The in-memory buffer is read directly; a spilled file
+    is memory-mapped, so pages are read from the page cache on demand.
 
     Parameters:
-        file (UploadFile): The uploaded file to be saved.
-        temp_dir (str): The directory where the file will be temporarily stored.
+        file (UploadFile): The uploaded file.
 
-    Returns:
-        Path: The path to the saved temporary file.
+    Yields:
+        BinaryIO: A seekable, read-only binary stream positioned at the start.
     """
-    file_path = Path(temp_dir) / f"{uuid.uuid4()}.pdf"
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return file_path
\ No newline at end of file
+    spooled = file.file
+    spooled.seek(0)
+    if _spilled_to_disk(spooled) and os.fstat(spooled.fileno()).st_size > 0:
+        with mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+    else:
+        yield spooled
+
+
+class DetachedUpload:
+    """
+    Handle on an upload's content that stays readable after the request closes the file.
+
+    The spilled temp file is kept alive through a duplicated descriptor and read
+    with positional reads, so it never interferes with other readers; uploads held
+    in memory are referenced as bytes.
+
+    Parameters:
+        file (UploadFile): The uploaded file, still open.
+    """
+
+    def __init__(self, file: UploadFile):
+        spooled = file.file
+        self._fd: Optional[int] = None
+        self._data: Optional[bytes] = None
+        if _spilled_to_disk(spooled):
+            self._fd = os.dup(spooled.fileno())
+        else:
+            self._data = spooled._file.getvalue()
+
+    def save(self, destination: Path) -> int:
+        """
+        Write the content to `destination` and release the handle.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with destination.open("wb") as output:
+                if self._data is not None:
+                    return output.write(self._data)
+                written = 0
+                while chunk := os.pread(self._fd, COPY_CHUNK_SIZE, written):
+                    written += output.write(chunk)
+                return written
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._data = None
@@ -0,0 +1,11 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of model tokens in `text` (about four characters per token).
+
+    Args:
+        text (str): The text to be embedded or sent to the model.
+
+    Returns:
+        int: The estimated token count, at least 1.
+    """
+    return max(1, len(text) // 4)
@@ -3,9 +3,12 @@
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 
+from mongomock_motor import AsyncMongoMockClient
+
 from lucid_docs.main import create_app # Assuming this is needed for 'app' fixture
 from lucid_docs.core.config import settings as global_app_settings
 from lucid_docs.core.database import database as global_db_manager_singleton, Database as CoreDatabaseClass
+from lucid_docs.core.health import health_monitor
 
 # _MOCKED_DB_NAME and patch_non_db_settings_for_test_session fixture remain the same...
 _MOCKED_DB_NAME = "mocked_lucid_docs_db"
@@ -14,21 +17,36 @@ _MOCKED_DB_NAME = "mocked_lucid_docs_db"
 def patch_non_db_settings_for_test_session(tmp_path_factory):
     original_chroma_persist_dir = global_app_settings.CHROMA_PERSIST_DIR
     original_temp_storage_path = global_app_settings.TEMP_STORAGE_PATH
+    original_originals_storage_path = global_app_settings.ORIGINALS_STORAGE_PATH
     original_mongo_db_name = global_app_settings.MONGO_DB_NAME
+    original_warmup_enabled = global_app_settings.WARMUP_ENABLED
+    original_janitor_enabled = global_app_settings.JANITOR_ENABLED
 
     global_app_settings.MONGO_DB_NAME = _MOCKED_DB_NAME
+    global_app_settings.WARMUP_ENABLED = False
+    global_app_settings.JANITOR_ENABLED = False
+
+    # Background readiness checks only ping the mocked database; Chroma and the
+    # providers are exercised by their own tests.
+    original_health_checks = health_monitor.checks
+    health_monitor.checks = {"mongo": original_health_checks["mongo"]}
     
     test_chroma_dir = tmp_path_factory.mktemp("chroma_db_test_data")
     global_app_settings.CHROMA_PERSIST_DIR = str(test_chroma_dir)
     
     test_temp_dir = tmp_path_factory.mktemp("temp_storage_test_data")
     global_app_settings.TEMP_STORAGE_PATH = str(test_temp_dir)
+    global_app_settings.ORIGINALS_STORAGE_PATH = str(tmp_path_factory.mktemp("originals_test_data"))
 
     yield
 
     global_app_settings.CHROMA_PERSIST_DIR = original_chroma_persist_dir
     global_app_settings.TEMP_STORAGE_PATH = original_temp_storage_path
+    global_app_settings.ORIGINALS_STORAGE_PATH = original_originals_storage_path
     global_app_settings.MONGO_DB_NAME = original_mongo_db_name
+    global_app_settings.WARMUP_ENABLED = original_warmup_enabled
+    global_app_settings.JANITOR_ENABLED = original_janitor_enabled
+    health_monitor.checks = original_health_checks
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -70,6 +88,7 @@ def mock_database_operations(patch_non_db_settings_for_test_session):
             coll_mock.delete_many = AsyncMock(return_value=MagicMock(deleted_count=0))
             coll_mock.update_one = AsyncMock()
             coll_mock.create_index = AsyncMock()
+            coll_mock.find_one_and_update = AsyncMock(return_value=None)
             
             aggregate_result_mock = MagicMock()
             aggregate_result_mock.to_list = AsyncMock(return_value=[])
@@ -137,4 +156,31 @@ def db(client, mock_database_operations): # Depends on client (for app startup)
     assert hasattr(global_db_manager_singleton, '_database') and \
            global_db_manager_singleton._database is mock_database_operations["db_instance"], \
         "Database manager's internal database is not the expected mock instance from mock_database_operations."
-    yield mock_database_operations["db_instance"]
\ No newline at end of file
+    yield mock_database_operations["db_instance"]
+
+
+@pytest.fixture
+def local_chroma(monkeypatch, tmp_path):
+    """Real on-disk Chroma store with the local hashing embedder, installed as the app's store."""
+    from chromadb import PersistentClient
+    from langchain_chroma import Chroma
+    from lucid_docs import dependencies
+    from lucid_docs.services.local_models import HashingEmbeddings
+
+    monkeypatch.setattr(global_app_settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    store = Chroma(
+        client=PersistentClient(path=str(tmp_path)),
+        collection_name="documents_test",
+        embedding_function=HashingEmbeddings(dimensions=32),
+    )
+    monkeypatch.setattr(dependencies, "chroma", store)
+    return store
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """In-memory MongoDB database, also served by `database.get_collection`."""
+    db = AsyncMongoMockClient()["lucid_docs_test"]
+    # Patched on the class so the teardown order restores the session mock, then the original.
+    monkeypatch.setattr(CoreDatabaseClass, "get_collection", lambda self, name: db[name])
+    return db
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import random
+
+from pypdf import PdfReader
+
+from benchmarks.harness import build_vocabulary, make_pdf, percentile, summarize
+from benchmarks.dedup import ingest, make_corpus
+from benchmarks.import_time import parse_importtime, summarize as summarize_imports
+from benchmarks.loaders import builders, make_sections, measure
+from benchmarks.serialization import run as run_serialization
+
+
+def test_generated_pdf_is_readable():
+    vocabulary = build_vocabulary(seed=1)
+    pdf = make_pdf(random.Random(1), vocabulary, pages=3, words_per_page=50)
+    reader = PdfReader(io.BytesIO(pdf))
+    assert len(reader.pages) == 3
+    assert any(word in reader.pages[0].extract_text() for word in vocabulary)
+
+
+def test_percentiles_and_summary():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+
+    summary = summarize([("chat", 0.010, 200), ("chat", 0.030, 500), ("upload", 0.100, 200)], wall_seconds=2.0)
+    assert summary["chat"]["requests"] == 2
+    assert summary["chat"]["errors"] == 1
+    assert summary["all"]["rps"] == 1.5
+
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:    100000 |     100000 |     leaf",
+        "import time:     50000 |     150000 |   pkg.sub",
+        "import time:     20000 |     170000 | pkg",
+    ])
+    records = parse_importtime(output)
+    assert [r["module"] for r in records] == ["leaf", "pkg.sub", "pkg"]
+    assert records[0]["depth"] == 2
+
+    result = summarize_imports(records, "pkg", top=5)
+    assert result["total_ms"] == 170.0
+    assert result["packages"] == {"leaf": 100.0, "pkg": 70.0}
+
+
+def test_loader_benchmark_reports_page_equivalents():
+    sections = make_sections(seed=1, pages=3, page_chars=3000)
+    for content_type, build in builders().values():
+        result = measure(content_type, build(sections), page_chars=3000, runs=1)
+        assert result["page_equivalents"] >= 2.5
+        assert result["page_equivalents_per_second"] > 0
+
+
+def test_dedup_benchmark_reduces_vectors():
+    corpus = make_corpus(1, documents=3, pages=9)
+    off, on = ingest(corpus, False), ingest(corpus, True)
+
+    assert off["vectors"] == off["embedded"] == off["chunks"]
+    assert on["chunks"] == off["chunks"]
+    assert on["vectors"] < off["vectors"]
+    assert on["embedded"] == on["vectors"] - on["linked"] < off["embedded"]
+
+
+def test_serialization_benchmark_compares_both_paths():
+    results = asyncio.run(run_serialization([200], runs=1, seed=1))["200"]
+
+    assert {result["messages"] for result in results.values()} == {200}
+    assert results["model/compressed"]["encoding"] == "identity"
+    assert results["direct/compressed"]["encoding"] == "gzip"
+    assert results["direct/compressed"]["wire_bytes"] < results["direct/identity"]["wire_bytes"]
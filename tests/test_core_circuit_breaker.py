@@ -0,0 +1,76 @@
+from lucid_docs.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock, **overrides):
+    options = dict(
+        window=10, min_calls=4, error_rate=0.5, slow_call_seconds=1.0, slow_call_rate=0.5, open_seconds=30,
+    )
+    options.update(overrides)
+    return CircuitBreaker("test", timer=clock, **options)
+
+
+def test_opens_on_error_rate_after_min_calls():
+    breaker = make_breaker(FakeClock())
+    for success in (False, False, True):
+        breaker.record(success, 0.1)
+    assert breaker.state == CLOSED
+
+    breaker.record(True, 0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    assert breaker.stats()["rejections"] == 1
+
+
+def test_opens_on_slow_calls():
+    breaker = make_breaker(FakeClock())
+    for latency in (2.0, 0.1, 3.0, 0.2):
+        breaker.record(True, latency)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_one_probe():
+    clock = FakeClock()
+    breaker = make_breaker(clock, min_calls=1)
+    breaker.record(False, 0.1)
+    clock.now = 31
+
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 0
+
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock, min_calls=1)
+    breaker.record(False, 0.1)
+    clock.now = 31
+    breaker.allow()
+
+    breaker.record(False, 0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["trips"] == 2
+    assert breaker.stats()["retry_in_seconds"] == 30
+
+
+def test_released_probe_can_be_retried():
+    clock = FakeClock()
+    breaker = make_breaker(clock, min_calls=1)
+    breaker.record(False, 0.1)
+    clock.now = 31
+    breaker.allow()
+    breaker.release()
+    assert breaker.allow() is True
@@ -0,0 +1,118 @@
+import asyncio
+
+from lucid_docs.core.health import HealthMonitor, health_monitor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def healthy():
+    return {"documents": 3}
+
+
+async def failing():
+    raise RuntimeError("connection refused")
+
+
+async def hanging():
+    await asyncio.sleep(10)
+    return {}
+
+
+class TestHealthMonitor:
+    def test_pending_until_first_refresh(self):
+        monitor = HealthMonitor({"db": healthy}, interval=1, ttl=5, timeout=1)
+        assert monitor.snapshot() == {"ready": False, "checks": {"db": {"status": "pending"}}}
+
+    def test_reports_status_latency_and_errors(self):
+        monitor = HealthMonitor({"db": healthy, "chroma": failing}, interval=1, ttl=5, timeout=1)
+        asyncio.run(monitor.refresh())
+        snapshot = monitor.snapshot()
+
+        assert snapshot["ready"] is False
+        assert snapshot["checks"]["db"]["status"] == "ok"
+        assert snapshot["checks"]["db"]["documents"] == 3
+        assert "latency_ms" in snapshot["checks"]["db"]
+        assert snapshot["checks"]["chroma"] == {
+            **snapshot["checks"]["chroma"], "status": "error", "error": "connection refused"
+        }
+
+    def test_timeout_and_staleness(self):
+        clock = FakeClock()
+        monitor = HealthMonitor({"slow": hanging}, interval=1, ttl=5, timeout=0.01, timer=clock)
+        asyncio.run(monitor.refresh())
+        assert monitor.snapshot()["checks"]["slow"]["status"] == "error"
+
+        monitor.checks = {"slow": healthy}
+        asyncio.run(monitor.refresh())
+        assert monitor.snapshot()["ready"] is True
+        clock.now = 6.0
+        assert monitor.snapshot()["checks"]["slow"]["status"] == "stale"
+        assert monitor.snapshot()["ready"] is False
+
+
+class TestProbes:
+    def test_liveness(self, client):
+        assert client.get("/health/live").json() == {"status": "ok"}
+
+    def test_readiness_from_cache(self, client, mock_database_operations):
+        client.portal.call(health_monitor.stop)
+        asyncio.run(health_monitor.refresh())
+        calls = mock_database_operations["health_check"].await_count
+
+        for _ in range(3):
+            response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["checks"]["mongo"]["status"] == "ok"
+        assert mock_database_operations["health_check"].await_count == calls
+        assert client.get("/health").json()["services"] == {"database": True}
+
+        mock_database_operations["health_check"].return_value = False
+        asyncio.run(health_monitor.refresh())
+        assert client.get("/health/ready").status_code == 503
+        health = client.get("/health").json()
+        assert (health["status"], health["services"]) == ("degraded", {"database": False})
+        assert health["checks"]["mongo"]["status"] == "error"
+
+    def test_readiness_waits_for_the_warm_up(self, client):
+        client.portal.call(health_monitor.stop)
+        asyncio.run(health_monitor.refresh())
+        app = client.app
+
+        for status, code in (("failed", 503), ("pending", 503), ("ok", 200), ("skipped", 200)):
+            app.state.warmup = {"status": status}
+            response = client.get("/health/ready")
+            assert response.status_code == code, status
+            assert response.json()["warmup"]["status"] == status
+
+    def test_failed_warm_up_is_retried(self, monkeypatch):
+        from fastapi import FastAPI
+
+        from lucid_docs import main
+        from lucid_docs.core.config import settings
+
+        outcomes = [RuntimeError("provider down"), {"llm": 0.1}]
+
+        def flaky_warm_up():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(main, "warm_up", flaky_warm_up)
+        monkeypatch.setattr(settings, "HEALTH_CHECK_INTERVAL_SECONDS", 0)
+        app = FastAPI()
+
+        async def scenario():
+            first = await main.run_warm_up(app)
+            failed = app.state.warmup["status"]
+            await asyncio.wait_for(main.retry_warm_up(app), timeout=5)
+            return first, failed
+
+        assert asyncio.run(scenario()) == (False, "failed")
+        assert app.state.warmup == {"status": "ok", "seconds": {"llm": 0.1}}
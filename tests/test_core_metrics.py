@@ -0,0 +1,42 @@
+from lucid_docs.core.metrics import Counter, Histogram, route_var, stage, stage_duration
+
+
+class TestHistogram:
+    def test_observations_are_cumulative_per_bucket(self):
+        histogram = Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, route="/a")
+        histogram.observe(0.1, route="/a")
+        histogram.observe(5.0, route="/a")
+
+        lines = histogram.render()
+
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'test_latency_seconds_count{route="/a"} 3' in lines
+        assert histogram.count(route="/a") == 3
+
+    def test_label_values_are_escaped(self):
+        counter = Counter("test_total", "Test.", ("path",))
+        counter.inc(path='a"b')
+        assert 'test_total{path="a\\"b"} 1' in counter.render()
+
+
+def test_stage_uses_current_route():
+    token = route_var.set("/test-route")
+    try:
+        with stage("unit"):
+            pass
+    finally:
+        route_var.reset(token)
+    assert stage_duration.count(stage="unit", route="/test-route") == 1
+
+
+def test_metrics_endpoint_reports_route_latency(client):
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'lucid_http_request_duration_seconds_count{route="/health",method="GET",status="200"}' in response.text
+    assert "lucid_user_cache_hits_total" in response.text
@@ -0,0 +1,59 @@
+import pstats
+
+import pytest
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.profiling import profile_path, should_profile
+from lucid_docs.core.security import create_access_token, get_current_admin_user
+from lucid_docs.models.database import User
+
+
+@pytest.fixture
+def admin_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["admin"])
+    monkeypatch.setattr(settings, "PROFILE_STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    return tmp_path
+
+
+def bearer(username: str) -> bytes:
+    return f"Bearer {create_access_token({'sub': username})}".encode()
+
+
+class TestShouldProfile:
+    def test_no_header_no_sampling(self, admin_settings):
+        assert should_profile([(b"authorization", bearer("admin"))]) is False
+
+    def test_header_requires_admin_token(self, admin_settings):
+        assert should_profile([(b"x-profile", b"1"), (b"authorization", bearer("admin"))]) is True
+        assert should_profile([(b"x-profile", b"1"), (b"authorization", bearer("someone"))]) is False
+        assert should_profile([(b"x-profile", b"1"), (b"authorization", b"Bearer invalid")]) is False
+        assert should_profile([(b"x-profile", b"1")]) is False
+
+    def test_sampling_rate(self, admin_settings, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+        assert should_profile([]) is True
+
+
+def test_profiled_request_can_be_downloaded(app, client, admin_settings):
+    response = client.get("/health", headers={"X-Profile": "1", "Authorization": bearer("admin").decode()})
+    track_id = response.headers["X-Track-ID"]
+
+    assert response.headers["X-Profile-ID"] == track_id
+    path = profile_path(track_id)
+    assert path is not None
+    assert pstats.Stats(str(path)).total_calls > 0
+
+    app.dependency_overrides[get_current_admin_user] = lambda: User(username="admin")
+    listing = client.get("/admin/profiles").json()
+    assert track_id in listing["profiles"]
+    report = client.get(f"/admin/profiles/{track_id}", params={"format": "text"})
+    assert report.status_code == 200
+    assert "cumulative" in report.text
+    assert client.get("/admin/profiles/not-a-track-id").status_code == 404
+
+
+def test_unprofiled_request_has_no_profile(client, admin_settings):
+    response = client.get("/health")
+    assert "X-Profile-ID" not in response.headers
+    assert profile_path(response.headers["X-Track-ID"]) is None
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from limits import parse
+
+from lucid_docs.core import rate_limit
+from lucid_docs.core.rate_limit import CHAT, RateLimiter, RateLimitExceeded, limit_chat
+from lucid_docs.models.database import User
+from lucid_docs.utils.text import estimate_tokens
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter()
+    limiter.limits[CHAT] = (parse("2/minute"), parse("3/minute"))
+    limiter.concurrency[CHAT] = 1
+    return limiter
+
+
+class TestRateLimiter:
+    def test_per_user_bucket_rejects_with_retry_after(self, limiter):
+        async def scenario():
+            await limiter.hit(CHAT, "alice")
+            await limiter.hit(CHAT, "alice")
+            with pytest.raises(RateLimitExceeded) as excinfo:
+                await limiter.hit(CHAT, "alice")
+            return excinfo.value
+
+        error = asyncio.run(scenario())
+        assert error.scope == CHAT
+        assert 1 <= error.retry_after <= 60
+        assert "Per-user" in error.detail
+        assert limiter.rejections[CHAT] == 1
+
+    def test_global_bucket_is_shared_between_users(self, limiter):
+        async def scenario():
+            await limiter.hit(CHAT, "alice")
+            await limiter.hit(CHAT, "bob")
+            await limiter.hit(CHAT, "carol")
+            with pytest.raises(RateLimitExceeded) as excinfo:
+                await limiter.hit(CHAT, "dave")
+            return excinfo.value
+
+        assert "Global" in asyncio.run(scenario()).detail
+
+    def test_cost_larger_than_bucket_is_rejected(self, limiter):
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(limiter.hit(CHAT, "alice", cost=5))
+
+    def test_concurrency_cap(self, limiter):
+        async def scenario():
+            async with limiter.in_flight(CHAT, "alice"):
+                with pytest.raises(RateLimitExceeded):
+                    async with limiter.in_flight(CHAT, "alice"):
+                        pass
+                async with limiter.in_flight(CHAT, "bob"):
+                    pass
+            async with limiter.in_flight(CHAT, "alice"):
+                pass
+
+        asyncio.run(scenario())
+
+    def test_concurrency_rejection_does_not_use_the_bucket(self, limiter, monkeypatch):
+        monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+        alice = User(username="alice")
+
+        async def scenario():
+            held = limit_chat(alice)
+            await anext(held)
+            with pytest.raises(RateLimitExceeded, match="concurrent"):
+                await anext(limit_chat(alice))
+            await held.aclose()
+            stats = await limiter.strategy.get_window_stats(limiter.limits[CHAT][0], CHAT, "user", "alice")
+            return stats.remaining
+
+        assert asyncio.run(scenario()) == 1
+
+    def test_rate_limit_rejection_releases_the_slot(self, limiter, monkeypatch):
+        monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+        limiter.concurrency[CHAT] = 5
+        alice = User(username="alice")
+
+        async def scenario():
+            await limiter.hit(CHAT, "alice", cost=2)
+            with pytest.raises(RateLimitExceeded, match="Per-user"):
+                await anext(limit_chat(alice))
+
+        asyncio.run(scenario())
+        assert not limiter._in_flight
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 400) == 100
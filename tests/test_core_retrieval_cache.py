@@ -0,0 +1,135 @@
+import asyncio
+import io
+
+import pytest
+
+from benchmarks.harness import make_pdf_from_pages
+from lucid_docs.core import retrieval_cache as cache_module
+from lucid_docs.core.config import settings
+from lucid_docs.core.retrieval_cache import (
+    bump_version,
+    fingerprint,
+    retrieval_cache,
+    retrieval_cache_enabled,
+    scope_version,
+)
+from lucid_docs.services.chroma_service import retrieve
+from lucid_docs.services.file_processing import process_document
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(cache_module, "_versions", {})
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "mongo")
+    retrieval_cache.clear()
+    yield
+    retrieval_cache.clear()
+
+
+def ingest(text, chat_id, name):
+    process_document(io.BytesIO(make_pdf_from_pages([text])), name, "alice", chat_id, hash_file_name=name)
+
+
+class TestVersions:
+    def test_chat_bump_invalidates_the_chat_and_user_wide_scopes(self):
+        chat, other, user_wide = scope_version("alice", "a"), scope_version("alice", "b"), scope_version("alice")
+        bump_version("alice", "a")
+
+        assert scope_version("alice", "a") != chat
+        assert scope_version("alice") != user_wide
+        assert scope_version("alice", "b") == other
+        assert scope_version("bob", "a") == (0, 0)
+
+    def test_user_bump_invalidates_every_scope(self):
+        before = scope_version("alice", "a"), scope_version("alice")
+        bump_version("alice")
+        assert (scope_version("alice", "a"), scope_version("alice")) != before
+
+    def test_fingerprint_ignores_float_noise(self):
+        assert fingerprint([0.1, 0.2]) == fingerprint([0.1 + 1e-9, 0.2])
+        assert fingerprint([0.1, 0.2]) != fingerprint([0.2, 0.1])
+
+
+class TestRetrieve:
+    def test_repeated_question_is_served_from_cache(self, local_chroma, monkeypatch):
+        ingest("manual de instalacao eletrica", "a", "a.pdf")
+        searches = []
+        search = local_chroma.asimilarity_search_by_vector
+
+        async def counting(*args, **kwargs):
+            searches.append(kwargs)
+            return await search(*args, **kwargs)
+
+        monkeypatch.setattr(local_chroma, "asimilarity_search_by_vector", counting)
+        first = asyncio.run(retrieve("instalacao eletrica", "alice", "a"))
+        second = asyncio.run(retrieve("instalacao eletrica", "alice", "a"))
+
+        assert len(searches) == 1
+        assert [document.id for document in first] == [document.id for document in second]
+
+    def test_ingestion_makes_the_scope_miss(self, local_chroma):
+        ingest("manual de instalacao eletrica", "a", "a.pdf")
+        assert len(asyncio.run(retrieve("manutencao", "alice", "a"))) == 1
+
+        ingest("guia de manutencao preventiva", "a", "b.pdf")
+        texts = [document.page_content for document in asyncio.run(retrieve("manutencao", "alice", "a"))]
+
+        assert "guia de manutencao preventiva" in texts
+
+    def test_disabled(self, local_chroma, monkeypatch):
+        monkeypatch.setattr(settings, "RETRIEVAL_CACHE_ENABLED", False)
+        ingest("manual de instalacao eletrica", "a", "a.pdf")
+        asyncio.run(retrieve("instalacao", "alice", "a"))
+        assert len(retrieval_cache) == 0
+
+
+def test_disabled_without_a_shared_invalidation_channel(monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "none")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert not retrieval_cache_enabled()
+
+
+def test_bump_in_one_worker_invalidates_the_other(mongo, monkeypatch):
+    from lucid_docs.core import retrieval_cache as publisher, user_cache
+
+    # Each worker process has its own version map.
+    first_worker, second_worker = {}, {}
+
+    async def scenario():
+        listener = user_cache.InvalidationListener()
+        monkeypatch.setattr(cache_module, "_versions", second_worker)
+        before = scope_version("alice", "a")
+
+        monkeypatch.setattr(cache_module, "_versions", first_worker)
+        await publisher.invalidate_scope("alice", "a")
+
+        monkeypatch.setattr(cache_module, "_versions", second_worker)
+        assert await listener.poll_once() == 1
+        return before, scope_version("alice", "a")
+
+    before, after = asyncio.run(scenario())
+    assert after != before
+    assert first_worker == second_worker
+
+
+def test_version_is_stable_after_repeated_polls(mongo):
+    from lucid_docs.core import user_cache
+
+    async def scenario():
+        listener = user_cache.InvalidationListener(poll_seconds=60)
+        await cache_module.invalidate_scope("alice", "a", publish=True)
+        versions = [scope_version("alice", "a")]
+        for _ in range(3):
+            await listener.poll_once()
+            versions.append(scope_version("alice", "a"))
+        return versions
+
+    versions = asyncio.run(scenario())
+    # The publishing worker also applies its own event once, then nothing changes.
+    assert versions[1] == versions[2] == versions[3]
+
+
+def test_enabled_for_a_single_worker_without_a_channel(monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "none")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    assert retrieval_cache_enabled()
@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from passlib.context import CryptContext
+
+from lucid_docs.core import security
+from lucid_docs.core.database import database
+from lucid_docs.core.user_cache import invalidate_user, user_cache
+
+HASHED = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("Password123!")
+
+
+class TestPasswordHashing:
+    def test_async_hash_roundtrip(self):
+        hashed = asyncio.run(security.get_password_hash_async("Password123!"))
+        valid, new_hash = asyncio.run(security.verify_password_async("Password123!", hashed))
+        assert valid is True
+        assert new_hash is None
+
+    def test_async_verify_rejects_wrong_password(self):
+        hashed = security.get_password_hash("Password123!")
+        valid, _ = asyncio.run(security.verify_password_async("Wrong123!", hashed))
+        assert valid is False
+
+    def test_authenticate_user_rehashes_weak_hash(self):
+        weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("Password123!")
+        users_collection = database.get_collection("users")
+        users_collection.find_one.return_value = {"username": "rehashuser", "password": weak_hash}
+        users_collection.update_one.return_value = MagicMock(matched_count=1)
+        user_cache.invalidate("rehashuser")
+
+        user = asyncio.run(security.authenticate_user("rehashuser", "Password123!"))
+
+        assert user is not None
+        assert user.password != weak_hash
+        users_collection.update_one.assert_awaited_once()
+        update = users_collection.update_one.await_args.args[1]
+        assert update["$set"]["password"] == user.password
+        assert user_cache.get("rehashuser") is None
+
+
+class TestUserCache:
+    @pytest.fixture(autouse=True)
+    def users_collection(self):
+        user_cache.clear()
+        users_collection = database.get_collection("users")
+        users_collection.find_one.return_value = {"username": "cacheduser", "password": HASHED, "disabled": False}
+        users_collection.update_one.return_value = MagicMock(matched_count=1)
+        yield users_collection
+        user_cache.clear()
+
+    def test_miss_queries_mongo_and_caches_the_user(self, users_collection):
+        user = asyncio.run(security.get_user("cacheduser"))
+
+        assert user.username == "cacheduser"
+        users_collection.find_one.assert_awaited_once_with({"username": "cacheduser"})
+        assert user_cache.get("cacheduser") is user
+
+    def test_hit_is_served_without_querying_mongo(self, users_collection):
+        first = asyncio.run(security.get_user("cacheduser"))
+        second = asyncio.run(security.get_user("cacheduser"))
+
+        assert second is first
+        assert users_collection.find_one.await_count == 1
+
+    def test_unknown_user_is_not_cached(self, users_collection):
+        users_collection.find_one.return_value = None
+
+        assert asyncio.run(security.get_user("cacheduser")) is None
+        assert user_cache.get("cacheduser") is None
+
+    def test_update_user_evicts_the_entry(self, users_collection):
+        asyncio.run(security.get_user("cacheduser"))
+        users_collection.find_one.return_value = {"username": "cacheduser", "password": HASHED, "disabled": True}
+
+        assert asyncio.run(security.update_user("cacheduser", {"disabled": True})) is True
+        assert user_cache.get("cacheduser") is None
+        user = asyncio.run(security.get_user("cacheduser"))
+
+        assert user.disabled is True
+        assert users_collection.find_one.await_count == 2
+
+    def test_invalidate_user_evicts_the_entry(self, users_collection):
+        asyncio.run(security.get_user("cacheduser"))
+
+        asyncio.run(invalidate_user("cacheduser", publish=False))
+        asyncio.run(security.get_user("cacheduser"))
+
+        assert users_collection.find_one.await_count == 2
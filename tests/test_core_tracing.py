@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+
+from lucid_docs.core.tracing import TraceExporter, record_span, span, trace_request, trace_store
+
+
+class TestTracing:
+    def test_span_outside_trace_is_noop(self):
+        with span("orphan") as current:
+            assert current is None
+
+    def test_nested_spans_have_parents(self):
+        with trace_request("trace-nested", "GET /test") as trace:
+            with span("auth") as auth:
+                record_span("mongo.find", 1_000_000)
+            with span("retrieve"):
+                with span("embed_query") as embed:
+                    pass
+
+        spans = {s.name: s for s in trace.spans}
+        assert auth.parent_id == trace.root.span_id
+        assert spans["mongo.find"].parent_id == auth.span_id
+        assert embed.parent_id == spans["retrieve"].span_id
+        assert trace_store.get("trace-nested") is trace
+
+    def test_spans_follow_threadpool_work(self):
+        def work():
+            with span("parse"):
+                pass
+
+        async def scenario():
+            with trace_request("trace-thread", "POST /upload/pdf") as trace:
+                with span("ingest") as ingest:
+                    await asyncio.to_thread(work)
+            return trace, ingest
+
+        trace, ingest = asyncio.run(scenario())
+        parse = next(s for s in trace.spans if s.name == "parse")
+        assert parse.parent_id == ingest.span_id
+
+    def test_server_timing_summarizes_spans(self):
+        with trace_request("trace-timing", "GET /test") as trace:
+            record_span("mongo.find", 2_000_000)
+            record_span("mongo.find", 3_000_000)
+        header = trace.server_timing()
+        assert "mongo.find;dur=5.0" in header
+        assert header.endswith(f"total;dur={trace.root.duration_ms:.1f}")
+
+    def test_exporter_writes_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        exporter = TraceExporter(str(path))
+        with trace_request("0f0e0d0c-0b0a-4908-8706-050403020100", "GET /test") as trace:
+            with span("auth"):
+                pass
+        exporter.export(trace)
+        for _ in range(100):
+            if path.exists() and path.read_text():
+                break
+            time.sleep(0.01)
+
+        document = json.loads(path.read_text().splitlines()[0])
+        spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert {s["name"] for s in spans} == {"GET /test", "auth"}
+        assert spans[0]["traceId"] == "0f0e0d0c0b0a49088706050403020100"
+
+
+def test_responses_carry_server_timing(client):
+    response = client.get("/health")
+    assert "X-Track-ID" in response.headers
+    assert "total;dur=" in response.headers["Server-Timing"]
@@ -0,0 +1,35 @@
+import asyncio
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.user_cache import InvalidationListener, invalidate_user, user_cache
+
+
+def test_each_invalidation_is_applied_once(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "mongo")
+    listener = InvalidationListener(poll_seconds=60)
+
+    async def scenario():
+        await invalidate_user("alice")
+        first = await listener.poll_once()
+        user_cache.set("alice", "reloaded")
+        return first, await listener.poll_once(), await listener.poll_once()
+
+    try:
+        assert asyncio.run(scenario()) == (1, 0, 0)
+        assert user_cache.get("alice") == "reloaded"
+    finally:
+        user_cache.clear()
+
+
+def test_new_events_are_still_applied_after_an_empty_poll(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "mongo")
+    listener = InvalidationListener(poll_seconds=60)
+
+    async def scenario():
+        await invalidate_user("alice")
+        counts = [await listener.poll_once(), await listener.poll_once()]
+        await invalidate_user("alice")
+        counts.append(await listener.poll_once())
+        return counts
+
+    assert asyncio.run(scenario()) == [1, 0, 1]
@@ -0,0 +1,27 @@
+import pytest
+
+from lucid_docs import dependencies
+from lucid_docs.core.config import settings
+
+
+@pytest.fixture
+def local_clients(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "hashing")
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "extractive")
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path))
+    for name in ("embeddings", "llm", "chroma", "vector_client"):
+        monkeypatch.setattr(dependencies, name, None)
+
+
+def test_warm_up_initializes_clients(local_clients):
+    timings = dependencies.warm_up()
+    assert set(timings) == {"embeddings", "llm", "chroma", "index"}
+    assert dependencies.chroma is not None
+
+    dependencies.chroma.add_texts(["texto de exemplo"], metadatas=[{"user_id": "alice"}])
+    assert "index" in dependencies.warm_up()
+
+
+def test_health_reports_warmup(app, client):
+    warmup = client.get("/health").json()["warmup"]
+    assert warmup == {"status": "skipped"}
@@ -0,0 +1,53 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CLIENT = """
+from lucid_docs.services.vector_store import COMPACT, WriterClient, writer_address, writer_authkey
+print("compacted" if WriterClient(writer_address(), writer_authkey()).call("", COMPACT) else "missing")
+"""
+
+
+def dockerfile_instruction(name):
+    lines = (ROOT / "Dockerfile").read_text().splitlines()
+    return json.loads(next(line for line in lines if line.startswith(f"{name} "))[len(name) + 1:])
+
+
+def test_image_runs_its_command_through_the_entrypoint():
+    assert dockerfile_instruction("ENTRYPOINT") == ["/app/entrypoint.sh"]
+    assert dockerfile_instruction("CMD")[:2] == ["uvicorn", "lucid_docs.main:create_app"]
+
+
+def test_entrypoint_starts_the_writer_before_the_image_command(tmp_path):
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT / "src"),
+        "VECTOR_STORE_MODE": "writer",
+        "VECTOR_STORE_WRITER_ADDRESS": str(tmp_path / "writer.sock"),
+        "VECTOR_STORE_WRITER_AUTHKEY": "smoke-test",
+        "VECTOR_STORE_CONNECT_TIMEOUT_SECONDS": "60",
+        "CHROMA_PERSIST_DIR": str(tmp_path / "chroma"),
+        "ENVIRONMENT": "prd",
+    }
+    # The image runs the entrypoint with the CMD as arguments. The writer is left in
+    # the background holding the output open, so the output goes to a file and the
+    # whole process group is stopped afterwards.
+    log = tmp_path / "output.log"
+    with log.open("w") as output:
+        process = subprocess.Popen(
+            ["bash", str(ROOT / "entrypoint.sh"), sys.executable, "-c", CLIENT],
+            cwd=tmp_path, env=env, stdout=output, stderr=subprocess.STDOUT, start_new_session=True,
+        )
+        try:
+            process.wait(timeout=90)
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+    output = log.read_text()
+
+    assert process.returncode == 0, output
+    assert output.strip().splitlines()[-1] == "compacted"
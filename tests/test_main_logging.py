@@ -0,0 +1,42 @@
+import logging
+import queue
+
+from lucid_docs.core.metrics import route_var
+from lucid_docs.main import DroppingQueueHandler, PlainTextFormatter, RequestContextFilter, track_id_var
+
+
+def make_record(level=logging.INFO, msg="hello"):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+class TestRequestContextFilter:
+    def test_copies_track_id_onto_record(self):
+        token = track_id_var.set("track-123")
+        try:
+            record = make_record()
+            assert RequestContextFilter().filter(record) is True
+        finally:
+            track_id_var.reset(token)
+        assert record.track_id == "track-123"
+        assert "[track_id: track-123]" in PlainTextFormatter().format(record)
+
+    def test_samples_info_logs_per_route(self):
+        log_filter = RequestContextFilter({"/health": 0.0, "/chat/": 1.0})
+        route_token = route_var.set("/health")
+        try:
+            assert log_filter.filter(make_record()) is False
+            assert log_filter.filter(make_record(logging.WARNING)) is True
+            route_var.set("/chat/")
+            assert log_filter.filter(make_record()) is True
+            route_var.set("/other")
+            assert log_filter.filter(make_record()) is True
+        finally:
+            route_var.reset(route_token)
+
+
+def test_dropping_queue_handler_counts_overflow():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
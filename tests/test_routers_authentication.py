@@ -0,0 +1,71 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from lucid_docs.core.database import database
+from lucid_docs.core.security import get_current_admin_user
+from lucid_docs.models.database import User
+
+
+@pytest.fixture
+def users_collection(db):
+    return database.get_collection("users")
+
+
+def valid_user(username: str) -> dict:
+    return {"username": username, "email": f"{username}@example.com", "password": "Password123!"}
+
+
+class TestRegisterUser:
+    def test_register_inserts_without_lookup(self, client, users_collection):
+        response = client.post("/auth/users/register/", json=valid_user("newuser"))
+
+        assert response.status_code == 200
+        assert response.json()["username"] == "newuser"
+        users_collection.find_one.assert_not_awaited()
+        users_collection.insert_one.assert_awaited_once()
+        assert users_collection.insert_one.await_args.args[0]["password"] != "Password123!"
+
+    def test_register_duplicate_username_returns_400(self, client, users_collection):
+        users_collection.insert_one.side_effect = DuplicateKeyError(
+            "duplicate", code=11000, details={"keyPattern": {"username": 1}}
+        )
+
+        response = client.post("/auth/users/register/", json=valid_user("dupuser"))
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Username already registered"
+
+    def test_register_duplicate_email_returns_400(self, client, users_collection):
+        users_collection.insert_one.side_effect = DuplicateKeyError(
+            "duplicate", code=11000, details={"keyPattern": {"email": 1}}
+        )
+
+        response = client.post("/auth/users/register/", json=valid_user("dupmail"))
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Email already registered"
+
+
+class TestProvisionUsers:
+    def test_bulk_reports_per_row_results(self, app, client, users_collection):
+        app.dependency_overrides[get_current_admin_user] = lambda: User(username="admin")
+        users_collection.insert_many = AsyncMock(side_effect=BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "keyPattern": {"username": 1}, "errmsg": "dup"}],
+        }))
+
+        response = client.post("/auth/users/bulk/", json=[valid_user("bulk_a"), valid_user("bulk_b")])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] == 1
+        assert body["failed"] == 1
+        assert [row["status"] for row in body["results"]] == ["created", "duplicate"]
+        documents = users_collection.insert_many.await_args.args[0]
+        assert len(documents) == 2
+        assert users_collection.insert_many.await_args.kwargs["ordered"] is False
+
+    def test_bulk_requires_admin(self, client):
+        response = client.post("/auth/users/bulk/", json=[valid_user("bulk_a")])
+        assert response.status_code == 401
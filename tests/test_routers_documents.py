@@ -0,0 +1,204 @@
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.models.database import User
+from lucid_docs.services import document_service
+
+CHAT_ID = "3f0b7a4e-5d7c-4f7e-9a51-0c6a3e0f8b21"
+
+
+@pytest.fixture
+def alice(app):
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def collections(db):
+    return database.get_collection("documents"), database.get_collection("jobs")
+
+
+class TestListDocuments:
+    def test_lists_user_documents_for_chat(self, client, alice, collections):
+        documents, _ = collections
+        documents.find.return_value.to_list.return_value = [{
+            "_id": "1", "hash_file_name": "abc.pdf", "file_name": "contrato.pdf", "username": "alice",
+            "chat_id": CHAT_ID, "page_count": 2, "chunks": 5, "created_at": "2025-01-01T00:00:00+00:00",
+        }]
+
+        response = client.get("/documents/", params={"chat_id": CHAT_ID})
+
+        assert response.status_code == 200
+        assert response.json()["documents"][0]["file_name"] == "contrato.pdf"
+        assert documents.find.call_args.args[0] == {"username": "alice", "chat_id": CHAT_ID}
+
+    def test_rejects_invalid_chat_id(self, client, alice, collections):
+        assert client.get("/documents/", params={"chat_id": "nope"}).status_code == 400
+
+
+class TestDeleteDocuments:
+    def test_delete_document_runs_job(self, client, alice, collections, monkeypatch):
+        documents, jobs = collections
+        documents.update_one.return_value = MagicMock(matched_count=1)
+        delete_vectors = MagicMock(return_value=12)
+        monkeypatch.setattr(document_service, "delete_vectors", delete_vectors)
+
+        response = client.delete("/documents/abc.pdf")
+
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        delete_vectors.assert_called_once_with(
+            document_service.document_filter("alice", "abc.pdf"), settings.VECTOR_DELETE_BATCH_SIZE
+        )
+        documents.delete_many.assert_awaited_once_with({"username": "alice", "hash_file_name": "abc.pdf"})
+        final = jobs.update_one.await_args_list[-1].args[1]["$set"]
+        assert final["status"] == "completed"
+        assert final["deleted_chunks"] == 12
+
+    def test_unknown_document_returns_404(self, client, alice, collections, monkeypatch):
+        documents, _ = collections
+        documents.update_one.return_value = MagicMock(matched_count=0)
+        monkeypatch.setattr("lucid_docs.routers.documents.has_vectors", lambda where: False)
+
+        assert client.delete("/documents/missing.pdf").status_code == 404
+
+    def test_delete_chat(self, client, alice, collections, monkeypatch):
+        documents, jobs = collections
+        documents.update_many = AsyncMock()
+        monkeypatch.setattr(document_service, "delete_vectors", MagicMock(return_value=0))
+
+        response = client.delete(f"/documents/chat/{CHAT_ID}")
+
+        assert response.status_code == 202
+        assert response.json()["type"] == "delete_chat"
+        documents.delete_many.assert_awaited_once_with({"username": "alice", "chat_id": CHAT_ID})
+
+
+class TestVectorDeletion:
+    def test_batched_delete_only_touches_matching_chunks(self, local_chroma):
+        local_chroma.add_texts(
+            [f"trecho {i}" for i in range(7)] + ["outro usuário"],
+            metadatas=[{"user_id": "alice", "hash_file_name": "abc.pdf"}] * 7
+            + [{"user_id": "bob", "hash_file_name": "abc.pdf"}],
+        )
+
+        deleted = document_service.delete_vectors(document_service.document_filter("alice", "abc.pdf"), batch_size=3)
+
+        assert deleted == 7
+        assert local_chroma._collection.count() == 1
+        # Embedded workers share the SQLite file: only the writer process compacts it.
+        assert document_service.compact_vector_store() is False
+        assert local_chroma._collection.count() == 1
+
+
+class TestRevisionUpload:
+    def upload(self, client, document_id, **data):
+        return client.post(
+            "/upload/pdf",
+            files={"file": ("manual.pdf", b"%PDF-1.4", "application/pdf")},
+            data={"chat_id": CHAT_ID, "document_id": document_id, **data},
+        )
+
+    def test_unknown_document_returns_404(self, client, alice, collections):
+        assert self.upload(client, "missing.pdf").status_code == 404
+
+    def test_revision_passes_previous_hashes(self, client, alice, collections, monkeypatch):
+        documents, _ = collections
+        documents.find_one.return_value = {
+            "hash_file_name": "abc.pdf", "username": "alice", "chat_id": CHAT_ID, "chunks": 4, "page_hashes": ["h1", "h2"],
+        }
+        documents.update_one.return_value = MagicMock(matched_count=1)
+        calls = []
+
+        def fake_process(source, filename, username, chat_id, before_embed, previous_page_hashes, hash_file_name,
+                         content_type):
+            calls.append((source.read(), hash_file_name, previous_page_hashes))
+            return {"status": "processed", "hash_file_name": hash_file_name, "page_count": 2, "chunks": 1,
+                    "removed_chunks": 1, "page_hashes": ["h1", "h3"]}
+
+        monkeypatch.setattr("lucid_docs.routers.upload.process_document", fake_process)
+
+        response = self.upload(client, "abc.pdf")
+
+        assert response.status_code == 200
+        assert calls == [(b"%PDF-1.4", "abc.pdf", ["h1", "h2"])]
+        assert "page_hashes" not in response.json()["metadata"]
+        update = documents.update_one.await_args.args[1]
+        assert update["$set"]["chunks"] == 4
+        assert update["$set"]["page_hashes"] == ["h1", "h3"]
+
+    def test_keep_original_stores_file_after_response(self, client, alice, collections, monkeypatch):
+        documents, _ = collections
+        documents.find_one.return_value = {"hash_file_name": "abc.pdf", "chat_id": CHAT_ID, "page_hashes": []}
+        monkeypatch.setattr("lucid_docs.routers.upload.process_document", lambda *args, hash_file_name, **kwargs: {
+            "status": "processed", "hash_file_name": hash_file_name, "page_count": 1, "chunks": 1,
+            "removed_chunks": 0, "page_hashes": ["h1"],
+        })
+
+        assert self.upload(client, "abc.pdf", keep_original="true").status_code == 200
+        assert (Path(settings.ORIGINALS_STORAGE_PATH) / "abc.pdf").read_bytes() == b"%PDF-1.4"
+
+    def test_unsupported_format_is_rejected(self, client, alice, collections):
+        response = client.post(
+            "/upload/document",
+            files={"file": ("foto.png", b"\x89PNG", "image/png")},
+            data={"chat_id": CHAT_ID},
+        )
+        assert response.status_code == 400
+        assert ".docx" in response.json()["detail"]
+
+    def test_corrupt_file_is_rejected(self, client, alice, collections):
+        response = client.post(
+            "/upload/document",
+            files={"file": ("manual.docx", b"PK\x03\x04 corrompido", "application/octet-stream")},
+            data={"chat_id": CHAT_ID},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Invalid file.")
+
+
+class TestFailedUpload:
+    def upload(self, client, data=b"%PDF-1.4\n truncated"):
+        return client.post(
+            "/upload/pdf", files={"file": ("manual.pdf", data, "application/pdf")}, data={"chat_id": CHAT_ID},
+        )
+
+    def test_parse_error_discards_the_registry_entry(self, client, alice, collections):
+        documents, _ = collections
+        documents.delete_one = AsyncMock()
+
+        response = self.upload(client)
+
+        assert response.status_code == 400
+        entry = documents.insert_one.await_args.args[0]
+        documents.delete_one.assert_awaited_once_with(
+            {"username": "alice", "hash_file_name": entry["hash_file_name"], "status": "ingesting"}
+        )
+
+    def test_failure_after_storing_chunks_deletes_them(self, client, alice, collections, local_chroma, monkeypatch):
+        from lucid_docs.core.rate_limit import EMBED_TOKENS, RateLimitExceeded
+
+        documents, _ = collections
+        documents.delete_one = AsyncMock()
+
+        def fail_midway(source, filename, username, chat_id, *args, hash_file_name, **kwargs):
+            local_chroma._collection.add(
+                ids=[f"{hash_file_name}:0"], embeddings=[[0.0] * 32], documents=["parcial"],
+                metadatas=[{"user_id": username, "hash_file_name": hash_file_name, "chat_id": chat_id}],
+            )
+            raise RateLimitExceeded(EMBED_TOKENS, "Embedding quota exhausted", 60)
+
+        monkeypatch.setattr("lucid_docs.routers.upload.process_document", fail_midway)
+
+        response = self.upload(client)
+
+        assert response.status_code == 429
+        assert local_chroma._collection.count() == 0
+        documents.delete_one.assert_awaited_once()
+        documents.update_one.assert_not_awaited()
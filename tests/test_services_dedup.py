@@ -0,0 +1,94 @@
+import io
+
+from langchain_core.documents import Document
+
+from benchmarks.harness import make_pdf_from_pages
+from lucid_docs.services.dedup import DUPLICATE_OF, MinHasher, collapse_duplicates, jaccard, shingles
+from lucid_docs.services.file_processing import process_document
+
+NOTICE = (
+    "aviso legal este documento e confidencial e destinado apenas ao uso interno da empresa "
+    "a reproducao total ou parcial sem autorizacao previa e proibida e sujeita as penalidades "
+    "previstas em contrato as informacoes aqui contidas podem ser alteradas sem aviso previo "
+    "consulte sempre a versao mais recente disponivel no portal de documentacao tecnica"
+)
+PAGES = [
+    NOTICE + " revisao um",
+    "capitulo um instalacao eletrica e aterramento do equipamento",
+    NOTICE + " revisao dois",
+]
+
+
+def ingest(pages, hash_file_name, **kwargs):
+    return process_document(
+        io.BytesIO(make_pdf_from_pages(pages)), "manual.pdf", "alice", "chat", hash_file_name=hash_file_name, **kwargs
+    )
+
+
+class TestMinHash:
+    def test_similar_texts_share_bands(self):
+        hasher = MinHasher()
+        first = hasher.band_keys(hasher.signature(shingles(NOTICE + " revisao um")))
+        second = hasher.band_keys(hasher.signature(shingles(NOTICE + " revisao um.")))
+        other = hasher.band_keys(hasher.signature(shingles(PAGES[1])))
+
+        assert set(first.values()) & set(second.values())
+        assert not set(first.values()) & set(other.values())
+
+    def test_jaccard(self):
+        assert jaccard(shingles("a b c d"), shingles("a b c d")) == 1.0
+        assert jaccard(shingles("a b c d"), shingles("w x y z")) == 0.0
+
+
+class TestIngestion:
+    def test_duplicates_within_a_document_are_skipped(self, local_chroma):
+        embedded = []
+        result = ingest(PAGES, "a.pdf", before_embed=embedded.extend)
+
+        assert result["duplicates_skipped"] == 1
+        assert result["chunks"] == len(embedded) == 2
+        kept = local_chroma._collection.get(where={"page": 0}, include=["metadatas"])["metadatas"][0]
+        assert kept["duplicate_pages"] == result["page_hashes"][2][:16]
+
+    def test_duplicates_across_documents_reuse_the_vector(self, local_chroma):
+        ingest(PAGES, "a.pdf")
+        embedded = []
+        result = ingest([NOTICE + " revisao um", "capitulo dois manutencao"], "b.pdf", before_embed=embedded.extend)
+
+        assert result["duplicates_linked"] == 1
+        assert [chunk.page_content for chunk in embedded] == ["capitulo dois manutencao"]
+        linked = local_chroma._collection.get(
+            where={"hash_file_name": "b.pdf"}, include=["metadatas", "embeddings"]
+        )
+        canonical_id = next(metadata[DUPLICATE_OF] for metadata in linked["metadatas"] if DUPLICATE_OF in metadata)
+        canonical = local_chroma._collection.get(ids=[canonical_id], include=["embeddings"])
+        assert list(canonical["embeddings"][0]) in [list(vector) for vector in linked["embeddings"]]
+
+    def test_revision_hands_the_kept_chunk_over(self, local_chroma):
+        first = ingest(PAGES, "a.pdf")
+        revised = [PAGES[1], PAGES[2]]
+        second = ingest(revised, "a.pdf", previous_page_hashes=first["page_hashes"])
+
+        metadatas = local_chroma._collection.get(where={"hash_file_name": "a.pdf"}, include=["metadatas"])["metadatas"]
+        assert second["removed_chunks"] == 0
+        assert sorted((metadata["page"], metadata["page_hash"]) for metadata in metadatas) == [
+            (0, second["page_hashes"][0]), (1, second["page_hashes"][1]),
+        ]
+
+    def test_disabled(self, local_chroma, monkeypatch):
+        from lucid_docs.core.config import settings
+
+        monkeypatch.setattr(settings, "DEDUP_ENABLED", False)
+        result = ingest(PAGES, "a.pdf")
+        assert result["chunks"] == 3
+        assert result["duplicates_skipped"] == 0
+
+
+def test_collapse_duplicates():
+    documents = [
+        Document(id="a", page_content="x"),
+        Document(id="b", page_content="x", metadata={DUPLICATE_OF: "a"}),
+        Document(id="c", page_content="y"),
+        Document(id="d", page_content="z"),
+    ]
+    assert [document.id for document in collapse_duplicates(documents, 2)] == ["a", "c"]
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from lucid_docs import dependencies
+from lucid_docs.core.config import settings
+from lucid_docs.services import embedding_migration
+from lucid_docs.services.embedding_migration import (
+    COMPLETED,
+    EmbeddingMigrator,
+    MigrationInProgress,
+    _all_ids,
+    start_migration,
+)
+from lucid_docs.services.providers import (
+    active_embedding_target,
+    migration_collection_name,
+    set_active_embedding_target,
+)
+
+
+@pytest.fixture
+def mongo(mongo):
+    asyncio.run(mongo["embedding_migrations"].create_index(
+        "status", unique=True, partialFilterExpression={"status": "running"}
+    ))
+    return mongo
+
+
+@pytest.fixture
+def hashing_store(monkeypatch, tmp_path):
+    from chromadb import PersistentClient
+
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "hashing")
+    monkeypatch.setattr(settings, "LOCAL_EMBEDDING_DIMENSIONS", 32)
+    monkeypatch.setattr(dependencies, "vector_client", PersistentClient(path=str(tmp_path)))
+    for name in ("embeddings", "chroma"):
+        monkeypatch.setattr(dependencies, name, None)
+    yield dependencies.get_chroma()
+    set_active_embedding_target(None)
+
+
+def test_migration_collection_name_is_a_valid_chroma_name():
+    assert migration_collection_name("Gemini", "models/text-embedding-005") == (
+        f"{settings.CHROMA_COLLECTION_NAME}__gemini__models-text-embedding-005"
+    )
+
+
+def test_all_ids_pages_through_collection(hashing_store, monkeypatch):
+    monkeypatch.setattr(embedding_migration, "ID_PAGE_SIZE", 3)
+    ids = hashing_store.add_texts([f"texto {i}" for i in range(7)])
+    assert _all_ids(hashing_store._collection) == set(ids)
+
+
+class TestMigration:
+    def test_copies_and_switches_active_target(self, mongo, hashing_store):
+        ids = hashing_store.add_texts(
+            [f"clausula {i} do contrato" for i in range(5)], metadatas=[{"user_id": "alice"}] * 5
+        )
+        migrator = EmbeddingMigrator(poll_seconds=0, batch_size=2, batch_interval=0)
+
+        async def scenario():
+            migration = await start_migration("hashing", "v2")
+            with pytest.raises(MigrationInProgress):
+                await start_migration("hashing", "v3")
+            status = await migrator.poll_once()
+            return migration, status, await mongo["embedding_state"].find_one({"_id": "active"})
+
+        migration, status, state = asyncio.run(scenario())
+
+        assert status == COMPLETED
+        target = migration["target"]["collection"]
+        assert state["collection"] == target
+        assert active_embedding_target().collection == target
+        assert dependencies.get_chroma()._collection.name == target
+        copied = dependencies.get_chroma()._collection.get(include=["metadatas"])
+        assert set(copied["ids"]) == set(ids)
+        assert copied["metadatas"][0]["user_id"] == "alice"
+
+    def test_reconcile_applies_changes_made_during_copy(self, mongo, hashing_store):
+        ids = hashing_store.add_texts([f"pagina {i}" for i in range(4)])
+        migrator = EmbeddingMigrator(poll_seconds=0, batch_size=2, batch_interval=0)
+        original_copy = embedding_migration._copy
+
+        def copy_then_write(batch, target_collection, embeddings, migration_id):
+            count = original_copy(batch, target_collection, embeddings, migration_id)
+            if batch["ids"] and batch["ids"][0] == ids[0]:
+                hashing_store.delete(ids=[ids[0]])
+                hashing_store.add_texts(["pagina nova"], ids=["late"])
+            return count
+
+        embedding_migration._copy = copy_then_write
+        try:
+            asyncio.run(start_migration("hashing", "v2"))
+            asyncio.run(migrator.poll_once())
+        finally:
+            embedding_migration._copy = original_copy
+
+        migrated = set(dependencies.get_chroma()._collection.get(include=[])["ids"])
+        assert migrated == (set(ids) - {ids[0]}) | {"late"}
+
+    def test_catch_up_applies_deletions_from_workers_not_yet_switched(self, mongo, hashing_store, monkeypatch):
+        ids = hashing_store.add_texts([f"pagina {i}" for i in range(4)])
+        source = hashing_store._collection
+        original_activate = embedding_migration.activate_embedding_target
+
+        def switch_then_write(target):
+            original_activate(target)
+            # A worker still on the old collection deletes a chunk, a switched one adds a chunk.
+            source.delete(ids=[ids[0]])
+            dependencies.get_chroma().add_texts(["pagina nova"], ids=["fresh"])
+
+        monkeypatch.setattr(embedding_migration, "activate_embedding_target", switch_then_write)
+        asyncio.run(start_migration("hashing", "v2"))
+        asyncio.run(EmbeddingMigrator(poll_seconds=0, batch_size=2, batch_interval=0).poll_once())
+
+        migrated = set(dependencies.get_chroma()._collection.get(include=[])["ids"])
+        assert migrated == (set(ids) - {ids[0]}) | {"fresh"}
+
+    def test_reconcile_stops_when_the_lease_is_lost(self, mongo, hashing_store):
+        hashing_store.add_texts([f"pagina {i}" for i in range(3)])
+        migrator = EmbeddingMigrator(poll_seconds=0, batch_size=1, batch_interval=0)
+        migration = asyncio.run(start_migration("hashing", "v2"))
+        asyncio.run(mongo["embedding_migrations"].update_one({"_id": migration["_id"]}, {"$set": {"owner": "other"}}))
+        target = embedding_migration._raw_collection(embedding_migration._target(migration["target"]))
+
+        result = asyncio.run(migrator._reconcile(
+            migration["_id"], hashing_store._collection, target, dependencies.get_embeddings()
+        ))
+
+        assert result is None
+        assert target.count() == 0
+
+    def test_rejects_unknown_or_active_target(self, mongo, hashing_store):
+        active = active_embedding_target()
+        with pytest.raises(ValueError):
+            asyncio.run(start_migration("unknown", "model"))
+        with pytest.raises(ValueError):
+            asyncio.run(start_migration(active.provider, active.model))
+
+    def test_other_worker_follows_switch(self, mongo, hashing_store):
+        hashing_store.add_texts(["texto"])
+        asyncio.run(start_migration("hashing", "v2"))
+        asyncio.run(EmbeddingMigrator(poll_seconds=0, batch_interval=0).poll_once())
+        switched = active_embedding_target()
+
+        set_active_embedding_target(None)
+        dependencies.chroma = None
+        follower = EmbeddingMigrator(poll_seconds=0)
+        assert asyncio.run(follower.poll_once()) is None
+        assert active_embedding_target() == switched
+
+
+def test_admin_migration_endpoints(app, client, monkeypatch):
+    from lucid_docs.core.security import get_current_admin_user
+    from lucid_docs.models.database import User
+
+    app.dependency_overrides[get_current_admin_user] = lambda: User(username="admin")
+
+    async def in_progress(provider, model):
+        raise MigrationInProgress("An embedding migration is already running")
+
+    monkeypatch.setattr("lucid_docs.routers.admin.start_migration", in_progress)
+    try:
+        assert client.post("/admin/embeddings/migrations", json={"provider": "hashing", "model": "v2"}).status_code == 409
+        assert client.get("/admin/embeddings/migrations/missing").status_code == 404
+        assert client.get("/admin/embeddings").json()["active"] == active_embedding_target().to_dict()
+    finally:
+        app.dependency_overrides.clear()
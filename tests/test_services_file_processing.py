@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+from benchmarks.harness import make_pdf_from_pages
+from lucid_docs.services.file_processing import process_document
+
+PAGES = [
+    "introducao ao manual de operacao do equipamento",
+    "capitulo um instalacao eletrica e aterramento",
+    "capitulo dois manutencao preventiva mensal",
+]
+
+
+def write_pdf(directory, pages):
+    path = directory / "manual.pdf"
+    path.write_bytes(make_pdf_from_pages(pages))
+    return path
+
+
+def stored(store):
+    result = store._collection.get(include=["metadatas"])
+    return sorted((metadata["page"], metadata["page_hash"]) for metadata in result["metadatas"])
+
+
+class TestIncrementalIngestion:
+    def test_first_upload_embeds_every_page(self, local_chroma, tmp_path):
+        result = process_document(write_pdf(tmp_path, PAGES), "manual.pdf", "alice", "chat")
+
+        assert result["pages_added"] == 3
+        assert result["chunks"] == 3
+        assert len(set(result["page_hashes"])) == 3
+        assert stored(local_chroma) == [(0, result["page_hashes"][0]), (1, result["page_hashes"][1]), (2, result["page_hashes"][2])]
+
+    def test_revision_only_embeds_the_diff(self, local_chroma, tmp_path):
+        first = process_document(write_pdf(tmp_path, PAGES), "manual.pdf", "alice", "chat")
+        embedded = []
+
+        revised = [PAGES[0], "capitulo dois manutencao preventiva semanal", PAGES[1]]
+        result = process_document(
+            write_pdf(tmp_path, revised), "manual.pdf", "alice", "chat",
+            before_embed=embedded.extend, previous_page_hashes=first["page_hashes"],
+        )
+
+        assert [chunk.page_content for chunk in embedded] == ["capitulo dois manutencao preventiva semanal"]
+        assert (result["pages_added"], result["pages_removed"], result["pages_unchanged"]) == (1, 1, 2)
+        assert result["removed_chunks"] == 1
+        assert stored(local_chroma) == sorted((index, h) for index, h in enumerate(result["page_hashes"]))
+
+    def test_unchanged_revision_embeds_nothing(self, local_chroma, tmp_path):
+        first = process_document(write_pdf(tmp_path, PAGES), "manual.pdf", "alice", "chat")
+        result = process_document(
+            write_pdf(tmp_path, PAGES), "manual.pdf", "alice", "chat", previous_page_hashes=first["page_hashes"]
+        )
+        assert result["chunks"] == 0
+        assert local_chroma._collection.count() == 3
+
+
+class TestStreamParsing:
+    def test_stream_and_path_give_the_same_pages(self, local_chroma, tmp_path):
+        path = write_pdf(tmp_path, PAGES)
+        from_path = process_document(path, "manual.pdf", "alice", "chat", hash_file_name="a.pdf")
+        with path.open("rb") as stream:
+            from_stream = process_document(stream, "manual.pdf", "alice", "chat", hash_file_name="b.pdf")
+
+        assert from_stream["page_hashes"] == from_path["page_hashes"]
+        assert from_stream["hash_file_name"] == "b.pdf"
+
+    def test_stream_requires_hash_file_name(self, tmp_path):
+        with pytest.raises(ValueError):
+            process_document(io.BytesIO(make_pdf_from_pages(PAGES)), "manual.pdf", "alice")
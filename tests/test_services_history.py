@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from limits import parse
+
+from lucid_docs import dependencies
+from lucid_docs.core.config import settings
+from lucid_docs.core.rate_limit import CHAT, RateLimiter
+from lucid_docs.services import history_service
+from lucid_docs.services.history_service import load_history, recent_turns, summarize_turn, update_summary
+from lucid_docs.services.local_models import ExtractiveChatModel
+
+CHAT_ID = "3f0b7a4e-5d7c-4f7e-9a51-0c6a3e0f8b21"
+
+
+@pytest.fixture
+def local_llm(monkeypatch):
+    monkeypatch.setattr(dependencies, "llm", ExtractiveChatModel())
+
+
+def test_recent_turns_are_the_last_pairs_oldest_first(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_HISTORY_MESSAGE_CHARS", 20)
+
+    async def scenario():
+        await mongo.messages.insert_many([
+            {"chat_id": CHAT_ID, "username": "alice", "role": role, "content": f"{role} {turn} " + "x" * 40,
+             "timestamp": f"2025-01-01T00:0{turn}:0{index}+00:00"}
+            for turn in range(4) for index, role in enumerate(("user", "assistant"))
+        ] + [{"chat_id": CHAT_ID, "username": "bob", "role": "user", "content": "other", "timestamp": "2025-01-02"}])
+        return await recent_turns(mongo.messages, "alice", CHAT_ID, 2)
+
+    lines = asyncio.run(scenario()).splitlines()
+
+    assert [line.split(":")[0] for line in lines] == ["Usuário", "Assistente", "Usuário", "Assistente"]
+    assert lines[0].startswith("Usuário: user 2")
+    assert all(len(line.split(": ", 1)[1]) <= 20 for line in lines)
+
+
+def test_summary_is_updated_incrementally(mongo, local_llm):
+    async def scenario():
+        conversations = mongo.conversations
+        first, _ = await update_summary(conversations, "alice", CHAT_ID, "", 0, "Qual a voltagem?", "A voltagem e 220V.")
+        summary, turns = await load_history("summary", mongo.messages, conversations, "alice", CHAT_ID)
+        second, _ = await update_summary(conversations, "alice", CHAT_ID, summary, turns, "E a corrente?", "E 10A.")
+        stale, tokens = await update_summary(conversations, "alice", CHAT_ID, summary, turns, "E a potencia?", "2200W.")
+        return first, (summary, turns), second, (stale, tokens), await conversations.find_one({"chat_id": CHAT_ID})
+
+    first, loaded, second, stale, record = asyncio.run(scenario())
+
+    assert first and loaded == (first, 1)
+    assert second is not None
+    # The call was made, so its tokens count even though the summary was not stored.
+    assert stale[0] is None and stale[1] > 0
+    assert (record["summary"], record["turns"]) == (second, 2)
+
+
+def test_summary_is_clipped(mongo, local_llm, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_MAX_CHARS", 30)
+    summary, _ = asyncio.run(
+        update_summary(mongo.conversations, "alice", CHAT_ID, "", 0, "pergunta " * 20, "resposta. " * 20)
+    )
+    assert len(summary) <= 30
+
+
+def test_summary_prompt_is_not_the_rag_layout():
+    prompt = history_service.SUMMARY_PROMPT.format(
+        max_chars=100, summary="(vazio)", question="Usuário: oi", answer="Assistente: olá"
+    )
+    assert "Contexto:" not in prompt and "Pergunta:" not in prompt
+    assert "Resumo atual:" in prompt and prompt.rstrip().endswith("Resumo atualizado:")
+
+
+def test_summarize_turn_is_charged_and_recorded(mongo, local_llm, monkeypatch):
+    limiter = RateLimiter()
+    limiter.limits[CHAT] = (parse("1/minute"), parse("10/minute"))
+    monkeypatch.setattr(history_service, "rate_limiter", limiter)
+    timestamp = "2025-03-01T10:00:00+00:00"
+
+    async def scenario():
+        inserted = await mongo.messages.insert_one(
+            {"chat_id": CHAT_ID, "username": "alice", "role": "assistant", "content": "A voltagem e 220V.",
+             "timestamp": timestamp, "usage": {"top_k": 3}}
+        )
+        args = (mongo.conversations, mongo.messages, mongo.usage_daily, "alice", CHAT_ID, inserted.inserted_id)
+        first = await summarize_turn(*args, "", 0, "Qual a voltagem?", "A voltagem e 220V.", 3, timestamp)
+        limited = await summarize_turn(*args, first, 1, "E a corrente?", "E 10A.", 3, timestamp)
+        return (
+            first, limited,
+            await mongo.messages.find_one({"_id": inserted.inserted_id}),
+            await mongo.usage_daily.find_one({"chat_id": CHAT_ID}),
+            await mongo.conversations.find_one({"chat_id": CHAT_ID}),
+        )
+
+    first, limited, message, rollup, record = asyncio.run(scenario())
+
+    assert first and limited is None
+    assert limiter.rejections[CHAT] == 1
+    assert message["usage"]["summary_tokens"] > 0
+    assert (rollup["top_k"], rollup["summary_tokens"]) == (3, message["usage"]["summary_tokens"])
+    assert record["turns"] == 1
+
+
+def test_no_history_by_default(mongo):
+    assert asyncio.run(load_history("none", mongo.messages, mongo.conversations, "alice", CHAT_ID)) == ("", 0)
+
+
+def test_history_is_added_to_the_prompt(local_chroma, local_llm):
+    from lucid_docs.services.chroma_service import query_collection
+
+    _, without = asyncio.run(query_collection("e a corrente?", "alice", CHAT_ID, 1))
+    _, with_history = asyncio.run(
+        query_collection("e a corrente?", "alice", CHAT_ID, 1, history="Usuário: qual a voltagem do motor?")
+    )
+
+    assert with_history["history_chars"] > 0 and without["history_chars"] == 0
+    assert with_history["prompt_tokens"] > without["prompt_tokens"]
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from lucid_docs.core.config import settings
+from lucid_docs.services.janitor import Janitor
+
+
+@pytest.fixture
+def temp_dir(monkeypatch, tmp_path):
+    path = tmp_path / "uploads"
+    path.mkdir()
+    monkeypatch.setattr(settings, "TEMP_STORAGE_PATH", str(path))
+    return path
+
+
+def _file(directory, name, age):
+    path = directory / name
+    path.write_bytes(b"x" * 100)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_removes_processed_and_expired_temp_files(mongo, temp_dir, local_chroma):
+    processed = _file(temp_dir, "processed.pdf", age=600)
+    ingesting = _file(temp_dir, "ingesting.pdf", age=600)
+    recent = _file(temp_dir, "recent.pdf", age=10)
+    expired = _file(temp_dir, "expired.pdf", age=90000)
+    asyncio.run(mongo["documents"].insert_many([
+        {"hash_file_name": "processed.pdf", "status": "ready", "username": "alice"},
+        {"hash_file_name": "ingesting.pdf", "status": "ingesting", "username": "alice",
+         "updated_at": "9999-01-01T00:00:00+00:00"},
+        {"hash_file_name": "recent.pdf", "status": "ready", "username": "alice"},
+    ]))
+
+    report = asyncio.run(Janitor().run_once())
+
+    assert report["temp_files"] == 2
+    assert report["reclaimed_bytes"] == 200
+    assert not processed.exists() and not expired.exists()
+    assert ingesting.exists() and recent.exists()
+
+
+def test_discards_stalled_ingestions_and_orphaned_chunks(mongo, temp_dir, local_chroma):
+    local_chroma.add_texts(
+        ["parcial 1", "parcial 2", "completo", "de usuario removido"],
+        metadatas=[
+            {"user_id": "alice", "hash_file_name": "stalled.pdf"},
+            {"user_id": "alice", "hash_file_name": "stalled.pdf"},
+            {"user_id": "alice", "hash_file_name": "ready.pdf"},
+            {"user_id": "bob", "hash_file_name": "old.pdf"},
+        ],
+    )
+    asyncio.run(mongo["users"].insert_one({"username": "alice"}))
+    asyncio.run(mongo["documents"].insert_many([
+        {"hash_file_name": "stalled.pdf", "status": "ingesting", "username": "alice",
+         "updated_at": "2000-01-01T00:00:00+00:00"},
+        {"hash_file_name": "ready.pdf", "status": "ready", "username": "alice"},
+        {"hash_file_name": "old.pdf", "status": "ready", "username": "bob"},
+    ]))
+
+    report = asyncio.run(Janitor(batch_size=1).run_once())
+
+    assert report["deleted_vectors"] == {"stalled_ingestion": 2, "deleted_user": 1}
+    assert report["stalled_documents"] == 1 and report["orphaned_users"] == 1
+    remaining = local_chroma._collection.get(include=["metadatas"])["metadatas"]
+    assert [metadata["hash_file_name"] for metadata in remaining] == ["ready.pdf"]
+    documents = asyncio.run(mongo["documents"].find({}).to_list(length=None))
+    names = {document["hash_file_name"] for document in documents}
+    assert names == {"ready.pdf"}
+
+
+def test_keeps_chunks_when_no_owner_is_found(mongo, temp_dir, local_chroma):
+    local_chroma.add_texts(["texto"], metadatas=[{"user_id": "alice"}])
+
+    report = asyncio.run(Janitor().run_once())
+
+    assert report["deleted_vectors"]["deleted_user"] == 0
+    assert local_chroma._collection.count() == 1
+
+
+def test_lease_allows_one_sweep_per_interval(mongo, temp_dir, local_chroma):
+    first, second = Janitor(interval=3600), Janitor(interval=3600)
+
+    assert asyncio.run(first.poll_once()) is not None
+    assert asyncio.run(second.poll_once()) is None
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from benchmarks.loaders import make_docx, make_html, make_markdown, make_text
+from lucid_docs.services.file_processing import page_hash, process_document
+from lucid_docs.services.loaders import DOCX, HTML, MARKDOWN, PDF, TEXT, UnsupportedDocumentError, get_loader, paginate
+
+SECTIONS = [
+    ("Instalacao", ["Fixe o equipamento na parede.", "Conecte o aterramento antes de ligar."]),
+    ("Manutencao", ["Limpe os filtros todo mes."]),
+]
+
+
+def load(content_type, data, name="doc"):
+    return list(get_loader(content_type).load(io.BytesIO(data), name))
+
+
+class TestRegistry:
+    def test_lookup_by_content_type_then_extension(self):
+        assert get_loader("application/pdf").content_type == PDF
+        assert get_loader("text/markdown; charset=utf-8").content_type == MARKDOWN
+        assert get_loader("application/octet-stream", "notas.markdown").content_type == MARKDOWN
+        assert get_loader(None, "Relatorio.DOCX").extension == ".docx"
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError, match="Accepted"):
+            get_loader("image/png", "foto.png")
+
+
+@pytest.mark.parametrize("content_type, build", [
+    (DOCX, make_docx), (HTML, make_html), (MARKDOWN, make_markdown),
+])
+def test_headings_start_pages(content_type, build):
+    pages = load(content_type, build(SECTIONS))
+
+    assert [page.metadata["page"] for page in pages] == [0, 1]
+    assert "Conecte o aterramento" in pages[0].page_content
+    assert pages[1].page_content.endswith("Limpe os filtros todo mes.")
+
+
+def test_text_paragraphs_fill_pages_up_to_the_budget():
+    pages = list(paginate(((f"paragrafo {i}", False) for i in range(10)), "doc", page_chars=40))
+    assert len(pages) == 4
+    assert all(len(page.page_content) <= 40 for page in pages)
+    assert load(TEXT, make_text(SECTIONS))[0].page_content.startswith("Instalacao\n\nFixe")
+
+
+def test_html_skips_scripts_and_decodes_entities():
+    data = b"<html><head><style>p{}</style></head><body><script>x=1</script><p>Tens&atilde;o &amp; corrente</p></body></html>"
+    assert [page.page_content for page in load(HTML, data)] == ["Tensão & corrente"]
+
+
+def test_edit_only_changes_the_edited_page():
+    edited = [(SECTIONS[0][0], SECTIONS[0][1] + ["Use luvas."]), SECTIONS[1]]
+    before = [page_hash(page.page_content) for page in load(MARKDOWN, make_markdown(SECTIONS))]
+    after = [page_hash(page.page_content) for page in load(MARKDOWN, make_markdown(edited))]
+
+    assert before[0] != after[0]
+    assert before[1] == after[1]
+
+
+def test_process_document_ingests_markdown(local_chroma):
+    result = process_document(
+        io.BytesIO(make_markdown(SECTIONS)), "manual.md", "alice", "chat",
+        hash_file_name="abc.md", content_type="application/octet-stream",
+    )
+
+    assert (result["page_count"], result["chunks"]) == (2, 2)
+    metadatas = local_chroma._collection.get(include=["metadatas"])["metadatas"]
+    assert {metadata["hash_file_name"] for metadata in metadatas} == {"abc.md"}
+
+
+class TestCorruptFiles:
+    def process(self, data, name, content_type):
+        return process_document(io.BytesIO(data), name, "alice", hash_file_name=name, content_type=content_type)
+
+    def test_pdf(self):
+        with pytest.raises(UnsupportedDocumentError, match=r"\.pdf"):
+            self.process(b"%PDF-1.4\n truncated", "manual.pdf", PDF)
+
+    def test_docx(self):
+        with pytest.raises(UnsupportedDocumentError, match=r"\.docx"):
+            self.process(b"PK\x03\x04 not a zip archive", "manual.docx", DOCX)
+
+    def test_html(self):
+        with pytest.raises(UnsupportedDocumentError, match=r"\.html"):
+            self.process(b"<p>texto</p><![foo[ marcado", "manual.html", HTML)
+
+    @pytest.mark.parametrize("content_type", [TEXT, MARKDOWN])
+    def test_text_formats_replace_invalid_bytes(self, content_type):
+        # Plain text has no structure to break: undecodable bytes are replaced.
+        pages = load(content_type, b"Tens\xe3o nominal\xff")
+        assert [page.page_content for page in pages] == ["Tens\ufffdo nominal\ufffd"]
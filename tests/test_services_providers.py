@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from lucid_docs.core.config import settings
+from lucid_docs.services.local_models import ExtractiveChatModel, HashingEmbeddings
+from lucid_docs.services.providers import collection_name, create_embeddings, create_llm
+
+
+class TestHashingEmbeddings:
+    def test_deterministic_and_normalized(self):
+        embeddings = HashingEmbeddings(dimensions=32)
+        first = embeddings.embed_query("alpha beta gamma")
+        assert first == embeddings.embed_documents(["alpha beta gamma"])[0]
+        assert abs(sum(v * v for v in first) - 1.0) < 1e-9
+
+    def test_shared_words_are_closer(self):
+        embeddings = HashingEmbeddings(dimensions=256)
+        query, near, far = embeddings.embed_documents(
+            ["contrato de aluguel", "o contrato de aluguel vence", "receita de bolo"]
+        )
+        similarity = lambda a, b: sum(x * y for x, y in zip(a, b))
+        assert similarity(query, near) > similarity(query, far)
+
+
+class TestExtractiveChatModel:
+    def test_answers_with_best_matching_sentences(self):
+        model = ExtractiveChatModel(max_sentences=1)
+        prompt = (
+            "Contexto: O prazo de entrega é de dez dias. O pagamento é feito por boleto.\n\n"
+            "Pergunta: Qual é o prazo de entrega?\nResposta:"
+        )
+        message = model.invoke([HumanMessage(content=prompt)])
+        assert message.content == "O prazo de entrega é de dez dias."
+        assert message.usage_metadata["input_tokens"] > 0
+
+    def test_async_invoke(self):
+        message = asyncio.run(ExtractiveChatModel().ainvoke("Contexto: Uma frase.\nPergunta: frase?"))
+        assert message.content == "Uma frase."
+
+
+class TestRegistry:
+    def test_selects_local_providers(self, monkeypatch):
+        monkeypatch.setattr(settings, "LOCAL_EMBEDDING_DIMENSIONS", 16)
+        assert len(create_embeddings("hashing").embed_query("texto")) == 16
+        assert isinstance(create_llm("extractive"), ExtractiveChatModel)
+
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError):
+            create_embeddings("missing")
+        with pytest.raises(ValueError):
+            create_llm("missing")
+
+    def test_collection_name_per_provider(self, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "gemini")
+        assert collection_name() == settings.CHROMA_COLLECTION_NAME
+        monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "hashing")
+        assert collection_name() == f"{settings.CHROMA_COLLECTION_NAME}__hashing"
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+import pytest
+from langchain_core.messages import BaseMessage
+
+from lucid_docs import dependencies
+from lucid_docs.core.circuit_breaker import OPEN, CircuitBreaker
+from lucid_docs.core.metrics import llm_hedges, llm_requests
+from lucid_docs.services.local_models import ExtractiveChatModel
+from lucid_docs.services.resilient_llm import (
+    LLMRoute,
+    LLMTimeoutError,
+    LLMUnavailableError,
+    ResilientChatModel,
+)
+
+PROMPT = "Contexto: O motor opera em 220V.\nPergunta: Qual a voltagem?\nResposta:"
+CHAT_ID = "3f0b7a4e-5d7c-4f7e-9a51-0c6a3e0f8b21"
+
+
+class ScriptedChatModel(ExtractiveChatModel):
+    """
+    Extractive model whose successive calls take the scripted latencies; calls
+    scripted with a negative latency fail instead of answering.
+    """
+
+    script: list[float] = []
+    calls: int = 0
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None,
+                         run_manager: Any = None, **kwargs: Any):
+        latency = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        await asyncio.sleep(abs(latency))
+        if latency < 0:
+            raise RuntimeError("provider error")
+        return self._respond(messages)
+
+
+def route(name: str, model, min_calls: int = 10) -> LLMRoute:
+    breaker = CircuitBreaker(
+        name, window=10, min_calls=min_calls, error_rate=0.5, slow_call_seconds=5, slow_call_rate=0.5, open_seconds=60
+    )
+    return LLMRoute(name, model, breaker)
+
+
+def test_timeout_falls_back_to_the_fallback_model():
+    timeouts = llm_requests.value(model="primary", outcome="timeout")
+    llm = ResilientChatModel(
+        routes=[route("primary", ExtractiveChatModel(latency=1.0)), route("fallback", ExtractiveChatModel())],
+        timeout=0.05,
+        deadline=1.0,
+    )
+
+    start = time.perf_counter()
+    message = asyncio.run(llm.ainvoke(PROMPT))
+
+    assert time.perf_counter() - start < 0.5
+    assert message.content == "O motor opera em 220V."
+    assert message.response_metadata["llm_route"] == "fallback"
+    assert llm_requests.value(model="primary", outcome="timeout") == timeouts + 1
+
+
+def test_open_circuit_skips_the_primary_model():
+    primary = ScriptedChatModel(script=[-0.001])
+    llm = ResilientChatModel(routes=[route("primary", primary, min_calls=1), route("fallback", ExtractiveChatModel())])
+
+    first = asyncio.run(llm.ainvoke(PROMPT))
+    second = asyncio.run(llm.ainvoke(PROMPT))
+
+    assert (first.response_metadata["llm_route"], second.response_metadata["llm_route"]) == ("fallback", "fallback")
+    assert primary.calls == 1
+    assert llm.status()["primary"]["state"] == OPEN
+
+
+def test_fails_fast_without_fallback():
+    llm = ResilientChatModel(routes=[route("primary", ScriptedChatModel(script=[-0.001]), min_calls=1)])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(llm.ainvoke(PROMPT))
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(llm.ainvoke(PROMPT))
+
+
+def test_deadline_bounds_the_whole_call():
+    llm = ResilientChatModel(
+        routes=[route("primary", ExtractiveChatModel(latency=1.0)), route("fallback", ExtractiveChatModel(latency=1.0))],
+        timeout=0.1,
+        deadline=0.15,
+    )
+
+    start = time.perf_counter()
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(llm.ainvoke(PROMPT))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_hedges_after_the_p95_latency():
+    won = llm_hedges.value(outcome="won")
+    # Five fast calls set the p95, then a slow call is overtaken by its hedge.
+    primary = ScriptedChatModel(script=[0.01] * 5 + [1.0, 0.01])
+    llm = ResilientChatModel(routes=[route("primary", primary)], hedge=True, hedge_min_samples=5, deadline=5)
+
+    async def scenario():
+        for _ in range(5):
+            await llm.ainvoke(PROMPT)
+        start = time.perf_counter()
+        message = await llm.ainvoke(PROMPT)
+        return message, time.perf_counter() - start
+
+    message, elapsed = asyncio.run(scenario())
+
+    assert message.content == "O motor opera em 220V."
+    assert elapsed < 0.5
+    assert primary.calls == 7
+    assert llm_hedges.value(outcome="won") == won + 1
+
+
+def test_query_collection_reports_an_unavailable_model(local_chroma, monkeypatch):
+    from lucid_docs.services.chroma_service import query_collection
+
+    llm = ResilientChatModel(routes=[route("primary", ExtractiveChatModel(), min_calls=1)])
+    llm.routes[0].breaker.record(False, 0.1)
+    monkeypatch.setattr(dependencies, "llm", llm)
+
+    response, usage = asyncio.run(query_collection("qual a voltagem?", "alice", CHAT_ID, 1))
+
+    assert response.startswith("The language model is temporarily unavailable")
+    assert usage["error"] is True
+
+
+def test_health_and_metrics_expose_the_circuits(client, monkeypatch):
+    llm = ResilientChatModel(routes=[route("primary", ExtractiveChatModel(), min_calls=1)])
+    llm.routes[0].breaker.record(False, 0.1)
+    monkeypatch.setattr(dependencies, "llm", llm)
+
+    health = client.get("/health").json()
+
+    assert health["status"] == "degraded"
+    assert health["llm"]["primary"]["state"] == OPEN
+    assert 'lucid_llm_circuit_state{model="primary"} 2' in client.get("/metrics").text
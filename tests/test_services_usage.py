@@ -0,0 +1,105 @@
+import asyncio
+import io
+from datetime import date
+
+import pytest
+
+from benchmarks.harness import make_pdf_from_pages
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.core.retrieval_cache import retrieval_cache
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.models.database import MessageUsage, User
+from lucid_docs.services.usage_service import record_summary_usage, record_usage, usage_report
+
+CHAT_A = "3f0b7a4e-5d7c-4f7e-9a51-0c6a3e0f8b21"
+CHAT_B = "9c1d2e3f-4a5b-4c6d-8e7f-0a1b2c3d4e5f"
+
+
+@pytest.fixture
+def usage_collection(mongo):
+    return mongo["usage_daily"]
+
+
+def test_rollups_aggregate_by_group(usage_collection):
+    async def scenario():
+        usage = MessageUsage(prompt_tokens=100, completion_tokens=20, top_k=3, retrieval_ms=10, generation_ms=90)
+        await record_usage(usage_collection, "alice", CHAT_A, usage, "2025-03-01T10:00:00+00:00")
+        cached = usage.model_copy(update={"cache_hit": True})
+        await record_usage(usage_collection, "alice", CHAT_A, cached, "2025-03-01T11:00:00+00:00")
+        await record_usage(usage_collection, "alice", CHAT_B, usage, "2025-03-02T09:00:00+00:00")
+        await record_usage(usage_collection, "bob", CHAT_B, usage, "2025-03-02T09:00:00+00:00")
+        await record_summary_usage(usage_collection, "alice", CHAT_A, 3, 40, "2025-03-01T10:00:01+00:00")
+        return (
+            await usage_collection.count_documents({}),
+            await usage_report(usage_collection, date(2025, 3, 1), date(2025, 3, 31), "chat_id", "alice"),
+            await usage_report(usage_collection, date(2025, 3, 2), date(2025, 3, 2), "username"),
+        )
+
+    rollups, by_chat, by_user = asyncio.run(scenario())
+
+    assert rollups == 3
+    assert by_chat["totals"]["messages"] == 3
+    assert by_chat["totals"]["prompt_tokens"] == 300
+    first = by_chat["groups"][0]
+    assert (first["key"], first["messages"], first["cache_hits"], first["avg_generation_ms"]) == (CHAT_A, 2, 1, 90.0)
+    assert (first["summary_tokens"], by_chat["totals"]["summary_tokens"]) == (40, 40)
+    assert [group["key"] for group in by_user["groups"]] == ["alice", "bob"]
+
+
+def test_report_rejects_unknown_group(usage_collection):
+    with pytest.raises(ValueError):
+        asyncio.run(usage_report(usage_collection, date(2025, 1, 1), date(2025, 1, 2), "question"))
+
+
+def test_query_collection_reports_usage(local_chroma, monkeypatch):
+    from lucid_docs import dependencies
+    from lucid_docs.services.chroma_service import query_collection
+    from lucid_docs.services.file_processing import process_document
+    from lucid_docs.services.local_models import ExtractiveChatModel
+
+    monkeypatch.setattr(dependencies, "llm", ExtractiveChatModel())
+    monkeypatch.setattr(settings, "USER_CACHE_INVALIDATION_CHANNEL", "mongo")
+    retrieval_cache.clear()
+    process_document(
+        io.BytesIO(make_pdf_from_pages(["o equipamento deve ser aterrado antes do uso"])),
+        "manual.pdf", "alice", CHAT_A, hash_file_name="usage.pdf",
+    )
+
+    _, first = asyncio.run(query_collection("como aterrar o equipamento", "alice", CHAT_A, 2))
+    _, second = asyncio.run(query_collection("como aterrar o equipamento", "alice", CHAT_A, 2))
+
+    assert first["context_chunks"] == 1 and first["context_chars"] > 0
+    assert first["prompt_tokens"] > 0 and first["completion_tokens"] > 0
+    assert (first["cache_hit"], second["cache_hit"]) == (False, True)
+    MessageUsage(**first)
+
+
+class TestUsageEndpoint:
+    @pytest.fixture
+    def alice(self, app):
+        app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+        yield
+        app.dependency_overrides.clear()
+
+    def test_users_only_see_their_own_usage(self, client, alice):
+        assert client.get("/usage", params={"username": "bob"}).status_code == 403
+        assert client.get("/usage", params={"group_by": "username"}).status_code == 403
+
+    def test_defaults_to_the_last_30_days(self, client, alice):
+        response = client.get("/usage", params={"end": "2025-03-31"})
+
+        assert response.status_code == 200
+        assert (response.json()["start"], response.json()["end"]) == ("2025-03-02", "2025-03-31")
+        match = database.get_collection("usage_daily").aggregate.call_args.args[0][0]["$match"]
+        assert match["username"] == "alice"
+
+    def test_admin_can_group_by_user(self, client, alice, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", ["alice"])
+        response = client.get("/usage", params={"group_by": "username", "start": "2025-03-01", "end": "2025-03-02"})
+
+        assert response.status_code == 200
+        assert "username" not in database.get_collection("usage_daily").aggregate.call_args.args[0][0]["$match"]
+
+    def test_rejects_inverted_range(self, client, alice):
+        assert client.get("/usage", params={"start": "2025-03-02", "end": "2025-03-01"}).status_code == 400
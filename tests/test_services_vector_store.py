@@ -0,0 +1,97 @@
+import os
+import stat
+
+import pytest
+from langchain_chroma import Chroma
+
+from lucid_docs.core.config import settings
+from lucid_docs.services.local_models import HashingEmbeddings
+from lucid_docs.services.vector_store import (
+    VectorStoreWriter,
+    WriterClient,
+    create_vector_client,
+    describe_vector_store,
+    writer_address,
+    writer_authkey,
+)
+
+
+@pytest.fixture
+def writer(tmp_path):
+    address = str(tmp_path / "writer.sock")
+    server = VectorStoreWriter(address, b"secret", str(tmp_path / "chroma"))
+    server.start()
+    yield address
+    server.close()
+
+
+class TestWriterMode:
+    def test_round_trip_through_langchain(self, writer):
+        client = WriterClient(writer, b"secret", pool_size=2)
+        store = Chroma(client=client, collection_name="docs", embedding_function=HashingEmbeddings(dimensions=64))
+
+        store.add_texts(
+            ["o contrato vence em março", "receita de bolo de cenoura"],
+            metadatas=[{"user_id": "alice"}, {"user_id": "bob"}],
+            ids=["a", "b"],
+        )
+        results = store.similarity_search("contrato março", k=1, filter={"user_id": "alice"})
+        assert results[0].page_content == "o contrato vence em março"
+        assert store._collection.count() == 2
+
+        store.delete(ids=["a"])
+        assert store._collection.get()["ids"] == ["b"]
+        client.close()
+
+    def test_errors_are_raised_in_the_worker(self, writer):
+        client = WriterClient(writer, b"secret")
+        collection = client.get_or_create_collection("docs")
+        with pytest.raises(Exception):
+            collection.add(ids=["x"], embeddings=[[0.1]], documents=["a", "b"])
+        with pytest.raises(AttributeError):
+            collection.drop_everything
+
+    def test_compaction_runs_in_the_writer(self, writer, monkeypatch):
+        from lucid_docs import dependencies
+        from lucid_docs.services.document_service import compact_vector_store
+
+        client = WriterClient(writer, b"secret")
+        client.get_or_create_collection("docs").add(ids=["x"], embeddings=[[0.1, 0.2]], documents=["a"])
+        monkeypatch.setattr(settings, "VECTOR_STORE_MODE", "writer")
+        monkeypatch.setattr(dependencies, "vector_client", client)
+
+        assert compact_vector_store() is True
+        assert client.get_collection("docs").count() == 1
+
+    def test_socket_is_private_to_the_service_user(self, writer):
+        assert stat.S_IMODE(os.stat(writer).st_mode) == 0o600
+
+    def test_empty_authkey_is_rejected(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "VECTOR_STORE_WRITER_AUTHKEY", "")
+        with pytest.raises(ValueError):
+            writer_authkey()
+        with pytest.raises(ValueError):
+            VectorStoreWriter(str(tmp_path / "writer.sock"), b"", str(tmp_path / "chroma"))
+        with pytest.raises(ValueError):
+            WriterClient(str(tmp_path / "writer.sock"), b"")
+        monkeypatch.setattr(settings, "VECTOR_STORE_MODE", "writer")
+        with pytest.raises(ValueError):
+            create_vector_client()
+
+
+class TestConfiguration:
+    def test_writer_address_parsing(self, monkeypatch):
+        monkeypatch.setattr(settings, "VECTOR_STORE_WRITER_ADDRESS", "127.0.0.1:7000")
+        assert writer_address() == ("127.0.0.1", 7000)
+        monkeypatch.setattr(settings, "VECTOR_STORE_WRITER_ADDRESS", "/tmp/writer.sock")
+        assert writer_address() == "/tmp/writer.sock"
+
+    def test_unknown_mode(self, monkeypatch):
+        monkeypatch.setattr(settings, "VECTOR_STORE_MODE", "sharded")
+        with pytest.raises(ValueError):
+            create_vector_client()
+
+    def test_health_reports_mode(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "VECTOR_STORE_MODE", "http")
+        assert describe_vector_store()["target"] == f"http://localhost:{settings.CHROMA_PORT}"
+        assert client.get("/health").json()["vector_store"]["mode"] == "http"
@@ -0,0 +1,69 @@
+from lucid_docs.utils.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    def test_get_returns_default_on_miss(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+        assert cache.misses == 2
+
+    def test_set_and_get_hit(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        cache.set("alice", 1)
+        assert cache.get("alice") == 1
+        assert cache.hits == 1
+
+    def test_entries_expire_after_ttl(self):
+        timer = FakeTimer()
+        cache = TTLCache(max_size=2, ttl_seconds=10, timer=timer)
+        cache.set("alice", 1)
+        timer.now = 9.9
+        assert cache.get("alice") == 1
+        timer.now = 10.0
+        assert cache.get("alice") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_invalidate(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        cache.set("alice", 1)
+        assert cache.invalidate("alice") is True
+        assert cache.invalidate("alice") is False
+        assert cache.get("alice") is None
+        assert cache.invalidations == 1
+
+    def test_zero_size_disables_cache(self):
+        cache = TTLCache(max_size=0, ttl_seconds=10)
+        cache.set("alice", 1)
+        assert cache.get("alice") is None
+
+    def test_stats_hit_ratio(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        assert cache.stats()["hit_ratio"] == 0.0
+        cache.set("alice", 1)
+        cache.get("alice")
+        cache.get("bob")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["size"] == 1
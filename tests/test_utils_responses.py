@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from bson import ObjectId
+from starlette.requests import Request
+
+from lucid_docs.core.config import settings
+from lucid_docs.core.database import database
+from lucid_docs.core.security import get_current_active_user
+from lucid_docs.models.database import Conversation, User
+from lucid_docs.utils import responses
+from lucid_docs.utils.responses import choose_encoding, json_response
+
+CHAT_ID = "3f0b7a4e-5d7c-4f7e-9a51-0c6a3e0f8b21"
+
+
+def make_request(accept_encoding):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestChooseEncoding:
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("deflate, *;q=0.5", "gzip"),
+    ])
+    def test_gzip(self, monkeypatch, header, expected):
+        monkeypatch.setattr(responses, "brotli", None)
+        assert choose_encoding(header) == expected
+
+    def test_prefers_brotli_when_available(self, monkeypatch):
+        monkeypatch.setattr(responses, "brotli", object())
+        assert choose_encoding("gzip, br") == "br"
+        assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+class TestJsonResponse:
+    def test_small_bodies_are_not_compressed(self):
+        response = asyncio.run(json_response(make_request("gzip"), {"ok": True}))
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert json.loads(response.body) == {"ok": True}
+
+    def test_large_bodies_are_compressed(self, monkeypatch):
+        monkeypatch.setattr(responses, "brotli", None)
+        content = {"items": ["texto repetido"] * 500}
+        assert len(responses.dumps(content)) > settings.RESPONSE_COMPRESSION_MIN_BYTES
+
+        response = asyncio.run(json_response(make_request("gzip"), content))
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.body)) == content
+
+
+def test_list_messages_matches_the_response_model(app, client):
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    stored = [
+        {"_id": ObjectId(), "chat_id": CHAT_ID, "username": "alice", "role": "user",
+         "content": "pergunta", "timestamp": "2025-01-01T00:00:00+00:00"},
+        {"_id": ObjectId(), "chat_id": CHAT_ID, "username": "alice", "role": "assistant",
+         "content": "resposta", "timestamp": "2025-01-01T00:00:01+00:00",
+         "usage": {"prompt_tokens": 10, "completion_tokens": 2, "context_chars": 40, "context_chunks": 1,
+                   "history_chars": 0, "top_k": 3, "retrieval_ms": 1.5, "generation_ms": 20.0,
+                   "cache_hit": False, "error": False, "summary_tokens": 0}},
+    ]
+    database.get_collection("messages").find.return_value.to_list.return_value = stored
+    try:
+        response = client.get(f"/chat/conversation/{CHAT_ID}")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == Conversation(messages=stored).model_dump(mode="json")
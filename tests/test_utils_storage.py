@@ -0,0 +1,33 @@
+import mmap
+from tempfile import SpooledTemporaryFile
+
+import pytest
+from fastapi import UploadFile
+
+from lucid_docs.utils.storage import DetachedUpload, open_upload
+
+CONTENT = b"%PDF-1.4 " + b"x" * 4096
+
+
+def upload(max_size):
+    spooled = SpooledTemporaryFile(max_size=max_size)
+    spooled.write(CONTENT)
+    return UploadFile(spooled, filename="manual.pdf")
+
+
+@pytest.mark.parametrize("max_size, mapped", [(1024 * 1024, False), (1024, True)])
+def test_open_upload_reads_without_copy(max_size, mapped):
+    file = upload(max_size)
+    with open_upload(file) as source:
+        assert isinstance(source, mmap.mmap) is mapped
+        assert source.read() == CONTENT
+
+
+@pytest.mark.parametrize("max_size", [1024 * 1024, 1024])
+def test_detached_upload_outlives_the_request(tmp_path, max_size):
+    file = upload(max_size)
+    detached = DetachedUpload(file)
+    file.file.close()
+
+    assert detached.save(tmp_path / "originals" / "abc.pdf") == len(CONTENT)
+    assert (tmp_path / "originals" / "abc.pdf").read_bytes() == CONTENT